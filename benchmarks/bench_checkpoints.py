@@ -0,0 +1,65 @@
+"""
+Incremental steps benchmark: running every step on a checkpoint against
+running the cumulative code of every step.
+
+Usage::
+
+    python -m benchmarks.bench_checkpoints [--steps 60]
+
+Each step does a little work of its own. Without checkpoints, step *k*
+runs the code of steps 1..k, so the work grows with the square of the
+number of steps; with checkpoints every step runs once.
+"""
+import argparse
+import timeit
+
+from pytest_codeblock.checkpoints import StepChain
+from pytest_codeblock.tests.helpers import FakeNode
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("main",)
+
+STEP = "total = sum(range(1000))\nsteps.append(total)"
+
+
+def _execute(name: str, code: str, globals_: dict) -> None:
+    exec(compile(code, name, "exec"), globals_)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    names = [f"test_step_{step}" for step in range(args.steps)]
+    codes = ["steps = []"] + [STEP] * (args.steps - 1)
+
+    def cumulative() -> None:
+        for index, name in enumerate(names):
+            _execute(name, "\n".join(codes[: index + 1]), {})
+
+    def checkpoints() -> None:
+        document = FakeNode()
+        chain = StepChain(document)
+        for name, code in zip(names, codes):
+            chain.add(name, code)
+        for index in range(args.steps):
+            chain.run(index, {}, _execute)
+        document.teardown()
+
+    print(f"Group: {args.steps} incremental steps")
+    timings = {}
+    for label, func in (
+        ("cumulative", cumulative),
+        ("checkpoint", checkpoints),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        timings[label] = best
+        print(f"{label:>10}: {best * 1000:.1f} ms")
+    print(f"   speedup: {timings['cumulative'] / timings['checkpoint']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
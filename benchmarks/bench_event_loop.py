@@ -0,0 +1,55 @@
+"""
+Event loop benchmark: a loop shared by the async code blocks of a document
+against a loop per code block.
+
+Usage::
+
+    python -m benchmarks.bench_event_loop [--blocks 200]
+
+Every code block awaits ``asyncio.sleep(0)``, so the figures are mostly
+the cost of setting up and tearing down event loops.
+"""
+import argparse
+import asyncio
+import timeit
+
+from pytest_codeblock.config import Config
+from pytest_codeblock.loops import run_coroutine
+from pytest_codeblock.tests.helpers import FakeNode
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("main",)
+
+
+async def _block() -> None:
+    await asyncio.sleep(0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def run(config: Config) -> None:
+        document = FakeNode()
+        for _ in range(args.blocks):
+            run_coroutine(_block(), document, config)
+        document.teardown()
+
+    print(f"Document: {args.blocks} async code blocks")
+    timings = {}
+    for label, scope in (("per block", "block"), ("shared", "file")):
+        config = Config(async_loop_scope=scope)
+        best = min(timeit.repeat(
+            lambda config=config: run(config), number=1, repeat=args.repeat
+        ))
+        timings[label] = best
+        print(f"{label:>10}: {best * 1000:.1f} ms")
+    print(f"   speedup: {timings['per block'] / timings['shared']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
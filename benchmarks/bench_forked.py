@@ -0,0 +1,51 @@
+"""
+Isolation benchmark: running code blocks in forked children against
+starting a new interpreter for each of them.
+
+Usage::
+
+    python -m benchmarks.bench_forked [--blocks 10]
+
+The code blocks do nothing, so the figures are the cost of isolating them:
+forking the warm process, or starting an interpreter and importing pytest.
+"""
+import argparse
+import subprocess
+import sys
+import timeit
+
+from pytest_codeblock.forked import can_fork, run_forked
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("main",)
+
+
+def _forked() -> None:
+    run_forked(lambda: None)
+
+
+def _interpreter() -> None:
+    subprocess.run([sys.executable, "-c", "import pytest"], check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blocks", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not can_fork():
+        raise SystemExit("os.fork() is not available on this platform")
+
+    print(f"Code blocks: {args.blocks}")
+    timings = {}
+    for label, func in (("interpreter", _interpreter), ("forked", _forked)):
+        best = min(timeit.repeat(func, number=args.blocks, repeat=args.repeat))
+        timings[label] = best
+        print(f"{label:>11}: {best * 1000:.1f} ms")
+    print(f"    speedup: {timings['interpreter'] / timings['forked']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Throughput benchmark: ``parse_markdown`` against the original line loop.
+
+Usage::
+
+    python -m benchmarks.bench_parse_markdown [--size-mb 8] [--repeat 5]
+
+Both parsers are run over a synthetic, mostly-prose Markdown document (and
+over every Markdown file of this repository); results are checked for
+equality before any timing is reported.
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from pytest_codeblock.md import parse_markdown
+
+from .legacy import legacy_parse_markdown
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "main",
+    "make_markdown_document",
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SECTION = """\
+## Section {n}
+
+Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod
+tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam,
+quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo.
+
+Sed ut perspiciatis unde omnis iste natus error sit voluptatem accusantium
+doloremque laudantium, totam rem aperiam, eaque ipsa quae ab illo inventore
+veritatis et quasi architecto beatae vitae dicta sunt explicabo. Nemo enim
+ipsam voluptatem quia voluptas sit aspernatur aut odit aut fugit.
+
+Neque porro quisquam est, qui dolorem ipsum quia dolor sit amet, consectetur,
+adipisci velit, sed quia non numquam eius modi tempora incidunt ut labore et
+dolore magnam aliquam quaerat voluptatem. Ut enim ad minima veniam, quis
+nostrum exercitationem ullam corporis suscipit laboriosam.
+
+- Duis aute irure dolor in reprehenderit in voluptate velit esse cillum.
+- Excepteur sint occaecat cupidatat non proident, sunt in culpa qui officia.
+
+<!-- pytestmark: django_db -->
+<!-- codeblock-name: test_section_{n} -->
+```python
+import os
+
+value = {n}
+assert value == {n}
+```
+
+```sh
+pip install pytest-codeblock
+```
+
+<!-- continue: test_section_{n} -->
+   ```python name=test_section_{n}_part
+   assert value
+   ```
+
+"""
+
+
+def make_markdown_document(size: int) -> str:
+    """Build a synthetic Markdown document of roughly `size` characters."""
+    chunks = []
+    total = 0
+    n = 0
+    while total < size:
+        chunk = SECTION.format(n=n)
+        chunks.append(chunk)
+        total += len(chunk)
+        n += 1
+    return "".join(chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for path in sorted(ROOT.rglob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        if parse_markdown(text) != legacy_parse_markdown(text):
+            raise SystemExit(f"Results differ for {path}")
+
+    text = make_markdown_document(int(args.size_mb * 1024 * 1024))
+    if parse_markdown(text) != legacy_parse_markdown(text):
+        raise SystemExit("Results differ for the synthetic document")
+
+    size_mb = len(text.encode()) / (1024 * 1024)
+    print(f"Document: {size_mb:.1f} MB, {text.count(chr(10))} lines")
+    timings = {}
+    for label, func in (
+        ("line loop", legacy_parse_markdown),
+        ("scanner", parse_markdown),
+    ):
+        best = min(timeit.repeat(
+            lambda func=func: func(text), number=1, repeat=args.repeat
+        ))
+        timings[label] = best
+        print(f"{label:>10}: {best:.3f} s ({size_mb / best:.1f} MB/s)")
+    print(f"   speedup: {timings['line loop'] / timings['scanner']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
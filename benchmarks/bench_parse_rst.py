@@ -0,0 +1,120 @@
+"""
+Throughput benchmark: ``parse_rst`` against the original line loop.
+
+Usage::
+
+    python -m benchmarks.bench_parse_rst [--size-mb 8] [--repeat 5]
+
+Both parsers are run over a synthetic, autogenerated API-reference style
+reStructuredText document (and over every reStructuredText file of this
+repository); results are checked for equality before any timing is
+reported.
+"""
+import argparse
+import timeit
+from pathlib import Path
+
+from pytest_codeblock.rst import parse_rst
+
+from .legacy import legacy_parse_rst
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "main",
+    "make_rst_document",
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SECTION = """\
+module_{n}
+=========={underline}
+
+.. py:module:: package.module_{n}
+
+.. py:class:: Client{n}(host, port=8080, *, timeout=None)
+
+   Client for the service number {n}. Connections are opened lazily and
+   kept alive between requests; see :py:meth:`close` for the details.
+
+   :param host: Host name to connect to.
+   :param port: Port number to connect to.
+   :param timeout: Socket timeout in seconds, ``None`` disables it.
+
+   .. py:method:: request(method, path, **kwargs)
+
+      Send a request and return the decoded response body.
+
+      :param method: HTTP method name.
+      :param path: Path relative to the base URL.
+      :returns: Response body.
+      :rtype: dict
+
+   .. py:method:: close()
+
+      Close all open connections.
+
+.. pytestmark: django_db
+.. code-block:: python
+   :name: test_client_{n}
+
+   from package.module_{n} import Client{n}
+
+   client = Client{n}("localhost")
+   assert client
+
+Example usage::
+
+    client = Client{n}("example.com", port=443)
+    client.close()
+
+"""
+
+
+def make_rst_document(size: int) -> str:
+    """Build a synthetic reStructuredText document of ~`size` characters."""
+    chunks = []
+    total = 0
+    n = 0
+    while total < size:
+        chunk = SECTION.format(n=n, underline="=" * len(str(n)))
+        chunks.append(chunk)
+        total += len(chunk)
+        n += 1
+    return "".join(chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for path in sorted(ROOT.rglob("*.rst")):
+        text = path.read_text(encoding="utf-8")
+        if parse_rst(text, path) != legacy_parse_rst(text, path):
+            raise SystemExit(f"Results differ for {path}")
+
+    text = make_rst_document(int(args.size_mb * 1024 * 1024))
+    if parse_rst(text, ROOT) != legacy_parse_rst(text, ROOT):
+        raise SystemExit("Results differ for the synthetic document")
+
+    size_mb = len(text.encode()) / (1024 * 1024)
+    print(f"Document: {size_mb:.1f} MB, {text.count(chr(10))} lines")
+    timings = {}
+    for label, func in (
+        ("line loop", legacy_parse_rst),
+        ("scanner", parse_rst),
+    ):
+        best = min(timeit.repeat(
+            lambda func=func: func(text, ROOT), number=1, repeat=args.repeat
+        ))
+        timings[label] = best
+        print(f"{label:>10}: {best:.3f} s ({size_mb / best:.1f} MB/s)")
+    print(f"   speedup: {timings['line loop'] / timings['scanner']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Collection benchmark: byte-level pre-scan against decoding and parsing.
+
+Usage::
+
+    python -m benchmarks.bench_prescan [--files 500] [--size-kb 64]
+
+A temporary docs tree of prose-only Markdown and reStructuredText files is
+written to disk. For every file the pre-scan must agree with the parser
+that there is nothing to collect before any timing is reported.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from pytest_codeblock.config import get_config
+from pytest_codeblock.md import parse_markdown
+from pytest_codeblock.prescan import has_markdown_codeblocks, has_rst_codeblocks
+from pytest_codeblock.rst import parse_rst
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("main",)
+
+PARAGRAPH = """\
+Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod
+tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam,
+quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo.
+
+"""
+
+MD_SHELL_BLOCK = "```sh\npip install pytest-codeblock\n```\n\n"
+
+RST_SHELL_BLOCK = ".. code-block:: sh\n\n   pip install pytest-codeblock\n\n"
+
+
+def _write_tree(root: Path, files: int, size: int) -> list[Path]:
+    paths = []
+    for n in range(files):
+        md = n % 2 == 0
+        block = MD_SHELL_BLOCK if md else RST_SHELL_BLOCK
+        unit = PARAGRAPH * 8 + block
+        path = root / f"doc_{n}.{'md' if md else 'rst'}"
+        path.write_text(unit * (size // len(unit) + 1), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    config = get_config()
+
+    def prescan(paths):
+        return [
+            has_markdown_codeblocks(path, config.all_md_codeblocks)
+            if path.suffix == ".md"
+            else has_rst_codeblocks(path, config.all_rst_codeblocks)
+            for path in paths
+        ]
+
+    def parse(paths):
+        return [
+            bool(
+                parse_markdown(path.read_text(encoding="utf-8"))
+                if path.suffix == ".md"
+                else parse_rst(path.read_text(encoding="utf-8"), path)
+            )
+            for path in paths
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_tree(Path(tmp), args.files, args.size_kb * 1024)
+        if any(prescan(paths)) or any(parse(paths)):
+            raise SystemExit("Prose-only documents were not recognised")
+
+        size_mb = sum(path.stat().st_size for path in paths) / (1024 * 1024)
+        print(f"Tree: {args.files} files, {size_mb:.1f} MB")
+        timings = {}
+        for label, func in (("parse", parse), ("pre-scan", prescan)):
+            best = min(timeit.repeat(
+                lambda func=func: func(paths), number=1, repeat=args.repeat
+            ))
+            timings[label] = best
+            print(f"{label:>10}: {best:.3f} s ({size_mb / best:.1f} MB/s)")
+        print(f"   speedup: {timings['parse'] / timings['pre-scan']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
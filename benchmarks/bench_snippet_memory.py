@@ -0,0 +1,76 @@
+"""
+Memory benchmark: slotted snippets with interned marks against the original
+dataclass.
+
+Usage::
+
+    python -m benchmarks.bench_snippet_memory [--snippets 100000]
+
+Snippets are parsed from a synthetic Markdown document and then built again
+in both representations, the way the parsers build them (from the pending
+mark and fixture lists). The code and name strings are shared by both, so
+the figures are the per-snippet overhead only.
+"""
+import argparse
+import gc
+import tracemalloc
+from itertools import cycle, islice
+
+from pytest_codeblock.collector import CodeSnippet
+from pytest_codeblock.md import parse_markdown
+
+from .bench_parse_markdown import make_markdown_document
+from .legacy import LegacyCodeSnippet
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("main",)
+
+
+def _retained(build) -> tuple[int, list]:
+    """Bytes still allocated once `build` has returned, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snippets", type=int, default=100_000)
+    args = parser.parse_args()
+
+    parsed = parse_markdown(make_markdown_document(1024 * 1024))
+    source = list(islice(cycle(parsed), args.snippets))
+
+    results = {}
+    for label, cls in (
+        ("dataclass", LegacyCodeSnippet),
+        ("slotted", CodeSnippet),
+    ):
+        size, snippets = _retained(lambda cls=cls: [
+            cls(
+                code=sn.code,
+                line=sn.line,
+                name=sn.name,
+                marks=list(sn.marks),
+                fixtures=list(sn.fixtures),
+                group=sn.group,
+            )
+            for sn in source
+        ])
+        assert [sn.code for sn in snippets] == [sn.code for sn in source]
+        results[label] = size
+        del snippets
+        print(
+            f"{label:>10}: {size / (1024 * 1024):.1f} MB "
+            f"({size / len(source):.0f} bytes per snippet)"
+        )
+    print(f" reduction: {results['dataclass'] / results['slotted']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
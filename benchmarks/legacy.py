@@ -0,0 +1,387 @@
+"""
+Reference implementations of the original line-by-line parsers.
+
+Kept verbatim (apart from the function names) so that benchmarks can
+measure the current scanners against them and check that both produce
+identical results.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from pytest_codeblock.collector import CodeSnippet
+from pytest_codeblock.config import get_config
+from pytest_codeblock.constants import CODEBLOCK_MARK
+from pytest_codeblock.rst import (
+    get_literalinclude_content,
+    resolve_literalinclude_path,
+)
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "LegacyCodeSnippet",
+    "legacy_parse_markdown",
+    "legacy_parse_rst",
+)
+
+
+@dataclass
+class LegacyCodeSnippet:
+    """The original mutable snippet, with a dict and lists per instance."""
+    code: str
+    line: int
+    name: Optional[str] = None
+    marks: list[str] = field(default_factory=list)
+    fixtures: list[str] = field(default_factory=list)
+    group: Optional[str] = None
+
+
+def legacy_parse_markdown(text: str) -> list[CodeSnippet]:
+    """
+    Parse Markdown text and extract Python code snippets as CodeSnippet
+    objects.
+    Supports:
+      - <!-- pytestmark: <mark> --> comments immediately before a code fence
+      - <!-- codeblock-name: <name> --> comments for naming
+      - <!-- continue: <name> --> comments for grouping with a named snippet
+      - Fenced code blocks with ```python (and optional name=<name> in the
+        info string)
+    Captures each snippet's name, code, starting line, and any pytest marks.
+    """
+    config = get_config()
+    snippets: list[CodeSnippet] = []
+    lines = text.splitlines()
+    pending_name: Optional[str] = None
+    pending_continue: Optional[str] = None
+    pending_marks: list[str] = [CODEBLOCK_MARK]
+    pending_fixtures: list[str] = []
+    in_block = False
+    fence = ""
+    block_indent = 0
+    code_buffer: list[str] = []
+    snippet_name: Optional[str] = None
+    start_line = 0
+
+    for idx, line in enumerate(lines, start=1):
+        stripped = line.strip()
+
+        if not in_block:
+            # Check for pytest mark comment
+            if stripped.startswith("<!--") and "pytestmark:" in stripped:
+                m = re.match(r"<!--\s*pytestmark:\s*(\w+)\s*-->", stripped)
+                if m:
+                    pending_marks.append(m.group(1))
+                continue
+
+            # Check for pytest fixture comment
+            if stripped.startswith("<!--") and "pytestfixture:" in stripped:
+                m = re.match(r"<!--\s*pytestfixture:\s*(\w+)\s*-->", stripped)
+                if m:
+                    pending_fixtures.append(m.group(1))
+                continue
+
+            # Check for continue comment
+            if stripped.startswith("<!--") and "continue:" in stripped:
+                m = re.match(r"<!--\s*continue:\s*(\S+)\s*-->", stripped)
+                if m:
+                    pending_continue = m.group(1)
+                continue
+
+            # Check for name comment
+            if stripped.startswith("<!--") and "codeblock-name:" in stripped:
+                m = re.match(
+                    r"<!--\s*codeblock-name:\s*([^ >]+)\s*-->", stripped
+                )
+                if m:
+                    pending_name = m.group(1)
+                continue
+
+            # Start of fenced code block?
+            if line.lstrip().startswith("```"):
+                indent = len(line) - len(line.lstrip())
+                m = re.match(r"^`{3,}", line.lstrip())
+                if not m:
+                    continue
+                fence = m.group(0)
+                info = line.lstrip()[len(fence):].strip()
+                parts = info.split(None, 1)
+                lang = parts[0].lower() if parts else ""
+                extra = parts[1] if len(parts) > 1 else ""
+                if lang in config.all_md_codeblocks:
+                    in_block = True
+                    block_indent = indent
+                    start_line = idx + 1
+                    code_buffer = []
+                    # Determine name from info string or pending comment
+                    snippet_name = None
+                    for token in extra.split():
+                        if (
+                            token.startswith("name=")
+                            or token.startswith("name:")
+                        ):
+                            snippet_name = (
+                                token.split("=", 1)[-1]
+                                if "=" in token
+                                else token.split(":", 1)[-1]
+                            )
+                            break
+                    if snippet_name is None:
+                        snippet_name = pending_name
+                    # Reset pending_name; marks stay until block closes
+                    pending_name = None
+
+        else:
+            # Inside a fenced code block
+            if line.lstrip().startswith(fence):
+                # End of block
+                in_block = False
+                code_text = "\n".join(code_buffer)
+                snippet_group = None
+                # Continue overrides snippet_name for grouping
+                if pending_continue:
+                    snippet_group = pending_continue
+                    pending_continue = None
+                snippets.append(CodeSnippet(
+                    name=snippet_name,
+                    code=code_text,
+                    line=start_line,
+                    marks=pending_marks.copy(),
+                    fixtures=pending_fixtures.copy(),
+                    group=snippet_group,
+                ))
+                # Reset pending marks after collecting
+                pending_marks = [CODEBLOCK_MARK]  # Reset to default
+                snippet_name = None
+                pending_fixtures.clear()  # Clear pending fixtures
+            else:
+                # Collect code lines (dedent by block_indent)
+                if line.strip() == "":
+                    code_buffer.append("")
+                else:
+                    if len(line) >= block_indent:
+                        code_buffer.append(line[block_indent:])
+                    else:
+                        code_buffer.append(line.lstrip())
+
+    return snippets
+
+
+def legacy_parse_rst(text: str, base_dir: Path) -> list[CodeSnippet]:
+    """
+    Parse an RST document into CodeSnippet objects, capturing:
+      - .. pytestmark: <mark>
+      - .. continue: <name>
+      - .. codeblock-name: <name>
+      - .. code-block:: python
+    """
+    config = get_config()
+    snippets: list[CodeSnippet] = []
+    lines = text.splitlines()
+    n = len(lines)
+
+    pending_name: Optional[str] = None
+    pending_marks: list[str] = [CODEBLOCK_MARK]
+    pending_fixtures: list[str] = []
+    pending_continue: Optional[str] = None
+    i = 0
+
+    while i < n:
+        line = lines[i]
+
+        # --------------------------------------------------------------------
+        # Collect `.. pytestmark: xyz`
+        # --------------------------------------------------------------------
+        m = re.match(r"^\s*\.\.\s*pytestmark:\s*(\w+)\s*$", line)
+        if m:
+            pending_marks.append(m.group(1))
+            i += 1
+            continue
+
+        # --------------------------------------------------------------------
+        # Collect `.. pytestfixture: foo`
+        # --------------------------------------------------------------------
+        m = re.match(r"^\s*\.\.\s*pytestfixture:\s*(\w+)\s*$", line)
+        if m:
+            pending_fixtures.append(m.group(1))
+            i += 1
+            continue
+
+        # --------------------------------------------------------------------
+        # The `.. literalinclude` directive
+        # --------------------------------------------------------------------
+        if line.strip().startswith(".. literalinclude::"):
+            path = line.split(".. literalinclude::", 1)[1].strip()
+            name = None
+
+            # Look ahead for name
+            j = i + 1
+            while j < len(lines) and lines[j].strip():
+                if ":name:" in lines[j]:
+                    name = lines[j].split(":name:", 1)[1].strip()
+                    break
+                j += 1
+
+            if name and name.startswith("test_"):
+                full_path = resolve_literalinclude_path(base_dir, path)
+                if full_path:
+                    snippet = CodeSnippet(
+                        code=get_literalinclude_content(full_path),
+                        line=i + 1,
+                        name=name,
+                        marks=pending_marks.copy(),
+                        fixtures=pending_fixtures.copy(),
+                    )
+                    snippets.append(snippet)
+                    pending_marks = [CODEBLOCK_MARK]
+                    pending_fixtures.clear()
+
+            i = j + 1
+            continue
+
+        # --------------------------------------------------------------------
+        # Collect `.. continue: foo`
+        # --------------------------------------------------------------------
+        m = re.match(r"^\s*\.\.\s*continue:\s*(\S+)\s*$", line)
+        if m:
+            pending_continue = m.group(1)
+            i += 1
+            continue
+
+        # --------------------------------------------------------------------
+        # Collect `.. codeblock-name: foo`
+        # --------------------------------------------------------------------
+        m = re.match(r"^\s*\.\.\s*codeblock-name:\s*(\S+)\s*$", line)
+        if m:
+            pending_name = m.group(1)
+            i += 1
+            continue
+
+        # --------------------------------------------------------------------
+        # The `.. code-block` directive
+        # --------------------------------------------------------------------
+        m = re.match(r"^(\s*)\.\. (?:code-block|code)::\s*(\w+)", line)
+        if m:
+            base_indent = len(m.group(1))
+            lang = m.group(2).lower()
+            if lang in config.all_rst_codeblocks:
+                # Parse :name: option
+                name_val: Optional[str] = None
+                j = i + 1
+                while j < n:
+                    ln = lines[j]
+                    if not ln.strip():
+                        j += 1
+                        continue
+                    indent = len(ln) - len(ln.lstrip())
+                    if ln.lstrip().startswith(":") and indent > base_indent:
+                        opt = ln.lstrip()
+                        if opt.lower().startswith(":name:"):
+                            name_val = opt.split(":", 2)[2].strip().split()[0]
+                        j += 1
+                        continue
+                    break
+                # The j is first code line
+                if j >= n:
+                    i = j
+                    continue
+                first = lines[j]
+                content_indent = len(first) - len(first.lstrip())
+                if content_indent <= base_indent:
+                    i = j
+                    continue
+                # Collect code
+                buf: list[str] = []
+                k = j
+                while k < n:
+                    ln = lines[k]
+                    if not ln.strip():
+                        buf.append("")
+                        k += 1
+                        continue
+                    ind = len(ln) - len(ln.lstrip())
+                    if ind >= content_indent:
+                        buf.append(ln[content_indent:])
+                        k += 1
+                    else:
+                        break
+                sn_group = None
+                # Decide snippet name: continue overrides name_val/pending_name
+                if pending_continue:
+                    sn_group = pending_continue
+                    pending_continue = None
+                sn_name = name_val or pending_name
+                sn_marks = pending_marks.copy()
+                sn_fixtures = pending_fixtures.copy()
+                pending_name = None
+                pending_marks = [CODEBLOCK_MARK]  # clear pending marks
+                pending_fixtures.clear()
+
+                snippets.append(CodeSnippet(
+                    name=sn_name,
+                    code="\n".join(buf),
+                    line=j + 1,
+                    marks=sn_marks,
+                    fixtures=sn_fixtures,
+                    group=sn_group,
+                ))
+
+                i = k
+                continue
+            else:
+                i += 1
+                continue
+
+        # --------------------------------------------------------------------
+        # The literal-block via "::"
+        # --------------------------------------------------------------------
+        if line.rstrip().endswith("::") and pending_name:
+            # Similar override logic
+            sn_group = None
+            if pending_continue:
+                sn_group = pending_continue
+                pending_continue = None
+            sn_name = pending_name
+            sn_marks = pending_marks.copy()
+            sn_fixtures = pending_fixtures.copy()
+            pending_name = None
+            pending_marks = [CODEBLOCK_MARK]  # clear pending marks
+            pending_fixtures.clear()
+            j = i + 1
+            if j < n and not lines[j].strip():
+                j += 1
+            if j >= n:
+                i = j
+                continue
+            first = lines[j]
+            content_indent = len(first) - len(first.lstrip())
+            buf: list[str] = []
+            k = j
+            while k < n:
+                ln = lines[k]
+                if not ln.strip():
+                    buf.append("")
+                    k += 1
+                    continue
+                ind = len(ln) - len(ln.lstrip())
+                if ind >= content_indent:
+                    buf.append(ln[content_indent:])
+                    k += 1
+                else:
+                    break
+            snippets.append(CodeSnippet(
+                name=sn_name,
+                code="\n".join(buf),
+                line=j + 1,
+                marks=sn_marks,
+                fixtures=sn_fixtures,
+                group=sn_group,
+            ))
+            i = k
+            continue
+
+        i += 1
+
+    return snippets
@@ -15,6 +15,7 @@ __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
+    "closing",
     "http_request",
     "http_request_factory",
     "markdown_simple",
@@ -127,6 +128,23 @@ from django.db import models
 ```"""
 
 
+@pytest.fixture
+def closing():
+    """
+    Register objects to close at the end of the test (pools of workers,
+    schedulers and the like), in reverse order. Returns the object.
+    """
+    objects = []
+
+    def register(obj):
+        objects.append(obj)
+        return obj
+
+    yield register
+    while objects:
+        objects.pop().close()
+
+
 @pytest.fixture
 def pytester_subprocess(pytester):
     """
@@ -1,9 +1,21 @@
 from pathlib import Path
 
+import pytest
+
 from .config import get_config
-from .constants import CODEBLOCK_MARK, PYTESTRUN_MARK
-from .md import MarkdownFile
-from .rst import RSTFile
+from .constants import (
+    CODEBLOCK_MARK,
+    FORKED_MARK,
+    PYTESTRUN_MARK,
+    TIMEOUT_MARK,
+)
+from .dialects import find_dialect
+from .imports import ImportTimer, preload_modules
+from .parallel import ParsePool
+from .phases import PhaseTimer
+from .scheduling import PytestrunScheduler
+from .timeouts import Durations
+from .workers import PytestrunPool
 
 __title__ = "pytest-codeblock"
 __version__ = "0.5.9"
@@ -11,23 +23,172 @@ __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
+    "pytest_addoption",
     "pytest_collect_file",
+    "pytest_collection",
+    "pytest_collection_finish",
     "pytest_configure",
+    "pytest_runtest_call",
+    "pytest_runtest_makereport",
+    "pytest_sessionfinish",
+    "pytest_sessionstart",
+    "pytest_terminal_summary",
 )
 
 
+def pytest_addoption(parser):
+    """Register command line options."""
+    group = parser.getgroup("codeblock", "pytest-codeblock")
+    group.addoption(
+        "--codeblock-parse-workers",
+        action="store",
+        type=int,
+        default=0,
+        metavar="N",
+        dest="codeblock_parse_workers",
+        help=(
+            "Parse documentation files in N worker processes ahead of "
+            "collection (default: 0, parse during collection)."
+        ),
+    )
+    group.addoption(
+        "--codeblock-import-report",
+        action="store",
+        type=int,
+        default=0,
+        metavar="N",
+        dest="codeblock_import_report",
+        help=(
+            "Report the N slowest imports made by code blocks "
+            "(default: 0, disabled)."
+        ),
+    )
+    group.addoption(
+        "--codeblock-durations",
+        action="store",
+        type=int,
+        default=0,
+        metavar="N",
+        dest="codeblock_durations",
+        help=(
+            "Report the N slowest code blocks, split into phases "
+            "(default: 0, disabled)."
+        ),
+    )
+    group.addoption(
+        "--codeblock-durations-json",
+        action="store",
+        default=None,
+        metavar="PATH",
+        dest="codeblock_durations_json",
+        help="Write the phases of all code blocks to PATH as JSON.",
+    )
+
+
+def pytest_sessionstart(session):
+    """
+    Start timing imports and phases of code blocks, import the modules to
+    preload, load the durations of code blocks in earlier runs and set up
+    the pool of pytestrun workers and the scheduler of pytestrun code
+    blocks.
+    """
+    ImportTimer.start(session)
+    PhaseTimer.start(session)
+    preload_modules(session)
+    Durations.start(session)
+    PytestrunPool.start(session)
+    PytestrunScheduler.start(session)
+
+
 def pytest_collect_file(parent, path):
-    """Collect .md and .rst files for codeblock tests."""
+    """Collect .md and .rst files (and those of other dialects)."""
     config = get_config()
-    # Determine file extension (works for py.path or pathlib.Path)
-    file_name = str(path).lower()
-    if any(file_name.endswith(ext) for ext in config.all_md_extensions):
-        # Use the MarkdownFile collector for Markdown files
-        return MarkdownFile.from_parent(parent=parent, path=Path(path))
-    if any(file_name.endswith(ext) for ext in config.all_rst_extensions):
-        # Use the RSTFile collector for reStructuredText files
-        return RSTFile.from_parent(parent=parent, path=Path(path))
-    return None
+    # Determine the dialect by file extension (py.path or pathlib.Path)
+    dialect = find_dialect(path, config)
+    if dialect is None:
+        return None
+    # Skip documents without a single candidate code block
+    if not dialect.has_codeblocks(path, config):
+        return None
+    return dialect.collect_file(parent, Path(path))
+
+
+def pytest_collection(session):
+    """Start parsing documentation files in parallel, if enabled."""
+    ParsePool.start(session)
+
+
+def pytest_collection_finish(session):
+    """
+    Shut the parse workers down once collection is done, and start the
+    selected pytestrun code blocks ahead of their items, if enabled.
+    """
+    ParsePool.stop(session)
+    PytestrunScheduler.schedule(session)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Time the imports made by code blocks."""
+    timer = ImportTimer.from_pytest_config(item.config)
+    if timer is None or item.get_closest_marker(CODEBLOCK_MARK) is None:
+        yield
+        return
+    with timer.measure(item.nodeid):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Record the durations of passing code blocks and the time of setting up
+    their fixtures.
+    """
+    outcome = yield
+    if item.get_closest_marker(CODEBLOCK_MARK) is None:
+        return
+    report = outcome.get_result()
+    durations = Durations.from_pytest_config(item.config)
+    if durations is not None and report.when == "call" and report.passed:
+        # Code blocks started ahead ran for longer than their items waited
+        scheduler = PytestrunScheduler.from_pytest_config(item.config)
+        duration = report.duration
+        if scheduler is not None:
+            duration = scheduler.durations.get(report.nodeid, duration)
+        durations.record(report.nodeid, duration)
+    timer = PhaseTimer.from_pytest_config(item.config)
+    if timer is not None and report.when == "setup":
+        timer.add(report.nodeid, "setup", report.duration)
+
+
+def pytest_sessionfinish(session):
+    """
+    Stop timing imports, store the durations of code blocks, write their
+    phases out and stop the pytestrun code blocks still running and their
+    workers.
+    """
+    ImportTimer.stop(session)
+    PhaseTimer.stop(session)
+    PytestrunScheduler.stop(session)
+    PytestrunPool.stop(session)
+    Durations.stop(session)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report the slowest imports made by code blocks and their phases."""
+    pytest_config = terminalreporter.config
+    timer = ImportTimer.from_pytest_config(pytest_config)
+    if timer is not None:
+        timer.report(
+            terminalreporter,
+            pytest_config.getoption("codeblock_import_report"),
+        )
+    phase_timer = PhaseTimer.from_pytest_config(pytest_config)
+    if phase_timer is not None:
+        phase_timer.report(
+            terminalreporter,
+            pytest_config.getoption("codeblock_durations"),
+        )
 
 
 def pytest_configure(config):
@@ -48,3 +209,17 @@ def pytest_configure(config):
             "markers",
             f"{PYTESTRUN_MARK}: pytest-codeblock markers (auto-registered)",
         )
+    # Only register if not already present
+    if FORKED_MARK not in marker_names:
+        config.addinivalue_line(
+            "markers",
+            f"{FORKED_MARK}: run the code block in a child forked from "
+            "the pytest process (os.fork only; do not use while other "
+            "threads run, which may deadlock the child)",
+        )
+    # Only register if not already present (e.g. by pytest-timeout)
+    if TIMEOUT_MARK not in marker_names:
+        config.addinivalue_line(
+            "markers",
+            f"{TIMEOUT_MARK}: pytest-codeblock markers (auto-registered)",
+        )
@@ -0,0 +1,324 @@
+"""
+Batches of ``pytestrun`` code blocks run in one child pytest session.
+
+Instead of a pytest subprocess per code block, the code blocks of a
+document (or of the whole session) are written as modules of temporary
+packages and run together. The results of their tests are read back from
+the JUnit XML report of the child session and reported by the items of
+the code blocks they came from.
+"""
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import pytest
+
+from .pytestrun import _run_subprocess
+from .workers import PytestrunPool
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "PytestrunBatch",
+    "batch_key",
+    "may_run",
+)
+
+batch_key = pytest.StashKey["PytestrunBatch"]()
+
+# Name of the JUnit XML report of the child session
+REPORT_NAME = "report.xml"
+
+
+@dataclass
+class _Block:
+    name: str
+    code: str
+    path: str
+    timeout: Optional[float]
+
+
+def _conditions_hold(item: pytest.Item, mark: pytest.Mark) -> bool:
+    """
+    Whether `mark` applies to `item`: it has no condition, or one of its
+    conditions is true. String conditions are evaluated the way pytest
+    does, with ``os``, ``sys``, ``platform`` and ``config`` available.
+    """
+    conditions = mark.args
+    if "condition" in mark.kwargs:
+        conditions = (mark.kwargs["condition"],)
+    if not conditions:
+        return True
+    namespace = {
+        "os": os,
+        "sys": sys,
+        "platform": platform,
+        "config": item.config,
+    }
+    for condition in conditions:
+        if isinstance(condition, str):
+            code = compile(condition, f"<{mark.name} condition>", "eval")
+            condition = eval(code, namespace)
+        if condition:
+            return True
+    return False
+
+
+def may_run(item: pytest.Item) -> bool:
+    """
+    Whether the test of `item` may run once its turn comes: False if a
+    ``skip``, ``skipif`` or ``xfail(run=False)`` mark keeps it from running
+    (or its condition fails to evaluate).
+    """
+    try:
+        if any(True for _ in item.iter_markers(name="skip")):
+            return False
+        for mark in item.iter_markers(name="skipif"):
+            if _conditions_hold(item, mark):
+                return False
+        if item.config.option.runxfail:
+            return True
+        for mark in item.iter_markers(name="xfail"):
+            if _conditions_hold(item, mark):
+                return mark.kwargs.get("run", True)
+    except Exception:
+        return False
+    return True
+
+
+def _module_of(
+    testcase: ET.Element,
+    project_root: str,
+    modules: dict[str, str],
+) -> Optional[str]:
+    """
+    Path of the module of `modules` a test case of the report came from, or
+    None. Reports of collection errors may have no ``file`` attribute, but
+    name the module (e.g. ``pytest_codeblock_x1y2.test_block``) instead.
+    """
+    if testcase.get("file"):
+        path = os.path.normpath(
+            os.path.join(project_root, testcase.get("file", ""))
+        )
+        return path if path in modules else None
+    dotted = [testcase.get("classname") or "", testcase.get("name") or ""]
+    for module in modules:
+        package, filename = os.path.split(module)
+        # Packages have names of their own, so the name is unique
+        name = f"{os.path.basename(package)}.{filename[:-3]}"
+        if any(d == name or d.endswith(f".{name}") for d in dotted):
+            return module
+    return None
+
+
+def _failures(testcase: ET.Element) -> list[str]:
+    """Failures and errors reported for a test case."""
+    return [
+        f"{testcase.get('name')}: {element.text or element.get('message')}"
+        for element in testcase
+        if element.tag in ("failure", "error")
+    ]
+
+
+class PytestrunBatch:
+    """
+    ``pytestrun`` code blocks run together in one child pytest session, in
+    a worker of `pool` if given, or else in a new subprocess.
+
+    The batch runs once the first of its code blocks runs, taking along
+    the other code blocks selected in the session that have not run yet.
+    Each code block is written to a package next to its document, so that
+    the child session finds the same ``conftest.py`` files as for a code
+    block run on its own.
+    """
+
+    def __init__(
+        self,
+        session: pytest.Session,
+        pool: Optional[PytestrunPool] = None,
+    ) -> None:
+        self.session = session
+        self.pool = pool
+        self.blocks: dict[str, _Block] = {}
+        # Node ID -> error to raise, or None if the tests passed
+        self.results: dict[str, Optional[Exception]] = {}
+        # Code blocks may be run from threads, see ``pytestrun_concurrency``
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def of(node: pytest.Collector, scope: str) -> Optional["PytestrunBatch"]:
+        """
+        The batch of the document `node` for the ``pytestrun_batch`` scope:
+        one per document (``file``), one for the session (``session``), or
+        None for code blocks run on their own (``block``).
+        """
+        holder: Union[pytest.Collector, pytest.Config]
+        if scope == "file":
+            holder = node
+        elif scope == "session":
+            holder = node.config
+        else:
+            return None
+        batch = holder.stash.get(batch_key, None)
+        if batch is None:
+            batch = holder.stash[batch_key] = PytestrunBatch(
+                node.session, PytestrunPool.from_pytest_config(node.config)
+            )
+        return batch
+
+    def add(
+        self,
+        nodeid: str,
+        name: str,
+        code: str,
+        path: str,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Add the code block of item `nodeid` to the batch."""
+        self.blocks[nodeid] = _Block(name, code, path, timeout)
+
+    def run(self, nodeid: str) -> None:
+        """
+        Report the results of the code block of item `nodeid`, running the
+        batch first if it has not run yet. Raises AssertionError on any
+        test failures, and TimeoutError if the batch timed out.
+        """
+        with self.lock:
+            if nodeid not in self.results:
+                # Code blocks skipped in the session are left out
+                selected = {
+                    item.nodeid
+                    for item in self.session.items
+                    if may_run(item)
+                }
+                self.results.update(
+                    self._run_blocks(
+                        [
+                            other
+                            for other in self.blocks
+                            if other not in self.results
+                            and (other in selected or other == nodeid)
+                        ]
+                    )
+                )
+            error = self.results[nodeid]
+        if error is not None:
+            raise error
+
+    def _run_blocks(
+        self,
+        nodeids: list[str],
+    ) -> dict[str, Optional[Exception]]:
+        """Run the code blocks of `nodeids` in one child session."""
+        project_root = os.getcwd()
+        # Package of the code blocks of each directory, by directory
+        packages: dict[str, str] = {}
+        # Node ID of the code block each module was written for
+        modules: dict[str, str] = {}
+        try:
+            for nodeid in nodeids:
+                modules[self._write(nodeid, packages)] = nodeid
+            report = os.path.join(next(iter(packages.values())), REPORT_NAME)
+            args = [
+                *modules,
+                f"--rootdir={project_root}",
+                "--no-header",
+                "-q",
+                f"--junitxml={report}",
+                "-o",
+                "junit_family=xunit1",
+                # A code block failing to import fails on its own
+                "--continue-on-collection-errors",
+            ]
+            timeouts = [self.blocks[nodeid].timeout for nodeid in nodeids]
+            timeout = sum(t for t in timeouts if t) if all(timeouts) else None
+            try:
+                if self.pool is not None:
+                    returncode, output = self.pool.run(
+                        args, next(iter(modules)), project_root, timeout
+                    )
+                else:
+                    returncode, output = _run_subprocess(
+                        args, project_root, timeout
+                    )
+            except subprocess.TimeoutExpired:
+                return {
+                    nodeid: TimeoutError(
+                        f"pytestrun batch of `{self.blocks[nodeid].name}` "
+                        f"timed out after {timeout:g} seconds"
+                    )
+                    for nodeid in nodeids
+                }
+            return self._read_report(
+                report, project_root, modules, output.strip()
+            )
+        finally:
+            for package in packages.values():
+                shutil.rmtree(package, ignore_errors=True)
+
+    def _write(self, nodeid: str, packages: dict[str, str]) -> str:
+        """Write the code block of `nodeid` as a module, returning its path."""
+        block = self.blocks[nodeid]
+        source_dir = os.path.dirname(os.path.abspath(block.path))
+        package = packages.get(source_dir)
+        if package is None:
+            pytest_cache_dir = os.path.join(source_dir, ".pytest_cache")
+            os.makedirs(pytest_cache_dir, exist_ok=True)
+            package = packages[source_dir] = tempfile.mkdtemp(
+                prefix="pytest_codeblock_", dir=pytest_cache_dir
+            )
+            open(os.path.join(package, "__init__.py"), "w").close()
+        # Documents of a directory may have code blocks of the same name
+        module = os.path.join(package, f"{block.name}.py")
+        counter = 1
+        while os.path.exists(module):
+            counter += 1
+            module = os.path.join(package, f"{block.name}_{counter}.py")
+        with open(module, "w") as f:
+            f.write(block.code)
+        return module
+
+    def _read_report(
+        self,
+        report: str,
+        project_root: str,
+        modules: dict[str, str],
+        output: str,
+    ) -> dict[str, Optional[Exception]]:
+        """Map the test cases of the JUnit XML `report` to code blocks."""
+        try:
+            root = ET.parse(report).getroot()
+        except (OSError, ET.ParseError):
+            root = None
+        ran: dict[str, list[str]] = {}
+        for testcase in root.iter("testcase") if root is not None else ():
+            path = _module_of(testcase, project_root, modules)
+            if path is not None:
+                ran.setdefault(modules[path], []).extend(_failures(testcase))
+
+        results: dict[str, Optional[Exception]] = {}
+        for nodeid in modules.values():
+            block = self.blocks[nodeid]
+            if nodeid not in ran:
+                # No report (the session failed to start) or no tests
+                details = output
+                if root is not None:
+                    details = f"no tests ran\n\n{output}".strip()
+            elif ran[nodeid]:
+                details = "\n\n".join(ran[nodeid])
+            else:
+                results[nodeid] = None
+                continue
+            results[nodeid] = AssertionError(
+                f"pytestrun block `{block.name}` in {block.path} failed:\n\n"
+                f"{details}"
+            )
+        return results
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+from collections.abc import Iterable
+from contextlib import suppress
+from dataclasses import asdict
+from functools import lru_cache
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+from types import CodeType
+from typing import Any, Optional, Union
+
+from .collector import CodeSnippet
+from .config import Config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "BYTECODE_DIR",
+    "BytecodeCache",
+    "CACHE_KEY_PREFIX",
+    "ParseCache",
+)
+
+# Entries live under ``.pytest_cache/v/<CACHE_KEY_PREFIX>/``
+CACHE_KEY_PREFIX = "pytest-codeblock/parse"
+
+# Compiled snippets live under ``.pytest_cache/d/<BYTECODE_DIR>/``
+BYTECODE_DIR = "pytest-codeblock-bytecode"
+
+# Flag set in the header of compiled snippets with top-level ``await``
+_FLAG_ASYNC = 0x01
+
+# Header: magic number, flags, SHA-256 digest of the snippet source
+_HEADER_SIZE = len(MAGIC_NUMBER) + 1 + 32
+
+# Files modified this close (in nanoseconds) to the moment they were cached
+# may have changed again within the same mtime tick. Their content hash is
+# always checked.
+_RACY_NS = 2_000_000_000
+
+_MISSING = (-1, -1)
+
+
+def _file_digest(path: Union[str, Path]) -> str:
+    """SHA-256 hex digest of the content of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat(path: Union[str, Path]) -> tuple[int, int]:
+    """Size and mtime (in nanoseconds) of `path`, or ``_MISSING``."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return _MISSING
+    return st.st_size, st.st_mtime_ns
+
+
+@lru_cache(maxsize=None)
+def _digest(
+    nameless: bool,
+    cwd: str,
+    version: str,
+    dialects: tuple[tuple[str, tuple[str, ...]], ...],
+) -> str:
+    payload = json.dumps(
+        {
+            "nameless": nameless,
+            "cwd": cwd,
+            "version": version,
+            "dialects": dialects,
+        },
+        sort_keys=True,
+        default=list,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _config_digest(
+    config: Config,
+    version: str,
+    dialects: tuple[tuple[str, tuple[str, ...]], ...] = (),
+) -> str:
+    """
+    Digest of everything besides the file itself that affects parsing: the
+    `dialects` (by name, with the languages they test) and whether nameless
+    code blocks are tested. Settings of how code blocks run do not
+    invalidate the cache.
+    """
+    # Literal includes are resolved against the working directory
+    return _digest(
+        config.test_nameless_codeblocks, os.getcwd(), version, dialects
+    )
+
+
+class ParseCache:
+    """
+    Snippets collected from documentation files, stored in the pytest cache.
+
+    Entries are keyed by the absolute path of the document. An entry is
+    used as long as the size and mtime of the document (or, when these do
+    not match or are too recent to trust, its content hash) are unchanged,
+    the plugin version and the settings that affect parsing are the same,
+    and none of its dependencies (files pulled in by ``literalinclude``,
+    including those that did not exist) has changed.
+    """
+
+    def __init__(self, cache: Any, config: Config) -> None:
+        # Imported here, as the package imports the collectors first
+        from . import __version__
+        from .dialects import get_dialects
+
+        self.cache = cache
+        # A file may be parsed by another dialect once plugins change
+        dialects = tuple(
+            (
+                f"{type(dialect).__module__}.{type(dialect).__qualname__}",
+                tuple(dialect.languages(config)),
+            )
+            for dialect in get_dialects()
+        )
+        self.digest = _config_digest(config, __version__, dialects)
+
+    @classmethod
+    def from_pytest_config(
+        cls,
+        pytest_config: Any,
+        config: Config,
+    ) -> Optional["ParseCache"]:
+        """Parse cache of a session, or None if caching is unavailable."""
+        cache = getattr(pytest_config, "cache", None)
+        if cache is None or not config.parse_cache:
+            return None
+        return cls(cache, config)
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        name = hashlib.sha256(os.fsencode(os.path.abspath(path))).hexdigest()
+        return f"{CACHE_KEY_PREFIX}/{name}"
+
+    def get(self, path: Union[str, Path]) -> Optional[list[CodeSnippet]]:
+        """Return the cached snippets of `path`, or None on a miss."""
+        key = self._key(path)
+        entry = self.cache.get(key, None)
+        if not isinstance(entry, dict) or entry.get("digest") != self.digest:
+            return None
+        try:
+            size, mtime_ns = _stat(path)
+            if size != entry["size"]:
+                return None
+            for dep_path, dep_size, dep_mtime_ns in entry["dependencies"]:
+                if _stat(dep_path) != (dep_size, dep_mtime_ns):
+                    return None
+            snippets = [CodeSnippet(**fields) for fields in entry["snippets"]]
+            if (
+                mtime_ns != entry["mtime_ns"]
+                or mtime_ns >= entry["cached_ns"] - _RACY_NS
+            ):
+                if _file_digest(path) != entry["sha256"]:
+                    return None
+                # Same content: refresh the entry, so that the next run can
+                # trust the stat again.
+                entry["mtime_ns"] = mtime_ns
+                entry["cached_ns"] = time.time_ns()
+                self.cache.set(key, entry)
+            return snippets
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def set(
+        self,
+        path: Union[str, Path],
+        snippets: Iterable[CodeSnippet],
+        dependencies: Iterable[Union[str, Path]] = (),
+    ) -> None:
+        """Store the snippets of `path` along with its dependencies."""
+        cached_ns = time.time_ns()
+        try:
+            size, mtime_ns = _stat(path)
+            sha256 = _file_digest(path)
+        except OSError:
+            return
+        self.cache.set(self._key(path), {
+            "path": os.path.abspath(path),
+            "digest": self.digest,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": sha256,
+            "cached_ns": cached_ns,
+            "dependencies": [
+                [os.path.abspath(dep), *_stat(dep)]
+                for dep in dict.fromkeys(map(str, dependencies))
+            ],
+            "snippets": [asdict(sn) for sn in snippets],
+        })
+
+
+class BytecodeCache:
+    """
+    Compiled snippets, stored in the pytest cache.
+
+    This is to snippets what ``__pycache__`` is to modules: reruns load the
+    marshalled code object instead of parsing the snippet twice (once to
+    look for top-level ``await``, once to compile it). There is one entry
+    per snippet of a file, for each Python version. An entry records the
+    magic number of the interpreter, whether the snippet has top-level
+    ``await`` (and is to be run as a coroutine), and the hash of the source
+    it was compiled from; it is only used while all of them match.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    @classmethod
+    def from_pytest_config(
+        cls,
+        pytest_config: Any,
+        config: Config,
+    ) -> Optional["BytecodeCache"]:
+        """Bytecode cache of a session, or None if caching is unavailable."""
+        cache = getattr(pytest_config, "cache", None)
+        if (
+            cache is None
+            or not config.bytecode_cache
+            or sys.implementation.cache_tag is None
+        ):
+            return None
+        try:
+            return cls(cache.mkdir(BYTECODE_DIR))
+        except OSError:
+            return None
+
+    def _path(self, path: Union[str, Path], name: str) -> Path:
+        key = hashlib.sha256(
+            os.fsencode(f"{os.path.abspath(path)}\0{name}")
+        ).hexdigest()
+        return self.directory / f"{key}.{sys.implementation.cache_tag}"
+
+    @staticmethod
+    def _source_digest(code: str) -> bytes:
+        return hashlib.sha256(code.encode("utf-8", "surrogatepass")).digest()
+
+    def get(
+        self,
+        code: str,
+        path: Union[str, Path],
+        name: str,
+    ) -> Optional[tuple[bool, CodeType]]:
+        """
+        Return whether the snippet `name` of `path` has top-level ``await``
+        along with its code object, or None if `code` has not been compiled
+        before.
+        """
+        try:
+            with open(self._path(path, name), "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        magic_size = len(MAGIC_NUMBER)
+        if (
+            data[:magic_size] != MAGIC_NUMBER
+            or data[magic_size + 1:_HEADER_SIZE] != self._source_digest(code)
+        ):
+            return None
+        try:
+            compiled = marshal.loads(memoryview(data)[_HEADER_SIZE:])
+        except (EOFError, TypeError, ValueError):
+            return None
+        if not isinstance(compiled, CodeType):
+            return None
+        return bool(data[magic_size] & _FLAG_ASYNC), compiled
+
+    def set(
+        self,
+        code: str,
+        path: Union[str, Path],
+        name: str,
+        is_async: bool,
+        compiled: CodeType,
+    ) -> None:
+        """Store `compiled`, the code object of snippet `name` of `path`."""
+        if sys.dont_write_bytecode:
+            return
+        target = self._path(path, name)
+        # Written aside and moved into place, so that readers never see a
+        # partial entry
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(
+                MAGIC_NUMBER
+                + bytes((_FLAG_ASYNC if is_async else 0,))
+                + self._source_digest(code)
+                + marshal.dumps(compiled)
+            )
+            os.replace(tmp, target)
+        except OSError:
+            with suppress(OSError):
+                tmp.unlink()
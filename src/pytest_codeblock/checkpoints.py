@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+import pytest
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("StepChain",)
+
+# Runs the code of a step (name, code) in the given globals
+Execute = Callable[[str, str, dict[str, Any]], None]
+
+
+class StepChain:
+    """
+    Steps of an incremental group (``continue:`` blocks with names of their
+    own), run on a checkpoint instead of from the start.
+
+    Step *k* of a group is tested with the code of steps 1..k. Rather than
+    running all of it for every step, the chain keeps the globals left by
+    the steps run so far and runs only the code of step *k* in them, so
+    that every step runs once. Steps skipped (e.g. deselected) are run when
+    a later step needs them, and a step run after a later one is replayed
+    from the start in globals of its own. Every step sees only its own
+    fixtures: those of earlier steps are dropped from the checkpoint before
+    it runs. Once a step fails, the steps after it fail with the same
+    error, as they would running its code.
+    """
+
+    def __init__(self, node: pytest.Collector) -> None:
+        self.node = node
+        # Name and own code of each step
+        self.steps: list[tuple[str, str]] = []
+        self.namespace: Optional[dict[str, Any]] = None
+        # Number of steps run in the namespace
+        self.done = 0
+        self.error: Optional[BaseException] = None
+        # Names of the fixtures of the last step run in the namespace
+        self.fixtures: set[str] = set()
+
+    def add(self, name: str, code: str) -> int:
+        """Add step `name` with its own `code`, returning its index."""
+        self.steps.append((name, code))
+        return len(self.steps) - 1
+
+    def _checkpoint(self) -> dict[str, Any]:
+        if self.namespace is None:
+            self.namespace = {"asyncio": asyncio}
+            # Dropped on teardown of the document
+            self.node.addfinalizer(self.reset)
+        return self.namespace
+
+    def reset(self) -> None:
+        """Drop the checkpoint."""
+        self.namespace = None
+        self.done = 0
+        self.error = None
+        self.fixtures = set()
+
+    def run(
+        self,
+        index: int,
+        fixtures: dict[str, Any],
+        execute: Execute,
+    ) -> None:
+        """Run step `index` with `fixtures`, running `execute` per step."""
+        if index < self.done:
+            globals_ = {"asyncio": asyncio, **fixtures}
+            for name, code in self.steps[: index + 1]:
+                execute(name, code, globals_)
+            return
+
+        if self.error is not None:
+            raise self.error
+        globals_ = self._checkpoint()
+        # Fixtures of an earlier step are not those of this one
+        for name in self.fixtures:
+            globals_.pop(name, None)
+        globals_.update(fixtures)
+        self.fixtures = set(fixtures)
+        for step in range(self.done, index + 1):
+            name, code = self.steps[step]
+            try:
+                execute(name, code, globals_)
+            except BaseException as err:
+                self.error = err
+                raise
+            self.done = step + 1
@@ -1,27 +1,72 @@
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from typing import Optional
 
+from .constants import TEST_PREFIX
+
 __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
     "CodeSnippet",
     "group_snippets",
+    "intern_names",
+    "is_test_name",
+    "is_test_name_or_nameless",
 )
 
+# Mark and fixture tuples handed out by ``intern_names``
+_INTERNED: dict[tuple[str, ...], tuple[str, ...]] = {}
+
 
-@dataclass
+def intern_names(names: Iterable[str]) -> tuple[str, ...]:
+    """
+    Return `names` as a tuple shared with every other equal one.
+
+    Documents repeat the same few mark and fixture combinations across
+    thousands of snippets, so each distinct combination is stored once.
+    """
+    names = tuple(names)
+    return _INTERNED.setdefault(names, names)
+
+
+@dataclass(frozen=True, slots=True)
 class CodeSnippet:
-    """Data container for an extracted code snippet."""
+    """
+    Data container for an extracted code snippet.
+
+    Snippets are immutable; use ``dataclasses.replace`` to derive one.
+    """
     code: str  # The code content
     line: int  # Starting line number in the source
     name: Optional[str] = None  # Identifier for grouping (None if anonymous)
-    marks: list[str] = field(default_factory=list)
-    # Collected pytest marks (e.g. ['django_db']), parsed from doc comments
-    fixtures: list[str] = field(default_factory=list)
-    # Collected pytest fixtures (e.g. ['tmp_path']), parsed from doc comments
+    marks: tuple[str, ...] = ()
+    # Collected pytest marks (e.g. ('django_db',)), parsed from doc comments
+    fixtures: tuple[str, ...] = ()
+    # Collected pytest fixtures (e.g. ('tmp_path',)), parsed from doc comments
     group: Optional[str] = None
     # Set by ``continue:`` directives; names the group this snippet belongs to
+    end_line: Optional[int] = field(default=None, compare=False)
+    # Last line of the block in the source, after which the parser state is
+    # clean again (None for literal includes)
+
+    def __post_init__(self) -> None:
+        # Equal marks and fixtures share one tuple
+        object.__setattr__(self, "marks", intern_names(self.marks))
+        object.__setattr__(self, "fixtures", intern_names(self.fixtures))
+
+
+def is_test_name(name: Optional[str]) -> bool:
+    """Whether a block named `name` is collected as a test."""
+    return name is not None and name.startswith(TEST_PREFIX)
+
+
+def is_test_name_or_nameless(name: Optional[str]) -> bool:
+    """
+    Whether a block named `name` is collected as a test when nameless
+    blocks are collected too (``test_nameless_codeblocks``).
+    """
+    return not name or name.startswith(TEST_PREFIX)
 
 
 def group_snippets(snippets: list[CodeSnippet]) -> list[CodeSnippet]:
@@ -34,7 +79,8 @@ def group_snippets(snippets: list[CodeSnippet]) -> list[CodeSnippet]:
     - Incremental mode: when every continuation snippet (``group`` set) in
       a group also carries its own distinct name, emit one test per snippet.
       Each test's code is the cumulative concatenation of all preceding
-      snippets plus itself, so each step is exercised in isolation.
+      snippets plus itself, so each step is exercised in isolation. These
+      tests keep the group key in ``group``.
 
     Unnamed snippets receive unique auto-keys so they are never merged.
     """
@@ -80,8 +126,9 @@ def group_snippets(snippets: list[CodeSnippet]) -> list[CodeSnippet]:
                     name=sn.name,
                     code=acc_code,
                     line=sn.line,
-                    marks=list(acc_marks),
-                    fixtures=list(acc_fixtures),
+                    marks=intern_names(acc_marks),
+                    fixtures=intern_names(acc_fixtures),
+                    group=key,
                 ))
         else:
             # Merge mode (default behaviour)
@@ -97,8 +144,8 @@ def group_snippets(snippets: list[CodeSnippet]) -> list[CodeSnippet]:
                 name=first.name,
                 code=merged_code,
                 line=first.line,
-                marks=merged_marks,
-                fixtures=merged_fixtures,
+                marks=intern_names(merged_marks),
+                fixtures=intern_names(merged_fixtures),
             ))
 
     return combined
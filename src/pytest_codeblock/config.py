@@ -25,6 +25,36 @@ DEFAULT_MD_CODEBLOCKS = ("py", "python", "python3")
 DEFAULT_RST_EXTENSIONS = (".rst",)
 DEFAULT_MD_EXTENSIONS = (".md", ".markdown")
 DEFAULT_TEST_NAMELESS_CODEBLOCKS = False
+DEFAULT_PARSE_CACHE = True
+DEFAULT_BYTECODE_CACHE = True
+DEFAULT_ASYNC_LOOP_SCOPE = "block"
+DEFAULT_UVLOOP = False
+DEFAULT_SHARED_NAMESPACE = ()
+DEFAULT_PRELOAD_MODULES = ()
+DEFAULT_FORKED = False
+DEFAULT_CHECKPOINT_STEPS = False
+DEFAULT_TIMEOUT = 0.0
+DEFAULT_ADAPTIVE_TIMEOUT = 0.0
+DEFAULT_PYTESTRUN_MODE = "subprocess"
+DEFAULT_PYTESTRUN_WORKERS = 1
+DEFAULT_PYTESTRUN_WORKER_MAX_BLOCKS = 100
+DEFAULT_PYTESTRUN_WORKER_MAX_RSS = 1024
+DEFAULT_PYTESTRUN_BATCH = "block"
+DEFAULT_PYTESTRUN_CONCURRENCY = 0
+DEFAULT_PYTESTRUN_ARGS = ()
+DEFAULT_PYTESTRUN_ADDOPTS = True
+DEFAULT_PYTESTRUN_AUTOLOAD = True
+DEFAULT_PYTESTRUN_PLUGINS = ()
+DEFAULT_PYTESTRUN_COVERAGE = False
+
+# Valid values of the ``async_loop_scope`` setting
+ASYNC_LOOP_SCOPES = ("block", "file", "session")
+
+# Valid values of the ``pytestrun_mode`` setting
+PYTESTRUN_MODES = ("subprocess", "inprocess", "pool")
+
+# Valid values of the ``pytestrun_batch`` setting
+PYTESTRUN_BATCHES = ("block", "file", "session")
 
 
 class Config:
@@ -41,6 +71,29 @@ class Config:
         md_extensions: tuple[str, ...] = DEFAULT_MD_EXTENSIONS,
         md_user_extensions: tuple[str, ...] = (),
         test_nameless_codeblocks: bool = DEFAULT_TEST_NAMELESS_CODEBLOCKS,
+        parse_cache: bool = DEFAULT_PARSE_CACHE,
+        bytecode_cache: bool = DEFAULT_BYTECODE_CACHE,
+        async_loop_scope: str = DEFAULT_ASYNC_LOOP_SCOPE,
+        uvloop: bool = DEFAULT_UVLOOP,
+        shared_namespace: tuple[str, ...] = DEFAULT_SHARED_NAMESPACE,
+        preload_modules: tuple[str, ...] = DEFAULT_PRELOAD_MODULES,
+        forked: bool = DEFAULT_FORKED,
+        checkpoint_steps: bool = DEFAULT_CHECKPOINT_STEPS,
+        timeout: float = DEFAULT_TIMEOUT,
+        adaptive_timeout: float = DEFAULT_ADAPTIVE_TIMEOUT,
+        pytestrun_mode: str = DEFAULT_PYTESTRUN_MODE,
+        pytestrun_workers: int = DEFAULT_PYTESTRUN_WORKERS,
+        pytestrun_worker_max_blocks: int = (
+            DEFAULT_PYTESTRUN_WORKER_MAX_BLOCKS
+        ),
+        pytestrun_worker_max_rss: int = DEFAULT_PYTESTRUN_WORKER_MAX_RSS,
+        pytestrun_batch: str = DEFAULT_PYTESTRUN_BATCH,
+        pytestrun_concurrency: int = DEFAULT_PYTESTRUN_CONCURRENCY,
+        pytestrun_args: tuple[str, ...] = DEFAULT_PYTESTRUN_ARGS,
+        pytestrun_addopts: bool = DEFAULT_PYTESTRUN_ADDOPTS,
+        pytestrun_autoload: bool = DEFAULT_PYTESTRUN_AUTOLOAD,
+        pytestrun_plugins: tuple[str, ...] = DEFAULT_PYTESTRUN_PLUGINS,
+        pytestrun_coverage: bool = DEFAULT_PYTESTRUN_COVERAGE,
     ):
         self.rst_codeblocks = rst_codeblocks
         self.rst_user_codeblocks = rst_user_codeblocks
@@ -51,6 +104,51 @@ class Config:
         self.md_extensions = md_extensions
         self.md_user_extensions = md_user_extensions
         self.test_nameless_codeblocks = test_nameless_codeblocks
+        self.parse_cache = parse_cache
+        self.bytecode_cache = bytecode_cache
+        self.async_loop_scope = async_loop_scope
+        self.uvloop = uvloop
+        # Patterns of the documents whose code blocks share a namespace
+        self.shared_namespace = shared_namespace
+        # Modules imported once at the start of the session
+        self.preload_modules = preload_modules
+        # Run every code block in a forked child
+        self.forked = forked
+        # Run incremental steps on a checkpoint of the steps before them
+        self.checkpoint_steps = checkpoint_steps
+        # Seconds a code block may run for (0 for no limit)
+        self.timeout = timeout
+        # Factor of the duration of a code block in earlier runs to limit
+        # it to (0 to disable)
+        self.adaptive_timeout = adaptive_timeout
+        # How ``pytestrun`` code blocks run: in a pytest subprocess, as
+        # items of the pytest process or in a pool of pytest workers
+        self.pytestrun_mode = pytestrun_mode
+        # Size of the pool of pytest workers
+        self.pytestrun_workers = pytestrun_workers
+        # Code blocks a worker runs before it is replaced
+        self.pytestrun_worker_max_blocks = pytestrun_worker_max_blocks
+        # Megabytes of memory above which a worker is replaced (0 for no
+        # limit)
+        self.pytestrun_worker_max_rss = pytestrun_worker_max_rss
+        # Run the ``pytestrun`` code blocks of each block, file or the
+        # session in one pytest session
+        self.pytestrun_batch = pytestrun_batch
+        # Number of ``pytestrun`` code blocks started ahead of their items
+        # at a time (0 or 1 to run each when its item runs)
+        self.pytestrun_concurrency = pytestrun_concurrency
+        # Profile of the child pytest sessions: extra command line
+        # arguments, given last so that they override earlier ones
+        self.pytestrun_args = pytestrun_args
+        # Whether child sessions get the ``addopts`` of the ini file and
+        # ``PYTEST_ADDOPTS``
+        self.pytestrun_addopts = pytestrun_addopts
+        # Whether child sessions load installed plugins, or only the
+        # ``pytestrun_plugins`` (entry point or module names)
+        self.pytestrun_autoload = pytestrun_autoload
+        self.pytestrun_plugins = pytestrun_plugins
+        # Whether child sessions measure coverage if the session does
+        self.pytestrun_coverage = pytestrun_coverage
 
     @property
     def all_rst_codeblocks(self) -> tuple[str, ...]:
@@ -116,6 +214,31 @@ def _to_bool(val, default: bool) -> bool:
     return default
 
 
+def _to_float(val, default: float) -> float:
+    if isinstance(val, (int, float)) and not isinstance(val, bool):
+        return float(val) if val >= 0 else default
+    return default
+
+
+def _to_int(val, default: int) -> int:
+    if isinstance(val, int) and not isinstance(val, bool):
+        return val if val >= 0 else default
+    return default
+
+
+def _to_choice(val, choices: tuple[str, ...], default: str) -> str:
+    if isinstance(val, str) and val.lower() in choices:
+        return val.lower()
+    return default
+
+
+def _to_patterns(val, default: tuple[str, ...]) -> tuple[str, ...]:
+    """File patterns from a list of them, or from a bool (all or none)."""
+    if isinstance(val, bool):
+        return ("*",) if val else ()
+    return _to_tuple(val, default)
+
+
 def get_config(*, force_reload: bool = False) -> Config:
     """Get the configuration, loading from pyproject.toml if available."""
     global _cached_config
@@ -151,5 +274,69 @@ def get_config(*, force_reload: bool = False) -> Config:
             raw.get("test_nameless_codeblocks"),
             DEFAULT_TEST_NAMELESS_CODEBLOCKS,
         ),
+        parse_cache=_to_bool(raw.get("parse_cache"), DEFAULT_PARSE_CACHE),
+        bytecode_cache=_to_bool(
+            raw.get("bytecode_cache"), DEFAULT_BYTECODE_CACHE
+        ),
+        async_loop_scope=_to_choice(
+            raw.get("async_loop_scope"),
+            ASYNC_LOOP_SCOPES,
+            DEFAULT_ASYNC_LOOP_SCOPE,
+        ),
+        uvloop=_to_bool(raw.get("uvloop"), DEFAULT_UVLOOP),
+        shared_namespace=_to_patterns(
+            raw.get("shared_namespace"), DEFAULT_SHARED_NAMESPACE
+        ),
+        preload_modules=_to_tuple(
+            raw.get("preload_modules"), DEFAULT_PRELOAD_MODULES
+        ),
+        forked=_to_bool(raw.get("forked"), DEFAULT_FORKED),
+        checkpoint_steps=_to_bool(
+            raw.get("checkpoint_steps"), DEFAULT_CHECKPOINT_STEPS
+        ),
+        timeout=_to_float(raw.get("timeout"), DEFAULT_TIMEOUT),
+        adaptive_timeout=_to_float(
+            raw.get("adaptive_timeout"), DEFAULT_ADAPTIVE_TIMEOUT
+        ),
+        pytestrun_mode=_to_choice(
+            raw.get("pytestrun_mode"),
+            PYTESTRUN_MODES,
+            DEFAULT_PYTESTRUN_MODE,
+        ),
+        pytestrun_workers=_to_int(
+            raw.get("pytestrun_workers"), DEFAULT_PYTESTRUN_WORKERS
+        ),
+        pytestrun_worker_max_blocks=_to_int(
+            raw.get("pytestrun_worker_max_blocks"),
+            DEFAULT_PYTESTRUN_WORKER_MAX_BLOCKS,
+        ),
+        pytestrun_worker_max_rss=_to_int(
+            raw.get("pytestrun_worker_max_rss"),
+            DEFAULT_PYTESTRUN_WORKER_MAX_RSS,
+        ),
+        pytestrun_batch=_to_choice(
+            raw.get("pytestrun_batch"),
+            PYTESTRUN_BATCHES,
+            DEFAULT_PYTESTRUN_BATCH,
+        ),
+        pytestrun_concurrency=_to_int(
+            raw.get("pytestrun_concurrency"),
+            DEFAULT_PYTESTRUN_CONCURRENCY,
+        ),
+        pytestrun_args=_to_tuple(
+            raw.get("pytestrun_args"), DEFAULT_PYTESTRUN_ARGS
+        ),
+        pytestrun_addopts=_to_bool(
+            raw.get("pytestrun_addopts"), DEFAULT_PYTESTRUN_ADDOPTS
+        ),
+        pytestrun_autoload=_to_bool(
+            raw.get("pytestrun_autoload"), DEFAULT_PYTESTRUN_AUTOLOAD
+        ),
+        pytestrun_plugins=_to_tuple(
+            raw.get("pytestrun_plugins"), DEFAULT_PYTESTRUN_PLUGINS
+        ),
+        pytestrun_coverage=_to_bool(
+            raw.get("pytestrun_coverage"), DEFAULT_PYTESTRUN_COVERAGE
+        ),
     )
     return _cached_config
@@ -4,8 +4,10 @@ __license__ = "MIT"
 __all__ = (
     "CODEBLOCK_MARK",
     "DJANGO_DB_MARKS",
+    "FORKED_MARK",
     "PYTESTRUN_MARK",
     "TEST_PREFIX",
+    "TIMEOUT_MARK",
 )
 
 DJANGO_DB_MARKS = {
@@ -22,3 +24,12 @@ CODEBLOCK_MARK = "codeblock"
 # and then discover and run any Test* classes / test_* functions found in it,
 # rather than treating the whole block as a single test body.
 PYTESTRUN_MARK = "pytestrun"
+
+# When this mark is present on a code block (or the ``forked`` setting is
+# on), the block runs in a child forked from the pytest process, so that
+# changes it makes to the interpreter do not leak into later tests.
+FORKED_MARK = "forked"
+
+# Mark limiting the seconds a code block may run for, e.g. ``timeout(5)``
+# (the mark of pytest-timeout, which enforces it instead if installed)
+TIMEOUT_MARK = "timeout"
@@ -0,0 +1,800 @@
+import ast
+import asyncio
+import inspect
+import re
+import textwrap
+import time
+import traceback
+import types
+from abc import ABC, abstractmethod
+from collections.abc import Coroutine, Generator, Iterator
+from contextlib import AbstractContextManager, nullcontext, suppress
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatch
+from functools import lru_cache, partial
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Callable, Optional, Union, cast
+
+import pytest
+
+from .batches import PytestrunBatch
+from .cache import BytecodeCache, ParseCache
+from .checkpoints import StepChain
+from .collector import (
+    CodeSnippet,
+    group_snippets,
+    is_test_name,
+    is_test_name_or_nameless,
+)
+from .config import Config, get_config
+from .constants import (
+    DJANGO_DB_MARKS,
+    FORKED_MARK,
+    PYTESTRUN_MARK,
+    TEST_PREFIX,
+    TIMEOUT_MARK,
+)
+from .forked import can_fork, run_forked
+from .helpers import compile_snippet, may_be_async
+from .loops import await_within, run_coroutine, runs_on_plugin_loop
+from .parallel import Parsed, ParsePool
+from .phases import PhaseTimer
+from .pytestrun import PytestrunModule, run_pytest_style_code
+from .scheduling import PytestrunScheduler
+from .streaming import NameFilter, WindowScanner
+from .timeouts import (
+    Durations,
+    snippet_timeout,
+    time_limit,
+    timeout_error,
+)
+from .workers import PytestrunPool
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "CodeblockFile",
+    "Dialect",
+    "ENTRY_POINT_GROUP",
+    "find_dialect",
+    "get_dialect",
+    "get_dialects",
+    "namespace_key",
+)
+
+# Entry point group third-party dialects are registered under
+ENTRY_POINT_GROUP = "pytest_codeblock.dialects"
+
+namespace_key = pytest.StashKey[dict[str, Any]]()
+
+# Marks with arguments, e.g. ``timeout(5)``
+_MARK_ARGS_RE = re.compile(r"(\w+)\((.*)\)$", re.DOTALL)
+
+
+class Dialect(ABC):
+    """
+    A documentation format code blocks are collected from.
+
+    A dialect tells which files are written in it and provides the scanner
+    that finds their code blocks. Everything else (the parse cache,
+    parallel parsing, grouping and running the snippets) is shared by all
+    dialects. Besides the built-in Markdown and reStructuredText dialects,
+    packages can register their own under the ``pytest_codeblock.dialects``
+    entry point group::
+
+        [project.entry-points."pytest_codeblock.dialects"]
+        quarto = "my_package.quarto:QuartoDialect"
+    """
+
+    # Unique name, used to look the dialect up in parse worker processes
+    name: str = ""
+    # File extensions and code block languages, unless configured otherwise
+    default_extensions: tuple[str, ...] = ()
+    default_languages: tuple[str, ...] = ("py", "python", "python3")
+
+    def extensions(self, config: Config) -> tuple[str, ...]:
+        """File extensions of documents written in this dialect."""
+        return self.default_extensions
+
+    def languages(self, config: Config) -> tuple[str, ...]:
+        """Code block languages that are collected."""
+        return self.default_languages
+
+    def matches(self, path: Union[str, Path], config: Config) -> bool:
+        """Whether the file at `path` is written in this dialect."""
+        return str(path).lower().endswith(self.extensions(config))
+
+    def has_codeblocks(self, path: Union[str, Path], config: Config) -> bool:
+        """
+        Cheap check whether the file at `path` may contain a code block to
+        collect. Files for which this returns False are not collected.
+        """
+        return True
+
+    @abstractmethod
+    def scanner(
+        self,
+        path: Path,
+        config: Config,
+        name_filter: Optional[NameFilter] = None,
+    ) -> WindowScanner:
+        """Return a fresh scanner for the file at `path`."""
+
+    def dependencies(self, path: Path, scanner: Any) -> list[Path]:
+        """
+        Files besides `path` that the snippets found by `scanner` were (or
+        could have been) read from, such as literal includes.
+        """
+        return []
+
+    def parse_file(self, path: Path, config: Config) -> Parsed:
+        """
+        Parse the file at `path`, keeping only the snippets to be tested.
+
+        Returns the snippets along with their :meth:`dependencies`.
+        """
+        # Include both named and nameless blocks, if config allows nameless
+        # blocks. Nameless blocks will be auto-named based on the module
+        # name and a counter, ensuring they get collected as tests.
+        if config.test_nameless_codeblocks:
+            scanner = self.scanner(path, config, is_test_name_or_nameless)
+            tests = []
+            counter = 1
+            module_name = path.stem
+
+            with path.open("rb") as fh:
+                for sn in scanner.feed(fh):
+                    if sn.name:
+                        tests.append(sn)
+                    else:
+                        auto_name = f"{TEST_PREFIX}{module_name}_{counter}"
+                        counter += 1
+                        tests.append(replace(sn, name=auto_name))
+        # If config does not allow nameless blocks, only those with explicit
+        # names starting with TEST_PREFIX will be collected. Other blocks are
+        # skipped by the scanner without building their code.
+        else:
+            scanner = self.scanner(path, config, is_test_name)
+            with path.open("rb") as fh:
+                tests = list(scanner.feed(fh))
+
+        return tests, self.dependencies(path, scanner)
+
+    def collect_file(self, parent: pytest.Collector, path: Path) -> Any:
+        """Return the collector node for the file at `path`."""
+        return CodeblockFile.from_parent(
+            parent=parent, path=path, dialect=self
+        )
+
+
+@lru_cache(maxsize=None)
+def get_dialects() -> tuple[Dialect, ...]:
+    """
+    All dialects: those registered through entry points, followed by the
+    built-in ones. Files are matched against them in this order, so a
+    third-party dialect may take over extensions of a built-in one.
+    """
+    # Imported here, as the built-in dialects import this module
+    from .md import MarkdownDialect
+    from .rst import RSTDialect
+
+    dialects = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        dialect = entry_point.load()
+        dialects.append(dialect() if isinstance(dialect, type) else dialect)
+    return (*dialects, MarkdownDialect(), RSTDialect())
+
+
+def get_dialect(name: str) -> Dialect:
+    """Return the dialect called `name`."""
+    for dialect in get_dialects():
+        if dialect.name == name:
+            return dialect
+    raise LookupError(f"Unknown pytest-codeblock dialect: {name!r}")
+
+
+def find_dialect(
+    path: Union[str, Path],
+    config: Config,
+) -> Optional[Dialect]:
+    """Return the dialect the file at `path` is written in, if any."""
+    for dialect in get_dialects():
+        if dialect.matches(path, config):
+            return dialect
+    return None
+
+
+@lru_cache(maxsize=None)
+def _make_mark(mark: str) -> pytest.MarkDecorator:
+    """
+    The mark decorator for a mark of a snippet: a name, or a name with
+    literal positional arguments (``timeout(5)``).
+    """
+    match = _MARK_ARGS_RE.match(mark)
+    if match is None:
+        return getattr(pytest.mark, mark)
+    name, args = match.groups()
+    try:
+        values = ast.literal_eval(f"({args},)") if args.strip() else ()
+    except (SyntaxError, ValueError) as err:
+        raise ValueError(f"Invalid arguments of mark `{mark}`") from err
+    return getattr(pytest.mark, name)(*values)
+
+
+def _mark_timeout(marks: tuple[str, ...]) -> Optional[float]:
+    """Seconds of the ``timeout(seconds)`` mark of a snippet, if any."""
+    for mark in marks:
+        decorator = _make_mark(mark)
+        if decorator.name == TIMEOUT_MARK and decorator.args:
+            return float(decorator.args[0])
+    return None
+
+
+def _untimed(phase: str) -> AbstractContextManager[None]:
+    return nullcontext()
+
+
+def _describe_error(title: str, code: str, sn_name: str, fpath: str) -> str:
+    return (
+        f"{title} in "
+        f"codeblock `{sn_name}` in {fpath}:\n"
+        f"\n{textwrap.indent(code, prefix='    ')}\n\n"
+        f"{traceback.format_exc()}"
+    )
+
+
+def _compile(
+    code: str,
+    sn_name: str,
+    fpath: str,
+    bytecode_cache: Optional[BytecodeCache] = None,
+) -> tuple[bool, types.CodeType]:
+    """
+    Compile a snippet, or load it from `bytecode_cache`. Returns whether
+    it has top-level ``await`` along with its code object.
+    """
+    cached = (
+        bytecode_cache.get(code, fpath, sn_name) if bytecode_cache else None
+    )
+    if cached is not None:
+        # Compiled on an earlier run, no need to parse the code again
+        return cached
+    try:
+        # Top-level await is compiled as is, into a coroutine
+        is_async, compiled = compile_snippet(code, fpath)
+    except SyntaxError as err:
+        raise SyntaxError(
+            _describe_error("Syntax error", code, sn_name, fpath)
+        ) from err
+    if bytecode_cache:
+        bytecode_cache.set(code, fpath, sn_name, is_async, compiled)
+    return is_async, compiled
+
+
+def _make_test_function(
+    code: str,
+    sn_name: str,
+    fpath: str,
+    fixture_names: list[str],
+    is_pytestrun: bool,
+    bytecode_cache: Optional[BytecodeCache] = None,
+    run_async: Callable[[Coroutine], Any] = asyncio.run,
+    compiled: Optional[tuple[bool, types.CodeType]] = None,
+    namespace: Optional[Callable[[], dict[str, Any]]] = None,
+    forked: bool = False,
+    step: Optional[tuple[StepChain, int]] = None,
+    timeout: Optional[float] = None,
+    timed: Optional[Callable[[str], AbstractContextManager[None]]] = None,
+    pytestrun_pool: Optional[PytestrunPool] = None,
+    pytestrun_runner: Optional[Callable[[], None]] = None,
+) -> Callable[..., Any]:
+    """
+    Build the function a pytest item runs for a snippet.
+
+    If `compiled` is given and has top-level ``await``, this is a coroutine
+    function, for pytest-asyncio or anyio to run on their loop.
+
+    The snippet runs in the globals returned by `namespace`, if given, or
+    else in fresh ones. If `forked`, it runs in a forked child. If `step`
+    is given (a chain of incremental steps and the index of the snippet in
+    it), only the own code of the step runs, on the checkpoint of the chain.
+
+    The snippet is stopped after `timeout` seconds, if given. If `timed` is
+    given, the time of each phase of running the snippet is measured in the
+    context it returns for the name of the phase. A ``pytestrun`` snippet
+    runs by calling `pytestrun_runner` (as part of its batch, or started
+    ahead), if given, or else in a worker of `pytestrun_pool`, if given.
+    """
+    if timed is None:
+        timed = _untimed
+
+    def get_globals(fixtures: dict[str, Any]) -> dict[str, Any]:
+        # Make fixtures available as top-level names inside the executed
+        # snippet.
+        if namespace is None:
+            return {"asyncio": asyncio, **fixtures}
+        globals_ = namespace()
+        globals_.update(fixtures)
+        return globals_
+
+    def execute(
+        name: str,
+        source: str,
+        globals_: dict[str, Any],
+        compiled: Optional[tuple[bool, types.CodeType]] = None,
+    ) -> None:
+        if compiled is None:
+            with timed("compile"):
+                compiled = _compile(source, name, fpath, bytecode_cache)
+        is_async, code_obj = compiled
+        try:
+            with timed("exec"):
+                if is_async:
+                    run_async(eval(code_obj, globals_))
+                else:
+                    exec(code_obj, globals_)
+        except TimeoutError:
+            # Raised by time_limit(), naming the code block already
+            raise
+        except Exception as err:
+            raise Exception(
+                _describe_error("Error", source, name, fpath)
+            ) from err
+
+    # This inner function *actually* has a **fixtures signature, but we
+    # override __signature__ so pytest passes the right fixtures and names.
+    def test_block(**fixtures):
+        if is_pytestrun and pytestrun_runner is not None:
+            with timed("pytestrun"):
+                pytestrun_runner()
+            return
+        if is_pytestrun:
+            with timed("pytestrun"):
+                run_pytest_style_code(
+                    code=code,
+                    snippet_name=sn_name,
+                    path=fpath,
+                    timeout=timeout,
+                    pool=pytestrun_pool,
+                )
+            return
+
+        # Normal (non-pytestrun) execution path
+        if step is not None:
+            chain, index = step
+            with time_limit(timeout, sn_name):
+                chain.run(index, fixtures, execute)
+            return
+
+        code_obj = compiled
+        if code_obj is None:
+            with timed("compile"):
+                code_obj = _compile(code, sn_name, fpath, bytecode_cache)
+        # A forked child is killed once the parent is interrupted
+        with time_limit(timeout, sn_name):
+            if forked:
+                with timed("exec"):
+                    run_forked(
+                        lambda: execute(
+                            sn_name, code, get_globals(fixtures), code_obj
+                        )
+                    )
+            else:
+                execute(sn_name, code, get_globals(fixtures), code_obj)
+
+    function: Callable[..., Any] = test_block
+    if compiled and compiled[0]:
+        coroutine_code = compiled[1]
+
+        # Awaits the snippet on the loop of the plugin running the test
+        # instead
+        async def async_test_block(**fixtures):
+            try:
+                with timed("exec"):
+                    await await_within(
+                        eval(coroutine_code, get_globals(fixtures)), timeout
+                    )
+            except (TimeoutError, asyncio.TimeoutError) as err:
+                if timeout is None:
+                    raise
+                raise timeout_error(sn_name, timeout) from err
+            except Exception as err:
+                raise Exception(
+                    _describe_error("Error", code, sn_name, fpath)
+                ) from err
+
+        function = async_test_block
+    # Tell pytest which fixture arguments this test has:
+    signature = inspect.Signature(
+        [
+            inspect.Parameter(
+                name,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            )
+            for name in fixture_names
+        ]
+    )
+    cast(Any, function).__signature__ = signature
+    return function
+
+
+@dataclass
+class _DocumentState:
+    """
+    What the items of the snippets of a document share: settings, caches,
+    how snippets run and the chains of incremental steps.
+    """
+
+    config: Config
+    # Phases of the snippets, timed if reported
+    timer: Optional[PhaseTimer]
+    # Compiled snippets of earlier runs
+    bytecode_cache: Optional[BytecodeCache]
+    # Async snippets run on a loop of the configured scope
+    run_async: Callable[[Coroutine], Any]
+    # Snippets run one after another in the namespace of the document
+    namespace: Optional[Callable[[], dict[str, Any]]]
+    # Timeouts: of the configuration, marks and earlier durations,
+    # enforced by pytest-timeout (through marks) if installed
+    durations: Optional[Durations]
+    timeout_plugin: bool
+    # Workers running pytestrun snippets, if enabled
+    pytestrun_pool: Optional[PytestrunPool]
+    # Starts pytestrun snippets ahead of their items, if enabled
+    scheduler: Optional[PytestrunScheduler]
+    # Incremental steps of each group (None if they do not make a chain),
+    # and the code of the last one
+    chains: dict[str, Optional[StepChain]] = field(default_factory=dict)
+    last_step: dict[str, str] = field(default_factory=dict)
+
+
+class CodeblockFile(pytest.Module):
+    """
+    Collector for a documentation file, extracting only `test_`-prefixed
+    code snippets with the scanner of its dialect.
+    """
+
+    dialect: Dialect
+
+    def __init__(
+        self,
+        *args: Any,
+        dialect: Optional[Dialect] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if dialect is not None:
+            self.dialect = dialect
+
+    def _getobj(self) -> types.ModuleType:
+        m = types.ModuleType(self.path.stem)
+        m.__file__ = str(self.path)
+        # Prevent PyCollector from auto-collecting
+        cast(Any, m).__test__ = False
+        return m
+
+    def collect(
+        self,
+    ) -> Generator[Union[pytest.Item, pytest.Collector], None, None]:
+        # Register with fixture manager so module-scoped fixtures can find
+        # a pytest.Module parent node (fixes scope resolution when plugins
+        # like pytest-recording/langchain-tests define module-scoped fixtures).
+        self.session._fixturemanager.parsefactories(self)
+        config = get_config()
+        # Phases of the snippets, timed if reported
+        timer = PhaseTimer.from_pytest_config(self.config)
+        parse_start = time.perf_counter()
+        tests = self._snippets(config)
+        parse_time = time.perf_counter() - parse_start
+        state = self._state(config, timer)
+        nodeids: list[str] = []
+
+        for sn in group_snippets(tests):
+            nodeid = f"{self.nodeid}::{sn.name}"
+            nodeids.append(nodeid)
+            yield from self._items(sn, nodeid, state)
+
+        # Parsing the document is shared out between its snippets
+        if timer is not None:
+            for nodeid in nodeids:
+                timer.add(nodeid, "parse", parse_time / len(nodeids))
+
+    def _snippets(self, config: Config) -> list[CodeSnippet]:
+        """
+        Snippets of the document to be tested: those of an unchanged
+        document from an earlier run, parsed ahead of time in a worker
+        process, or else parsed now.
+        """
+        parse_cache = ParseCache.from_pytest_config(self.config, config)
+        pool = ParsePool.from_pytest_config(self.config)
+        if pool is not None:
+            tests = pool.take_cached(self.path, parse_cache)
+        else:
+            tests = parse_cache.get(self.path) if parse_cache else None
+        if tests is None:
+            parsed = pool.take(self.path) if pool else None
+            tests, dependencies = (
+                parsed or self.dialect.parse_file(self.path, config)
+            )
+            if parse_cache:
+                parse_cache.set(self.path, tests, dependencies)
+        return tests
+
+    def _state(
+        self,
+        config: Config,
+        timer: Optional[PhaseTimer],
+    ) -> _DocumentState:
+        """What the items of the snippets of the document share."""
+        return _DocumentState(
+            config=config,
+            timer=timer,
+            bytecode_cache=BytecodeCache.from_pytest_config(
+                self.config, config
+            ),
+            run_async=partial(run_coroutine, node=self, config=config),
+            namespace=(
+                self.namespace if self._shares_namespace(config) else None
+            ),
+            durations=Durations.from_pytest_config(self.config),
+            timeout_plugin=self.config.pluginmanager.has_plugin("timeout"),
+            pytestrun_pool=PytestrunPool.from_pytest_config(self.config),
+            scheduler=PytestrunScheduler.from_pytest_config(self.config),
+        )
+
+    def _items(
+        self,
+        sn: CodeSnippet,
+        nodeid: str,
+        state: _DocumentState,
+    ) -> Iterator[Union[pytest.Item, pytest.Collector]]:
+        """Make the items (or the module of tests) of the snippet `sn`."""
+        config = state.config
+        # Snippets kept for testing are named (nameless ones when parsed)
+        name = sn.name
+        assert name is not None
+        # Build list of fixture names requested by this snippet
+        fixture_names: list[str] = list(sn.fixtures)
+
+        # If snippet is marked as needing DB, also request the `db`
+        # fixture, unless user already added it explicitly.
+        if (
+            DJANGO_DB_MARKS.intersection(sn.marks)
+            and "db" not in fixture_names
+        ):
+            fixture_names.append("db")
+
+        is_pytestrun = PYTESTRUN_MARK in sn.marks
+        # Snippets run in a forked child have an event loop of their own
+        forked = (
+            not is_pytestrun
+            and (config.forked or FORKED_MARK in sn.marks)
+            and can_fork()
+        )
+        fpath = str(self.path)
+        step = None
+        if (
+            sn.group
+            and config.checkpoint_steps
+            and not is_pytestrun
+            and not forked
+        ):
+            step = self._step(
+                name, sn.group, sn.code, state.chains, state.last_step
+            )
+        timer = state.timer
+        timed = partial(timer.measure, nodeid) if timer else _untimed
+        mark_timeout = _mark_timeout(sn.marks)
+        if state.durations is not None:
+            state.durations.collect(nodeid)
+        timeout = snippet_timeout(
+            mark_timeout, nodeid, config, state.durations
+        )
+        marks = [_make_mark(m) for m in sn.marks]
+        if state.timeout_plugin:
+            if timeout and mark_timeout is None:
+                marks.append(getattr(pytest.mark, TIMEOUT_MARK)(timeout))
+            if not is_pytestrun:
+                timeout = None
+        # The tests of the snippet are collected as items of their own
+        if is_pytestrun and config.pytestrun_mode == "inprocess":
+            module = PytestrunModule.from_parent(
+                parent=self,
+                path=self.path,
+                name=name,
+                nodeid=nodeid,
+                code=sn.code,
+                line=sn.line,
+                timeout=timeout,
+            )
+            for mark in marks:
+                module.add_marker(mark)
+            yield module
+            return
+        pytestrun_runner = None
+        if is_pytestrun:
+            pytestrun_runner = self._pytestrun_runner(
+                state, nodeid, name, sn.code, timeout
+            )
+        compiled = None
+        # Async snippets run by pytest-asyncio or anyio are compiled
+        # now, to make coroutine test functions of them.
+        with timed("async"):
+            on_plugin_loop = (
+                not is_pytestrun
+                and not forked
+                and step is None
+                and may_be_async(sn.code)
+                and runs_on_plugin_loop(self.config, sn.marks)
+            )
+        if on_plugin_loop:
+            # Syntax errors are reported when the test runs
+            with suppress(SyntaxError), timed("compile"):
+                compiled = _compile(
+                    sn.code, name, fpath, state.bytecode_cache
+                )
+
+        function = _make_test_function(
+            sn.code,
+            sn_name=name,
+            fpath=fpath,
+            fixture_names=fixture_names,
+            is_pytestrun=is_pytestrun,
+            bytecode_cache=state.bytecode_cache,
+            run_async=asyncio.run if forked else state.run_async,
+            compiled=compiled,
+            namespace=state.namespace,
+            forked=forked,
+            step=step,
+            timeout=timeout,
+            timed=timed,
+            pytestrun_pool=state.pytestrun_pool,
+            pytestrun_runner=pytestrun_runner,
+        )
+        if inspect.iscoroutinefunction(function):
+            items = self._coroutine_items(name, function, marks)
+            if items:
+                yield from items
+                return
+            function = _make_test_function(
+                sn.code,
+                sn_name=name,
+                fpath=fpath,
+                fixture_names=fixture_names,
+                is_pytestrun=is_pytestrun,
+                bytecode_cache=state.bytecode_cache,
+                run_async=state.run_async,
+                namespace=state.namespace,
+                timeout=timeout,
+                timed=timed,
+            )
+
+        # Generate a real pytest Function so fixtures work
+        fn = pytest.Function.from_parent(
+            parent=self,
+            name=name,
+            callobj=function,
+        )
+        # Apply any marks (e.g. django_db)
+        for mark in marks:
+            fn.add_marker(mark)
+        yield fn
+
+    def _pytestrun_runner(
+        self,
+        state: _DocumentState,
+        nodeid: str,
+        name: str,
+        code: str,
+        timeout: Optional[float],
+    ) -> Optional[Callable[[], None]]:
+        """
+        Runs the ``pytestrun`` snippet `nodeid` as part of its batch, or
+        started ahead by the scheduler, if enabled. Returns None if the
+        snippet runs on its own when its item does.
+        """
+        fpath = str(self.path)
+        runner = None
+        batch = PytestrunBatch.of(self, state.config.pytestrun_batch)
+        if batch is not None:
+            batch.add(nodeid, name, code, fpath, timeout)
+            runner = partial(batch.run, nodeid)
+        if state.scheduler is not None:
+            state.scheduler.add(
+                nodeid,
+                runner
+                or partial(
+                    run_pytest_style_code,
+                    code=code,
+                    snippet_name=name,
+                    path=fpath,
+                    timeout=timeout,
+                    pool=state.pytestrun_pool,
+                ),
+            )
+            runner = partial(state.scheduler.run, nodeid)
+        return runner
+
+    def _step(
+        self,
+        name: str,
+        group: str,
+        code: str,
+        chains: dict[str, Optional[StepChain]],
+        last_step: dict[str, str],
+    ) -> Optional[tuple[StepChain, int]]:
+        """
+        Add the incremental step `name` (with `code`) to the chain of its
+        `group`, returning the chain and the index of the step in it. Returns
+        None if the code of a step of the group does not extend that of the
+        step before it.
+        """
+        previous = last_step.get(group)
+        last_step[group] = code
+        if previous is None:
+            own_code = code
+        elif code.startswith(previous + "\n"):
+            own_code = code[len(previous) + 1:]
+        else:
+            chains[group] = None
+            return None
+        if group not in chains:
+            chains[group] = StepChain(self)
+        chain = chains[group]
+        if chain is None:
+            return None
+        return chain, chain.add(name, own_code)
+
+    def _shares_namespace(self, config: Config) -> bool:
+        """
+        Whether the document matches a pattern of the ``shared_namespace``
+        setting, relative to the root directory.
+        """
+        if not config.shared_namespace:
+            return False
+        try:
+            path = self.path.relative_to(self.config.rootpath).as_posix()
+        except ValueError:
+            path = self.path.as_posix()
+        return any(
+            fnmatch(path, pattern) for pattern in config.shared_namespace
+        )
+
+    def namespace(self) -> dict[str, Any]:
+        """
+        Return the globals shared by the snippets of the document, created
+        for the first one to run and dropped on teardown of the document.
+        """
+        namespace = self.stash.get(namespace_key, None)
+        if namespace is None:
+            namespace = self.stash[namespace_key] = {"asyncio": asyncio}
+
+            def drop() -> None:
+                del self.stash[namespace_key]
+
+            self.addfinalizer(drop)
+        return namespace
+
+    def _coroutine_items(
+        self,
+        name: str,
+        function: Callable[..., Any],
+        marks: list[pytest.MarkDecorator],
+    ) -> list[pytest.Item]:
+        """
+        Make the items of a coroutine test function the way pytest makes
+        those of functions defined in a module, which is where async test
+        plugins take them over. Returns an empty list if pytest does not
+        take `name` for the name of a test function.
+        """
+        for mark in marks:
+            function = mark(function)
+        setattr(self.obj, name, function)
+        items = self.ihook.pytest_pycollect_makeitem(
+            collector=self, name=name, obj=function
+        )
+        if items is None:
+            return []
+        return list(items) if isinstance(items, (list, tuple)) else [items]
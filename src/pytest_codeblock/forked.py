@@ -0,0 +1,127 @@
+"""
+Helper module for running code blocks in a child forked from the pytest
+process. The child inherits the imported modules and the fixtures set up for
+the code block, runs it, and sends the outcome back over a pipe before
+exiting. Nothing the code block changes in the interpreter (globals,
+monkeypatches, ``sys.modules``) outlives it.
+"""
+import os
+import pickle
+import signal
+import sys
+import threading
+import traceback
+import warnings
+from typing import Any, Callable, Optional
+
+import pytest
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "can_fork",
+    "run_forked",
+)
+
+# Outcomes raised in the child (by pytest.skip(), pytest.xfail() and
+# pytest.fail()), raised again in the parent with the same message
+_OUTCOMES: dict[str, Any] = {
+    "skip": pytest.skip,
+    "xfail": pytest.xfail,
+    "fail": pytest.fail,
+}
+
+
+def can_fork() -> bool:
+    """Whether code blocks can be run in forked children here."""
+    return hasattr(os, "fork")
+
+
+def _child(function: Callable[[], None], write_fd: int) -> None:
+    """Run `function` and write its outcome to `write_fd`."""
+    outcome: tuple[Optional[str], Optional[str]]
+    try:
+        function()
+        outcome = (None, None)
+    except BaseException as err:
+        for kind, raise_outcome in _OUTCOMES.items():
+            if isinstance(err, raise_outcome.Exception):
+                outcome = (kind, err.msg)
+                break
+        else:
+            if isinstance(err, Exception):
+                # Already describes the code block and its traceback
+                text = str(err)
+            else:
+                text = "".join(
+                    traceback.format_exception(
+                        type(err), err, err.__traceback__
+                    )
+                )
+            outcome = ("error", text)
+    with os.fdopen(write_fd, "wb") as pipe:
+        pickle.dump(outcome, pipe)
+
+
+def run_forked(function: Callable[[], None]) -> None:
+    """
+    Call `function` in a forked child, raising in the parent what it
+    raised: skips, expected failures and failures as they are, and other
+    exceptions with their message (and the traceback of the child, unless
+    they are exceptions describing the code block already).
+
+    Only the calling thread is forked. If other threads run, the child may
+    deadlock on a lock one of them held (e.g. in logging or the import
+    system), so a ``RuntimeWarning`` is issued.
+    """
+    if threading.active_count() > 1:
+        warnings.warn(
+            "Forking a code block while other threads run, which may "
+            "deadlock the child; avoid forked code blocks with thread "
+            "pools (e.g. pytestrun_concurrency) or threads of fixtures",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    read_fd, write_fd = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        exit_code = 0
+        try:
+            _child(function, write_fd)
+        except BaseException:
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip the atexit handlers and finalizers of the pytest process
+            os._exit(exit_code)
+
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd, "rb") as pipe:
+            data = pipe.read()
+        _, status = os.waitpid(pid, 0)
+        pid = 0
+    finally:
+        if pid:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+    if not data:
+        if os.WIFSIGNALED(status):
+            reason = f"was killed by signal {os.WTERMSIG(status)}"
+        else:
+            code = os.waitstatus_to_exitcode(status)
+            reason = f"exited with code {code}"
+        raise Exception(
+            f"The forked process running the code block {reason}"
+        )
+    kind, message = pickle.loads(data)
+    if kind in _OUTCOMES:
+        _OUTCOMES[kind](message)
+    elif kind is not None:
+        raise Exception(message)
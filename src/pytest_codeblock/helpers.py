@@ -1,17 +1,57 @@
 import ast
+import inspect
+import re
 import textwrap
+import warnings
+from functools import lru_cache
+from types import CodeType
 
 __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
+    "compile_snippet",
     "contains_top_level_await",
+    "dedent_block",
+    "may_be_async",
+    "normalise_newlines",
     "wrap_async_code",
 )
 
+# Line boundaries recognised by ``str.splitlines()`` other than ``\n``
+LINE_BREAKS = (
+    "\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029",
+)
+
+_BLANK_LINE_RE = re.compile(r"^[^\S\n]+$", re.MULTILINE)
+
+# Keywords every async construct starts with. Code without them is known
+# to be synchronous without parsing it.
+_ASYNC_KEYWORD_RE = re.compile(r"\b(?:async|await)\b")
+
+
+def may_be_async(code: str) -> bool:
+    """
+    Whether `code` contains the ``async`` or ``await`` keyword (or the word
+    in a string or comment). Code for which this is False is synchronous.
+    """
+    return _ASYNC_KEYWORD_RE.search(code) is not None
+
 
 def contains_top_level_await(code: str) -> bool:
-    """Analyzes code to detect presence of async patterns."""
+    """
+    Analyzes code to detect presence of async patterns.
+
+    Deprecated: code blocks are compiled with :func:`compile_snippet`,
+    which tells whether they need an event loop.
+    """
+    warnings.warn(
+        "contains_top_level_await() is deprecated, use compile_snippet()",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    if not may_be_async(code):
+        return False
     try:
         tree = ast.parse(code)
     except SyntaxError:
@@ -30,9 +70,73 @@ def contains_top_level_await(code: str) -> bool:
     return any(isinstance(node, async_nodes) for node in ast.walk(tree))
 
 
+def compile_snippet(code: str, filename: str) -> tuple[bool, CodeType]:
+    """
+    Compile `code`, allowing ``await``, ``async for`` and ``async with`` at
+    the top level.
+
+    Returns whether the code object is a coroutine code object, along with
+    it. Evaluating such a code object returns a coroutine to run instead of
+    running the code. The code is parsed once, whether async or not.
+    """
+    if not may_be_async(code):
+        return False, compile(code, filename, "exec")
+    compiled = compile(
+        code, filename, "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
+    )
+    return bool(compiled.co_flags & inspect.CO_COROUTINE), compiled
+
+
 def wrap_async_code(code: str) -> str:
-    """Wrap code containing top-level await in an async function."""
+    """
+    Wrap code containing top-level await in an async function.
+
+    Deprecated: :func:`compile_snippet` compiles top-level ``await``
+    without rewriting the code.
+    """
+    warnings.warn(
+        "wrap_async_code() is deprecated, use compile_snippet()",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     ind = textwrap.indent(code, "    ")
     return (
         f"async def __async_main__():\n{ind}\n\nasyncio.run(__async_main__())"
     )
+
+
+def normalise_newlines(text: str) -> str:
+    """
+    Make ``\\n`` the only line boundary in `text`.
+
+    Lines of the result are exactly those of ``text.splitlines()``, which
+    lets parsers search the whole text and still agree with line-based
+    processing. Text without exotic line boundaries is returned as is.
+    """
+    if any(char in text for char in LINE_BREAKS):
+        normalised = "\n".join(text.splitlines())
+        if text[-1] == "\n" or text[-1] in LINE_BREAKS:
+            # Keep the trailing empty line that splitlines() would report
+            normalised += "\n"
+        return normalised
+    return text
+
+
+@lru_cache(maxsize=None)
+def _dedent_re(indent: int) -> re.Pattern:
+    if not indent:
+        return _BLANK_LINE_RE
+    return re.compile(
+        rf"^(?:[^\S\n]+$|[^\n]{{{indent}}}|[^\S\n]+)", re.MULTILINE
+    )
+
+
+def dedent_block(text: str, indent: int) -> str:
+    """
+    Remove `indent` characters of indentation from every line of `text`.
+
+    Whitespace-only lines are emptied, lines at least `indent` characters
+    long lose their first `indent` characters and shorter lines lose their
+    leading whitespace.
+    """
+    return _dedent_re(indent).sub("", text)
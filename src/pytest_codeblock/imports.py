@@ -0,0 +1,229 @@
+import importlib
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import FrameType, ModuleType
+from typing import Any, Optional
+
+import pytest
+
+from .config import get_config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "ImportTimer",
+    "MIN_IMPORT_SECONDS",
+    "PRELOAD_OWNER",
+    "import_timer_key",
+    "preload_modules",
+)
+
+# What imports of the ``preload_modules`` setting are reported for
+PRELOAD_OWNER = "preload_modules"
+
+# Imports quicker than this, in seconds, are not reported
+MIN_IMPORT_SECONDS = 0.005
+
+# Package of the plugin, whose own imports are not reported (but for
+# those of its tests)
+_PLUGIN_PACKAGE = __name__.partition(".")[0]
+_PLUGIN_TESTS = f"{_PLUGIN_PACKAGE}.tests"
+
+import_timer_key = pytest.StashKey["ImportTimer"]()
+
+
+def _imported_by_plugin() -> bool:
+    """
+    Whether the import being executed was made by the plugin itself (e.g.
+    lazily, while running a code block), rather than by the code block.
+    """
+    frame: Optional[FrameType] = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_globals.get("__name__") or ""
+        if not name.startswith("importlib") and name != __name__:
+            return name.partition(".")[0] == _PLUGIN_PACKAGE and not (
+                name == _PLUGIN_TESTS or name.startswith(f"{_PLUGIN_TESTS}.")
+            )
+        frame = frame.f_back
+    return False
+
+
+class _TimedLoader(Loader):
+    """Loader timing the execution of a module by the loader it wraps."""
+
+    def __init__(self, timer: "ImportTimer", loader: Loader) -> None:
+        self.timer = timer
+        self.loader = loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        # Leave no trace of the wrapper on the module
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.timer.exec_module(self.loader, module)
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Meta path finder measuring the wall time of the imports made while
+    code blocks (or ``preload_modules``) run.
+
+    Only outermost imports are recorded: the time of the modules they import
+    in turn is included in theirs. Modules found in ``sys.modules`` cost
+    nothing and are not recorded, nor are imports made by the plugin itself.
+    """
+
+    def __init__(self) -> None:
+        # Module name -> (seconds, what imported it)
+        self.durations: dict[str, tuple[float, str]] = {}
+        self.owner: Optional[str] = None
+        self._depth = 0
+        self._finding: set[str] = set()
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """Time the imports of `session`, if the report is enabled."""
+        pytest_config = session.config
+        if pytest_config.getoption("codeblock_import_report", 0) < 1:
+            return
+        timer = cls()
+        sys.meta_path.insert(0, timer)
+        pytest_config.stash[import_timer_key] = timer
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """Stop timing imports, keeping those timed for the report."""
+        timer = ImportTimer.from_pytest_config(session.config)
+        if timer is not None and timer in sys.meta_path:
+            sys.meta_path.remove(timer)
+
+    @staticmethod
+    def from_pytest_config(pytest_config: Any) -> Optional["ImportTimer"]:
+        """Import timer of a session, or None if imports are not timed."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(import_timer_key, None)
+
+    @contextmanager
+    def measure(self, owner: str) -> Iterator[None]:
+        """Record the imports made within the block as made by `owner`."""
+        previous, self.owner = self.owner, owner
+        try:
+            yield
+        finally:
+            self.owner = previous
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        if self.owner is None or fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(fullname)
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def exec_module(self, loader: Loader, module: ModuleType) -> None:
+        """Execute `module` with `loader`, timing it if outermost."""
+        owner = self.owner
+        if (
+            self._depth
+            or owner is None
+            or (owner != PRELOAD_OWNER and _imported_by_plugin())
+        ):
+            loader.exec_module(module)
+            return
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            self._depth -= 1
+            self.durations[module.__name__] = (
+                time.perf_counter() - start,
+                owner,
+            )
+
+    def slowest(self, count: int) -> list[tuple[str, float, str]]:
+        """
+        The `count` slowest imports as (name, seconds, owner), leaving out
+        those quicker than ``MIN_IMPORT_SECONDS``.
+        """
+        return sorted(
+            (
+                (name, seconds, owner)
+                for name, (seconds, owner) in self.durations.items()
+                if seconds >= MIN_IMPORT_SECONDS
+            ),
+            key=lambda entry: entry[1],
+            reverse=True,
+        )[:count]
+
+    def report(self, terminalreporter: Any, count: int) -> None:
+        """Write the `count` slowest imports to the terminal."""
+        slowest = self.slowest(count)
+        if not slowest:
+            return
+        terminalreporter.write_sep("=", "slowest codeblock imports")
+        width = max(len(name) for name, _, _ in slowest)
+        for name, seconds, owner in slowest:
+            terminalreporter.write_line(
+                f"{seconds:.2f}s {name:<{width}}  {owner}"
+            )
+
+
+def _preload(pytest_config: pytest.Config, name: str) -> None:
+    """Import module `name`, warning if it fails to import."""
+    try:
+        importlib.import_module(name)
+    except Exception as err:
+        pytest_config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                f"pytest-codeblock: could not preload {name!r}: {err}"
+            ),
+            stacklevel=2,
+        )
+
+
+def preload_modules(session: pytest.Session) -> None:
+    """
+    Import the modules of the ``preload_modules`` setting, so that code
+    blocks importing them do not pay for it. Modules failing to import are
+    reported in a warning.
+    """
+    names = get_config().preload_modules
+    if not names:
+        return
+    timer = ImportTimer.from_pytest_config(session.config)
+    for name in names:
+        if timer is None:
+            _preload(session.config, name)
+        else:
+            with timer.measure(PRELOAD_OWNER):
+                _preload(session.config, name)
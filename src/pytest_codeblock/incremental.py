@@ -0,0 +1,189 @@
+from bisect import bisect_right
+from collections.abc import Callable, Iterator, Sequence
+
+from .collector import CodeSnippet
+from .helpers import normalise_newlines
+from .streaming import WindowScanner
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("reparse",)
+
+# Size of the windows (in characters) the changed region is re-scanned in
+RESCAN_CHUNK_SIZE = 1 << 14
+
+# Size of the first block compared when looking for the changed region
+_FIRST_STEP = 1 << 12
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix of `a` and `b`."""
+    n = min(len(a), len(b))
+    i = 0
+    step = _FIRST_STEP
+    while i < n:
+        j = min(i + step, n)
+        if a[i:j] != b[i:j]:
+            # Narrow the mismatch down within this block
+            while j - i > 1:
+                mid = (i + j) // 2
+                if a[i:mid] == b[i:mid]:
+                    i = mid
+                else:
+                    j = mid
+            return i
+        i = j
+        step *= 2
+    return n
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix of `a` and `b`, at most `limit`."""
+    len_a = len(a)
+    len_b = len(b)
+    i = 0
+    step = _FIRST_STEP
+    while i < limit:
+        j = min(i + step, limit)
+        if a[len_a - j:len_a - i] != b[len_b - j:len_b - i]:
+            while j - i > 1:
+                mid = (i + j) // 2
+                if a[len_a - mid:len_a - i] == b[len_b - mid:len_b - i]:
+                    i = mid
+                else:
+                    j = mid
+            return i
+        i = j
+        step *= 2
+    return limit
+
+
+def _line_start(text: str, pos: int) -> bool:
+    return pos == 0 or text[pos - 1] == "\n"
+
+
+def _changed_lines(old: str, new: str) -> tuple[int, int, int, int]:
+    """
+    Locate the lines that differ between `old` and `new`.
+
+    Returns ``(start, first, old_end, new_end)``: lines ``first`` to
+    ``old_end`` (exclusive, counted from 0) of `old` were replaced by lines
+    ``first`` to ``new_end`` of `new`, and ``start`` is the offset of line
+    ``first`` in both. All other lines are the same.
+    """
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    old_tail = len(old) - suffix
+    new_tail = len(new) - suffix
+    # The unchanged lines at the end start at the first position of the
+    # common suffix that is a line start in both texts.
+    if not (_line_start(old, old_tail) and _line_start(new, new_tail)):
+        skip = old.find("\n", old_tail, len(old)) + 1
+        if skip:
+            new_tail += skip - old_tail
+            old_tail = skip
+        else:
+            old_tail = len(old)
+            new_tail = len(new)
+    first = old.count("\n", 0, prefix)
+    return (
+        old.rfind("\n", 0, prefix) + 1,
+        first,
+        first + old.count("\n", prefix, old_tail),
+        first + new.count("\n", prefix, new_tail),
+    )
+
+
+def _iter_lines_from(text: str, start: int, size: int) -> Iterator[str]:
+    """Yield `text` from offset `start` on in chunks of whole lines."""
+    end = len(text)
+    while start < end:
+        stop = text.find("\n", start + size)
+        stop = end if stop == -1 else stop + 1
+        yield text[start:stop]
+        start = stop
+
+
+def _line(snippet: CodeSnippet) -> int:
+    return snippet.line
+
+
+def _shifted(snippet: CodeSnippet, delta: int) -> CodeSnippet:
+    """Copy of `snippet`, moved down by `delta` lines."""
+    # Spelled out, as this is several times faster than dataclasses.replace
+    return CodeSnippet(
+        code=snippet.code,
+        line=snippet.line + delta,
+        name=snippet.name,
+        marks=snippet.marks,
+        fixtures=snippet.fixtures,
+        group=snippet.group,
+        end_line=(
+            None if snippet.end_line is None else snippet.end_line + delta
+        ),
+    )
+
+
+def reparse(
+    previous: Sequence[CodeSnippet],
+    old_text: str,
+    new_text: str,
+    make_scanner: Callable[[int], WindowScanner],
+) -> list[CodeSnippet]:
+    """
+    Update the snippets `previous` parsed from `old_text` for `new_text`.
+
+    Only the changed lines are scanned again, starting from the end of the
+    last block before them (where the parser state is known to be clean)
+    up to the end of the first block after them that also ended a block in
+    the previous parse. Snippets outside of that range are reused, shifted
+    by the number of lines added or removed.
+
+    `make_scanner` returns a fresh scanner for text starting at the given
+    line (counted from 0).
+    """
+    old = normalise_newlines(old_text)
+    new = normalise_newlines(new_text)
+    if old == new:
+        return list(previous)
+    offset, first, old_end, new_end = _changed_lines(old, new)
+    delta = new_end - old_end
+
+    # Restart after the last block ending before the change. The line after
+    # a block is looked at to tell where it ends, so it must be unchanged.
+    keep = bisect_right(previous, first, key=_line)
+    restart = 0
+    while keep:
+        end_line = previous[keep - 1].end_line
+        if end_line is not None and end_line < first:
+            restart = end_line
+            break
+        keep -= 1
+    result = list(previous[:keep])
+
+    # Offset of the restart line, found by walking back from the change
+    if restart:
+        for _ in range(first - restart):
+            offset = new.rfind("\n", 0, offset - 1) + 1
+    else:
+        offset = 0
+
+    scanner = make_scanner(restart)
+    for sn in scanner.feed(
+        _iter_lines_from(new, offset, RESCAN_CHUNK_SIZE), RESCAN_CHUNK_SIZE
+    ):
+        result.append(sn)
+        if sn.end_line is None or sn.end_line < new_end:
+            continue
+        # Did a block of the previous parse end on the same (unchanged) line?
+        old_end_line = sn.end_line - delta
+        idx = bisect_right(previous, old_end_line, key=_line)
+        if idx and previous[idx - 1].end_line == old_end_line:
+            # Same clean state at the same point of the same text as before
+            tail = previous[idx:]
+            if delta:
+                tail = [_shifted(old_sn, delta) for old_sn in tail]
+            result.extend(tail)
+            break
+    return result
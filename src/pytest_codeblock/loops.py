@@ -0,0 +1,175 @@
+import asyncio
+import sys
+from collections.abc import Coroutine, Iterable
+from typing import Any, Callable, Optional
+
+import pytest
+
+from .config import Config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "ASYNC_TEST_PLUGINS",
+    "Runner",
+    "await_within",
+    "new_runner",
+    "run_coroutine",
+    "runner_key",
+    "runs_on_plugin_loop",
+)
+
+# Plugins running coroutine test functions on loops they manage
+# (pytest-asyncio and anyio). They are registered under the same name as
+# the mark they run the tests with in strict mode.
+ASYNC_TEST_PLUGINS = ("asyncio", "anyio")
+
+runner_key = pytest.StashKey["Runner"]()
+
+
+if sys.version_info >= (3, 11):
+    from asyncio import Runner
+else:
+    class Runner:
+        """The part of ``asyncio.Runner`` (Python 3.11+) used here."""
+
+        def __init__(
+            self,
+            *,
+            loop_factory: Optional[Callable[[], Any]] = None,
+        ) -> None:
+            self._loop_factory = loop_factory
+            self._loop = None
+
+        def __enter__(self) -> "Runner":
+            return self
+
+        def __exit__(self, *exc_info: Any) -> None:
+            self.close()
+
+        def get_loop(self) -> asyncio.AbstractEventLoop:
+            if self._loop is None:
+                if self._loop_factory is None:
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                else:
+                    self._loop = self._loop_factory()
+            return self._loop
+
+        def run(self, coro: Coroutine) -> Any:
+            return self.get_loop().run_until_complete(coro)
+
+        def close(self) -> None:
+            loop = self._loop
+            if loop is None:
+                return
+            try:
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True)
+                )
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.run_until_complete(loop.shutdown_default_executor())
+            finally:
+                if self._loop_factory is None:
+                    asyncio.set_event_loop(None)
+                loop.close()
+                self._loop = None
+
+
+def new_runner(config: Config) -> Runner:
+    """
+    Return a runner for a new event loop, a uvloop one if enabled (with
+    the ``uvloop`` setting) and installed.
+    """
+    if config.uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return Runner(loop_factory=uvloop.new_event_loop)
+    return Runner()
+
+
+async def await_within(coro: Coroutine, timeout: Optional[float]) -> Any:
+    """
+    Await `coro`, failing after `timeout` seconds if given, on whichever
+    loop runs it: an asyncio one, or one of another library (e.g. trio)
+    run by anyio.
+    """
+    if timeout is None:
+        return await coro
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Not on an asyncio loop, which only anyio runs tests off
+        import anyio
+
+        with anyio.fail_after(timeout):
+            return await coro
+    return await asyncio.wait_for(coro, timeout)
+
+
+def run_coroutine(
+    coro: Coroutine,
+    node: pytest.Collector,
+    config: Config,
+) -> Any:
+    """
+    Run the coroutine of an async code block collected by `node`.
+
+    With the ``async_loop_scope`` setting at ``block``, every code block
+    gets an event loop of its own, as with ``asyncio.run``. At ``file`` or
+    ``session``, one loop is shared by all code blocks of the document or
+    of the session, and closed once they are done. This saves creating and
+    tearing down a loop (along with its default executor) per code block,
+    and lets code blocks use tasks and clients created by earlier ones.
+    """
+    scope = config.async_loop_scope
+    if scope == "block":
+        with new_runner(config) as block_runner:
+            return block_runner.run(coro)
+
+    holder = node.session if scope == "session" else node
+    runner = holder.stash.get(runner_key, None)
+    if runner is None:
+        runner = holder.stash[runner_key] = new_runner(config)
+
+        def close() -> None:
+            del holder.stash[runner_key]
+            runner.close()
+
+        # Closed on teardown of the document or the session
+        holder.addfinalizer(close)
+    return runner.run(coro)
+
+
+def _auto_mode(pytest_config: pytest.Config, name: str) -> bool:
+    """Whether the ``<name>`` option (or ini setting) is ``auto``."""
+    if pytest_config.getoption(name, None) == "auto":
+        return True
+    try:
+        return pytest_config.getini(name) == "auto"
+    except ValueError:
+        return False
+
+
+def runs_on_plugin_loop(
+    pytest_config: pytest.Config,
+    marks: Iterable[str],
+) -> bool:
+    """
+    Whether a coroutine test function with `marks` is run by pytest-asyncio
+    or anyio: when marked for it (``asyncio`` or ``anyio``), or when the
+    plugin is in auto mode.
+    """
+    marks = set(marks)
+    return any(
+        pytest_config.pluginmanager.has_plugin(plugin)
+        and (plugin in marks or _auto_mode(pytest_config, f"{plugin}_mode"))
+        for plugin in ASYNC_TEST_PLUGINS
+    )
@@ -1,35 +1,201 @@
-import asyncio
-import inspect
 import re
-import textwrap
-import traceback
-import types
-from collections.abc import Generator
-from typing import Optional
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional, Union
 
 import pytest
 
-from .collector import CodeSnippet, group_snippets
-from .config import get_config
-from .constants import (
-    CODEBLOCK_MARK,
-    DJANGO_DB_MARKS,
-    PYTESTRUN_MARK,
-    TEST_PREFIX,
-)
-from .helpers import contains_top_level_await, wrap_async_code
-from .pytestrun import run_pytest_style_code
+from .collector import CodeSnippet, intern_names
+from .config import Config, get_config
+from .constants import CODEBLOCK_MARK
+from .dialects import CodeblockFile, Dialect
+from .helpers import dedent_block, normalise_newlines
+from .incremental import reparse
+from .prescan import has_markdown_codeblocks
+from .streaming import CHUNK_SIZE, NameFilter, Source, WindowScanner
 
 __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
+    "MarkdownDialect",
     "MarkdownFile",
+    "iter_markdown",
     "parse_markdown",
+    "parse_markdown_file",
+    "reparse_markdown",
+)
+
+
+# Markers the scanner searches the whole text for. Only lines starting with
+# one of them (HTML comment directives and code fences) are ever looked at.
+_MD_COMMENT_RE = re.compile("<!--")
+_MD_FENCE_RE = re.compile("```")
+_MD_BACKTICKS_RE = re.compile("`{3,}")
+# Marks may take arguments, e.g. ``timeout(5)``
+_MD_PYTESTMARK_RE = re.compile(
+    r"<!--\s*pytestmark:\s*(\w+(?:\([^()]*\))?)\s*-->"
 )
+_MD_PYTESTFIXTURE_RE = re.compile(r"<!--\s*pytestfixture:\s*(\w+)\s*-->")
+_MD_CONTINUE_RE = re.compile(r"<!--\s*continue:\s*(\S+)\s*-->")
+_MD_CODEBLOCK_NAME_RE = re.compile(r"<!--\s*codeblock-name:\s*([^ >]+)\s*-->")
 
 
-def parse_markdown(text: str) -> list[CodeSnippet]:
+class _MarkdownScanner(WindowScanner):
+    """
+    Scanner for Markdown text.
+
+    Rather than walking the document line by line, the scanner jumps from
+    one comment or fence line to the next with precompiled regular
+    expressions and only slices the text of the blocks it collects.
+    """
+
+    def __init__(
+        self,
+        languages: tuple[str, ...],
+        name_filter: Optional[NameFilter] = None,
+    ) -> None:
+        self.languages = languages
+        self.name_filter = name_filter
+        self.pending_name: Optional[str] = None
+        self.pending_continue: Optional[str] = None
+        self.pending_marks: list[str] = [CODEBLOCK_MARK]
+        self.pending_fixtures: list[str] = []
+        self.line_no = 1  # Number of the first line of the next window
+
+    def scan(self, text: str, final: bool) -> Iterator[CodeSnippet]:
+        text_len = len(text)
+        hits = sorted(
+            [m.start() for m in _MD_COMMENT_RE.finditer(text)]
+            + [m.start() for m in _MD_FENCE_RE.finditer(text)]
+        )
+        n_hits = len(hits)
+        i = 0
+        pos = 0  # Start of the line to scan from
+        # Line numbers are only needed for collected blocks, so newlines are
+        # counted lazily: `line_no` is the number of the line at `counted`.
+        counted = 0
+        line_no = self.line_no
+        self.rest = text_len
+
+        while i < n_hits:
+            hit = hits[i]
+            i += 1
+            if hit < pos:
+                continue
+            if hit and text[hit - 1] != "\n":
+                line_start = text.rfind("\n", 0, hit) + 1
+                if not text[line_start:hit].isspace():
+                    continue  # Marker in the middle of a line
+            else:
+                line_start = hit
+            line_end = text.find("\n", hit)
+            if line_end == -1:
+                line_end = text_len
+            pos = line_end + 1
+
+            if text[hit] == "<":
+                stripped = text[hit:line_end].rstrip()
+                # Check for pytest mark comment
+                if "pytestmark:" in stripped:
+                    m = _MD_PYTESTMARK_RE.match(stripped)
+                    if m:
+                        self.pending_marks.append(m.group(1))
+                # Check for pytest fixture comment
+                elif "pytestfixture:" in stripped:
+                    m = _MD_PYTESTFIXTURE_RE.match(stripped)
+                    if m:
+                        self.pending_fixtures.append(m.group(1))
+                # Check for continue comment
+                elif "continue:" in stripped:
+                    m = _MD_CONTINUE_RE.match(stripped)
+                    if m:
+                        self.pending_continue = m.group(1)
+                # Check for name comment
+                elif "codeblock-name:" in stripped:
+                    m = _MD_CODEBLOCK_NAME_RE.match(stripped)
+                    if m:
+                        self.pending_name = m.group(1)
+                continue
+
+            # Start of fenced code block?
+            fence = _MD_BACKTICKS_RE.match(text, hit)[0]  # type: ignore[index]
+            parts = text[hit + len(fence):line_end].strip().split(None, 1)
+            lang = parts[0].lower() if parts else ""
+            if lang not in self.languages:
+                continue
+
+            block_indent = hit - line_start
+            # Find the closing fence: a line that starts with the same fence
+            close_start = -1
+            while i < n_hits:
+                hit = hits[i]
+                i += 1
+                if hit < pos or not text.startswith(fence, hit):
+                    continue
+                close_start = text.rfind("\n", 0, hit) + 1
+                if close_start == hit or text[close_start:hit].isspace():
+                    break
+                close_start = -1
+            if close_start == -1:
+                if not final:
+                    # The closing fence may be in the next window
+                    self.rest = line_start
+                # Unterminated block swallows the rest of the document
+                break
+
+            extra = parts[1] if len(parts) > 1 else ""
+            # Determine name from info string or pending comment
+            snippet_name = None
+            for token in extra.split():
+                if token.startswith("name=") or token.startswith("name:"):
+                    snippet_name = (
+                        token.split("=", 1)[-1]
+                        if "=" in token
+                        else token.split(":", 1)[-1]
+                    )
+                    break
+            if snippet_name is None:
+                snippet_name = self.pending_name
+            self.pending_name = None
+
+            snippet_group = None
+            # Continue overrides snippet_name for grouping
+            if self.pending_continue:
+                snippet_group = self.pending_continue
+                self.pending_continue = None
+            snippet = None
+            if self.name_filter is None or self.name_filter(snippet_name):
+                # Collect code lines (dedent by the fence indentation)
+                body = text[pos:close_start]
+                line_no += text.count("\n", counted, pos)
+                counted = pos
+                snippet = CodeSnippet(
+                    name=snippet_name,
+                    code=dedent_block(body[:-1], block_indent),
+                    line=line_no,
+                    marks=intern_names(self.pending_marks),
+                    fixtures=intern_names(self.pending_fixtures),
+                    group=snippet_group,
+                    end_line=line_no + body.count("\n"),
+                )
+            # Reset pending marks after collecting
+            self.pending_marks = [CODEBLOCK_MARK]  # Reset to default
+            self.pending_fixtures.clear()  # Clear pending fixtures
+
+            # Resume after the closing fence line
+            line_end = text.find("\n", hit)
+            pos = text_len + 1 if line_end == -1 else line_end + 1
+            if snippet is not None:
+                yield snippet
+
+        self.line_no = line_no + text.count("\n", counted, self.rest)
+
+
+def parse_markdown(
+    text: str,
+    name_filter: Optional[NameFilter] = None,
+) -> list[CodeSnippet]:
     """
     Parse Markdown text and extract Python code snippets as CodeSnippet
     objects.
@@ -40,256 +206,96 @@ def parse_markdown(text: str) -> list[CodeSnippet]:
       - Fenced code blocks with ```python (and optional name=<name> in the
         info string)
     Captures each snippet's name, code, starting line, and any pytest marks.
+    If `name_filter` is given, only blocks whose name it accepts are
+    returned; the code of the other blocks is never built.
     """
-    config = get_config()
-    snippets: list[CodeSnippet] = []
-    lines = text.splitlines()
-    pending_name: Optional[str] = None
-    pending_continue: Optional[str] = None
-    pending_marks: list[str] = [CODEBLOCK_MARK]
-    pending_fixtures: list[str] = []
-    in_block = False
-    fence = ""
-    block_indent = 0
-    code_buffer: list[str] = []
-    snippet_name: Optional[str] = None
-    start_line = 0
-
-    for idx, line in enumerate(lines, start=1):
-        stripped = line.strip()
-
-        if not in_block:
-            # Check for pytest mark comment
-            if stripped.startswith("<!--") and "pytestmark:" in stripped:
-                m = re.match(r"<!--\s*pytestmark:\s*(\w+)\s*-->", stripped)
-                if m:
-                    pending_marks.append(m.group(1))
-                continue
+    scanner = _MarkdownScanner(get_config().all_md_codeblocks, name_filter)
+    return list(scanner.scan(normalise_newlines(text), final=True))
 
-            # Check for pytest fixture comment
-            if stripped.startswith("<!--") and "pytestfixture:" in stripped:
-                m = re.match(r"<!--\s*pytestfixture:\s*(\w+)\s*-->", stripped)
-                if m:
-                    pending_fixtures.append(m.group(1))
-                continue
 
-            # Check for continue comment
-            if stripped.startswith("<!--") and "continue:" in stripped:
-                m = re.match(r"<!--\s*continue:\s*(\S+)\s*-->", stripped)
-                if m:
-                    pending_continue = m.group(1)
-                continue
+def iter_markdown(
+    source: Source,
+    chunk_size: int = CHUNK_SIZE,
+    name_filter: Optional[NameFilter] = None,
+) -> Iterator[CodeSnippet]:
+    """
+    Streaming variant of :func:`parse_markdown`.
 
-            # Check for name comment
-            if stripped.startswith("<!--") and "codeblock-name:" in stripped:
-                m = re.match(
-                    r"<!--\s*codeblock-name:\s*([^ >]+)\s*-->", stripped
-                )
-                if m:
-                    pending_name = m.group(1)
-                continue
+    Takes a binary file object or an iterable of lines and yields snippets
+    as the blocks close. The document is scanned in windows of about
+    `chunk_size` characters, so no more than a window (and the block being
+    read) is held in memory at a time.
+    """
+    scanner = _MarkdownScanner(get_config().all_md_codeblocks, name_filter)
+    yield from scanner.feed(source, chunk_size)
 
-            # Start of fenced code block?
-            if line.lstrip().startswith("```"):
-                indent = len(line) - len(line.lstrip())
-                m = re.match(r"^`{3,}", line.lstrip())
-                if not m:
-                    continue
-                fence = m.group(0)
-                info = line.lstrip()[len(fence):].strip()
-                parts = info.split(None, 1)
-                lang = parts[0].lower() if parts else ""
-                extra = parts[1] if len(parts) > 1 else ""
-                if lang in config.all_md_codeblocks:
-                    in_block = True
-                    block_indent = indent
-                    start_line = idx + 1
-                    code_buffer = []
-                    # Determine name from info string or pending comment
-                    snippet_name = None
-                    for token in extra.split():
-                        if (
-                            token.startswith("name=")
-                            or token.startswith("name:")
-                        ):
-                            snippet_name = (
-                                token.split("=", 1)[-1]
-                                if "=" in token
-                                else token.split(":", 1)[-1]
-                            )
-                            break
-                    if snippet_name is None:
-                        snippet_name = pending_name
-                    # Reset pending_name; marks stay until block closes
-                    pending_name = None
-
-        else:
-            # Inside a fenced code block
-            if line.lstrip().startswith(fence):
-                # End of block
-                in_block = False
-                code_text = "\n".join(code_buffer)
-                snippet_group = None
-                # Continue overrides snippet_name for grouping
-                if pending_continue:
-                    snippet_group = pending_continue
-                    pending_continue = None
-                snippets.append(CodeSnippet(
-                    name=snippet_name,
-                    code=code_text,
-                    line=start_line,
-                    marks=pending_marks.copy(),
-                    fixtures=pending_fixtures.copy(),
-                    group=snippet_group,
-                ))
-                # Reset pending marks after collecting
-                pending_marks = [CODEBLOCK_MARK]  # Reset to default
-                snippet_name = None
-                pending_fixtures.clear()  # Clear pending fixtures
-            else:
-                # Collect code lines (dedent by block_indent)
-                if line.strip() == "":
-                    code_buffer.append("")
-                else:
-                    if len(line) >= block_indent:
-                        code_buffer.append(line[block_indent:])
-                    else:
-                        code_buffer.append(line.lstrip())
 
-    return snippets
+def reparse_markdown(
+    previous: list[CodeSnippet],
+    old_text: str,
+    new_text: str,
+) -> list[CodeSnippet]:
+    """
+    Incremental variant of :func:`parse_markdown` for edited documents.
+
+    `previous` is the result of ``parse_markdown(old_text)``. Only the
+    edited lines (and the blocks around them) are scanned again; snippets
+    after them are reused with their line numbers shifted.
+    """
+    languages = get_config().all_md_codeblocks
+
+    def make_scanner(first_line: int) -> _MarkdownScanner:
+        scanner = _MarkdownScanner(languages)
+        scanner.line_no = first_line + 1
+        return scanner
 
+    return reparse(previous, old_text, new_text, make_scanner)
 
-class MarkdownFile(pytest.Module):
+
+def parse_markdown_file(path: Path, config: Config) -> list[CodeSnippet]:
+    """
+    Parse the Markdown file at `path`, keeping only the snippets to be
+    tested.
+    """
+    return MarkdownDialect().parse_file(path, config)[0]
+
+
+class MarkdownDialect(Dialect):
+    """Fenced code blocks with HTML comment directives."""
+
+    name = "markdown"
+
+    def extensions(self, config: Config) -> tuple[str, ...]:
+        return config.all_md_extensions
+
+    def languages(self, config: Config) -> tuple[str, ...]:
+        return config.all_md_codeblocks
+
+    def has_codeblocks(self, path: Union[str, Path], config: Config) -> bool:
+        return has_markdown_codeblocks(path, self.languages(config))
+
+    def scanner(
+        self,
+        path: Path,
+        config: Config,
+        name_filter: Optional[NameFilter] = None,
+    ) -> _MarkdownScanner:
+        return _MarkdownScanner(self.languages(config), name_filter)
+
+    def collect_file(
+        self,
+        parent: pytest.Collector,
+        path: Path,
+    ) -> "MarkdownFile":
+        return MarkdownFile.from_parent(
+            parent=parent, path=path, dialect=self
+        )
+
+
+class MarkdownFile(CodeblockFile):
     """
     Collector for Markdown files, extracting only `test_`-prefixed code
     snippets.
     """
 
-    def _getobj(self) -> types.ModuleType:
-        m = types.ModuleType(self.path.stem)
-        m.__file__ = str(self.path)
-        m.__test__ = False  # prevent PyCollector from auto-collecting
-        return m
-
-    def collect(self) -> Generator[pytest.Function, None, None]:
-        # Register with fixture manager so module-scoped fixtures can find
-        # a pytest.Module parent node (fixes scope resolution when plugins
-        # like pytest-recording/langchain-tests define module-scoped fixtures).
-        self.session._fixturemanager.parsefactories(self)
-        text = self.path.read_text(encoding="utf-8")
-        raw = parse_markdown(text)
-        config = get_config()
-
-        # Include both named and nameless blocks, if config allows nameless
-        # blocks. Nameless blocks will be auto-named based on the module
-        # name and a counter, ensuring they get collected as tests.
-        if config.test_nameless_codeblocks:
-            tests = []
-            counter = 1
-            module_name = self.path.stem
-
-            for sn in raw:
-                if sn.name and sn.name.startswith(TEST_PREFIX):
-                    tests.append(sn)
-                elif not sn.name:
-                    auto_name = f"{TEST_PREFIX}{module_name}_{counter}"
-                    counter += 1
-                    sn.name = auto_name
-                    tests.append(sn)
-        # If config does not allow nameless blocks, only those with explicit
-        # names starting with TEST_PREFIX will be collected.
-        else:
-            # keep only snippets named test_*
-            tests = [
-                sn for sn in raw if sn.name and sn.name.startswith(TEST_PREFIX)
-            ]
-
-        combined = group_snippets(tests)
-
-        for sn in combined:
-            # Bind the values we need so we don't close over `sn` itself
-            _sn_name = sn.name
-            _fpath = str(self.path)
-            _is_pytestrun = PYTESTRUN_MARK in sn.marks
-
-            # Build list of fixture names requested by this snippet
-            _fixture_names: list[str] = list(sn.fixtures)
-
-            # If snippet is marked as needing DB, also request the `db`
-            # fixture, unless user already added it explicitly.
-            if (
-                DJANGO_DB_MARKS.intersection(sn.marks)
-                and "db" not in _fixture_names
-            ):
-                _fixture_names.append("db")
-
-            # Generate a real pytest Function so fixtures work
-            def make_func(
-                code,
-                sn_name=_sn_name,
-                fpath=_fpath,
-                fixture_names=_fixture_names,
-                is_pytestrun=_is_pytestrun,
-            ):
-                # This inner function *actually* has a **fixtures signature,
-                # but we override __signature__ so pytest passes the right
-                # fixtures and names.
-                def test_block(**fixtures):
-                    if is_pytestrun:
-                        run_pytest_style_code(
-                            code=code,
-                            snippet_name=sn_name,
-                            path=fpath,
-                        )
-                        return
-
-                    # Normal (non-pytestrun) execution path
-                    ex_code = code
-                    if contains_top_level_await(code):
-                        # Auto-wrap async code
-                        ex_code = wrap_async_code(code)
-
-                    try:
-                        compiled = compile(ex_code, fpath, "exec")
-                    except SyntaxError as err:
-                        raise SyntaxError(
-                            f"Syntax error in "
-                            f"codeblock `{sn_name}` in {fpath}:\n"
-                            f"\n{textwrap.indent(ex_code, prefix='    ')}\n\n"
-                            f"{traceback.format_exc()}"
-                        ) from err
-
-                    try:
-                        # Make fixtures available as top-level names
-                        # inside the executed snippet.
-                        exec(compiled, {"asyncio": asyncio, **dict(fixtures)})
-                    except Exception as err:
-                        raise Exception(
-                            f"Error in "
-                            f"codeblock `{sn_name}` in {fpath}:\n"
-                            f"\n{textwrap.indent(ex_code, prefix='    ')}\n\n"
-                            f"{traceback.format_exc()}"
-                        ) from err
-
-                # Tell pytest which fixture arguments this test has:
-                test_block.__signature__ = inspect.Signature(
-                    [
-                        inspect.Parameter(
-                            name,
-                            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                        )
-                        for name in fixture_names
-                    ]
-                )
-                return test_block
-
-            callobj = make_func(sn.code)
-            fn = pytest.Function.from_parent(
-                parent=self,
-                name=sn.name,
-                callobj=callobj,
-            )
-            # Apply any marks (e.g. django_db)
-            for m in sn.marks:
-                fn.add_marker(getattr(pytest.mark, m))
-            yield fn
+    dialect = MarkdownDialect()
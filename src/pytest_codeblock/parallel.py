@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from .cache import ParseCache
+from .collector import CodeSnippet
+from .config import Config, get_config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "ParsePool",
+    "parse_pool_key",
+)
+
+Parsed = tuple[list[CodeSnippet], list[Path]]
+
+parse_pool_key = pytest.StashKey["ParsePool"]()
+
+
+def _parse_file(dialect_name: str, path: str, config: Config) -> Parsed:
+    """Parse a documentation file (run in a worker process)."""
+    # Imported here, as the collectors import this module
+    from .dialects import get_dialect
+
+    dialect = get_dialect(dialect_name)
+    if not dialect.has_codeblocks(path, config):
+        return [], []
+    return dialect.parse_file(Path(path), config)
+
+
+def _ignored(session: pytest.Session, path: Path) -> bool:
+    """Whether ``pytest_ignore_collect`` keeps `path` from being collected."""
+    ihook = session.gethookproxy(path)
+    return bool(
+        ihook.pytest_ignore_collect(
+            collection_path=path, config=session.config
+        )
+    )
+
+
+def _discover(session: pytest.Session, config: Config) -> Iterator[Path]:
+    """
+    Find the documentation files the session is going to collect.
+
+    Walks the command line arguments (or ``testpaths``) the way pytest
+    does, skipping ``norecursedirs`` and what ``pytest_ignore_collect``
+    ignores (``--ignore``, ``--ignore-glob``, ``collect_ignore`` of
+    ``conftest.py`` files and the like). This is only used to start
+    parsing early; files missed here are parsed on demand.
+    """
+    pytest_config = session.config
+    invocation_dir = pytest_config.invocation_params.dir
+    norecursedirs = pytest_config.getini("norecursedirs")
+    # Imported here, as the collectors import this module
+    from .dialects import get_dialects
+
+    extensions = tuple(
+        ext
+        for dialect in get_dialects()
+        for ext in dialect.extensions(config)
+    )
+
+    for arg in pytest_config.args:
+        root = Path(os.path.abspath(invocation_dir / arg.split("::", 1)[0]))
+        if root.is_file():
+            if root.name.lower().endswith(extensions):
+                yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(
+                name
+                for name in dirnames
+                if not any(fnmatch(name, pat) for pat in norecursedirs)
+                and not _ignored(session, Path(dirpath, name))
+            )
+            for name in sorted(filenames):
+                path = Path(dirpath, name)
+                if name.lower().endswith(extensions) and not _ignored(
+                    session, path
+                ):
+                    yield path
+
+
+class ParsePool:
+    """
+    Documentation files parsed ahead of collection in worker processes.
+
+    Collection itself still happens one file at a time in the main process,
+    so collection order and node IDs are the same as without the pool; the
+    collectors merely pick up results that are already there.
+    """
+
+    def __init__(self, workers: int) -> None:
+        # Forking the pytest process, with its threads and open resources,
+        # is not safe; workers start from a clean interpreter instead
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+        self.futures: dict[Path, Future] = {}
+        # Snippets of the files found in the parse cache, which are not
+        # parsed
+        self.cached: dict[Path, list[CodeSnippet]] = {}
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """Start parsing the documentation files of `session`."""
+        pytest_config = session.config
+        workers = pytest_config.getoption("codeblock_parse_workers", 0)
+        if not workers or workers < 1:
+            return
+        # Imported here, as the collectors import this module
+        from .dialects import find_dialect
+
+        config = get_config()
+        parse_cache = ParseCache.from_pytest_config(pytest_config, config)
+        pool = cls(workers)
+        for path in _discover(session, config):
+            if path in pool.futures or path in pool.cached:
+                continue
+            # No need to parse what is in the cache
+            cached = parse_cache.get(path) if parse_cache else None
+            if cached is not None:
+                pool.cached[path] = cached
+                continue
+            dialect = find_dialect(path, config)
+            if dialect is None:
+                continue
+            pool.futures[path] = pool.executor.submit(
+                _parse_file, dialect.name, str(path), config
+            )
+        pytest_config.stash[parse_pool_key] = pool
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """Drop the pool of `session` along with any unused results."""
+        pool = session.config.stash.get(parse_pool_key, None)
+        if pool is not None:
+            del session.config.stash[parse_pool_key]
+            pool.executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def from_pytest_config(pytest_config: Any) -> Optional["ParsePool"]:
+        """Parse pool of a session, or None if parsing is not parallel."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(parse_pool_key, None)
+
+    def take_cached(
+        self,
+        path: Path,
+        parse_cache: Optional[ParseCache],
+    ) -> Optional[list[CodeSnippet]]:
+        """
+        Return the snippets of `path` in `parse_cache`, or None on a miss.
+        Files found by the pool were looked up once already, when it started.
+        """
+        key = Path(os.path.abspath(path))
+        if key in self.cached:
+            return self.cached.pop(key)
+        if parse_cache is None or key in self.futures:
+            return None
+        return parse_cache.get(path)
+
+    def take(self, path: Path) -> Optional[Parsed]:
+        """
+        Return the parse result of `path`, or None if it was not submitted
+        or parsing failed (in which case the collector parses it again and
+        reports the error).
+        """
+        future = self.futures.pop(Path(os.path.abspath(path)), None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
@@ -0,0 +1,134 @@
+import json
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "PHASES",
+    "PhaseTimer",
+    "phase_timer_key",
+)
+
+# Phases the time of a code block is split into, in the order they happen
+PHASES = ("parse", "async", "compile", "setup", "exec", "pytestrun")
+
+phase_timer_key = pytest.StashKey["PhaseTimer"]()
+
+
+class PhaseTimer:
+    """
+    Wall time of code blocks, split into phases:
+
+    - ``parse``: the share of the code block in parsing its document (or
+      loading it from the parse cache)
+    - ``async``: telling whether the code block is run by an async plugin
+    - ``compile``: compiling the code block (or loading it from the bytecode
+      cache)
+    - ``setup``: setting up the fixtures of the code block
+    - ``exec``: running the code block (forked code blocks: forking and
+      waiting for the child)
+    - ``pytestrun``: running a ``pytestrun`` code block in a subprocess
+    """
+
+    def __init__(self) -> None:
+        # Node ID -> phase -> seconds
+        self.phases: dict[str, dict[str, float]] = {}
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """Time the phases of code blocks, if reported or written out."""
+        pytest_config = session.config
+        if (
+            pytest_config.getoption("codeblock_durations", 0) < 1
+            and not pytest_config.getoption("codeblock_durations_json", None)
+        ):
+            return
+        pytest_config.stash[phase_timer_key] = cls()
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """Write the phases out as JSON, if requested."""
+        pytest_config = session.config
+        timer = PhaseTimer.from_pytest_config(pytest_config)
+        path = pytest_config.getoption("codeblock_durations_json", None)
+        if timer is not None and path:
+            timer.write_json(Path(pytest_config.invocation_params.dir, path))
+
+    @staticmethod
+    def from_pytest_config(pytest_config: Any) -> Optional["PhaseTimer"]:
+        """Phase timer of a session, or None if phases are not timed."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(phase_timer_key, None)
+
+    def add(self, nodeid: str, phase: str, seconds: float) -> None:
+        """Add `seconds` to `phase` of the code block `nodeid`."""
+        phases = self.phases.setdefault(nodeid, {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, nodeid: str, phase: str) -> Iterator[None]:
+        """Add the time spent within the block to `phase` of `nodeid`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(nodeid, phase, time.perf_counter() - start)
+
+    def slowest(self, count: int) -> list[tuple[str, float, dict[str, float]]]:
+        """The `count` slowest code blocks as (nodeid, total, phases)."""
+        return sorted(
+            (
+                (nodeid, sum(phases.values()), phases)
+                for nodeid, phases in self.phases.items()
+            ),
+            key=lambda entry: entry[1],
+            reverse=True,
+        )[:count]
+
+    def report(self, terminalreporter: Any, count: int) -> None:
+        """Write the `count` slowest code blocks to the terminal."""
+        slowest = self.slowest(count)
+        if not slowest:
+            return
+        terminalreporter.write_sep("=", "slowest codeblock durations")
+        columns = ("total", *PHASES)
+        width = max(len(column) for column in columns) + 1
+        terminalreporter.write_line(
+            "".join(f"{column:>{width}}" for column in columns) + "  codeblock"
+        )
+        for nodeid, total, phases in slowest:
+            seconds = (total, *(phases.get(phase, 0.0) for phase in PHASES))
+            terminalreporter.write_line(
+                "".join(f"{f'{value:.2f}s':>{width}}" for value in seconds)
+                + f"  {nodeid}"
+            )
+
+    def as_json(self) -> dict[str, Any]:
+        """The phases of all code blocks, slowest first."""
+        return {
+            "phases": list(PHASES),
+            "codeblocks": [
+                {
+                    "nodeid": nodeid,
+                    "total": total,
+                    "phases": {
+                        phase: phases.get(phase, 0.0) for phase in PHASES
+                    },
+                }
+                for nodeid, total, phases in self.slowest(len(self.phases))
+            ],
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Write the phases of all code blocks to `path`."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_json(), indent=2) + "\n")
@@ -0,0 +1,127 @@
+import mmap
+import os
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "has_markdown_codeblocks",
+    "has_rst_codeblocks",
+)
+
+# UTF-8 encoding of the Kelvin sign, the only non-ASCII character that
+# ``str.lower()`` turns into an ASCII letter ("k").
+_KELVIN_SIGN = "\u212a".encode()
+
+
+@lru_cache(maxsize=None)
+def _language_re(languages: tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Byte pattern matching any of `languages` regardless of case.
+
+    Returns None when a language is not plain ASCII, as its upper-case
+    spellings cannot be matched reliably without decoding.
+    """
+    alternatives = []
+    for language in sorted(set(languages), key=len, reverse=True):
+        if not language.isascii():
+            return None
+        parts = []
+        for char in language.lower():
+            if char == "k":
+                parts.append(b"(?:[kK]|" + re.escape(_KELVIN_SIGN) + b")")
+            elif char.isalpha():
+                parts.append(f"[{char}{char.upper()}]".encode())
+            else:
+                parts.append(re.escape(char.encode()))
+        alternatives.append(b"".join(parts))
+    if not alternatives:
+        return None
+    return re.compile(b"|".join(alternatives))
+
+
+def _has_marker(
+    mm: mmap.mmap,
+    marker: bytes,
+    language_re: Optional[re.Pattern] = None,
+) -> bool:
+    """
+    Tell whether `marker` occurs in `mm`, followed by a match of
+    `language_re` on the same line if given.
+    """
+    pos = mm.find(marker)
+    while pos != -1:
+        if language_re is None:
+            return True
+        end = mm.find(b"\n", pos)
+        if end == -1:
+            end = len(mm)
+        if language_re.search(mm, pos + len(marker), end):
+            return True
+        pos = mm.find(marker, end)
+    return False
+
+
+def _scan_file(path: Union[str, Path], scan: Callable) -> bool:
+    """Run `scan` over a memory map of the file at `path`."""
+    try:
+        with open(path, "rb") as fh:
+            if not os.fstat(fh.fileno()).st_size:
+                return False
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return scan(mm)
+    except (OSError, ValueError):
+        # Leave it to the collector to report unreadable files
+        return True
+
+
+def has_markdown_codeblocks(
+    path: Union[str, Path],
+    languages: tuple[str, ...],
+) -> bool:
+    """
+    Tell whether the Markdown file at `path` may contain code blocks in one
+    of `languages`.
+
+    The raw bytes are searched without decoding them. False positives are
+    possible (the parser has the final word), false negatives are not.
+    """
+    language_re = _language_re(languages)
+    if language_re is None:
+        return True
+    # A fence with one of the languages further on the same line
+    return _scan_file(
+        path, lambda mm: _has_marker(mm, b"```", language_re)
+    )
+
+
+def has_rst_codeblocks(
+    path: Union[str, Path],
+    languages: tuple[str, ...],
+) -> bool:
+    """
+    Tell whether the reStructuredText file at `path` may contain code
+    blocks in one of `languages`, literal includes or named literal blocks.
+
+    The raw bytes are searched without decoding them. False positives are
+    possible (the parser has the final word), false negatives are not.
+    """
+    language_re = _language_re(languages)
+    if language_re is None:
+        return True
+    # A code directive with one of the languages further on the same line,
+    # a literalinclude, or a name that may turn a "::" into a literal block
+    return _scan_file(
+        path,
+        lambda mm: (
+            _has_marker(mm, b"literalinclude::")
+            or _has_marker(mm, b"codeblock-name:")
+            or _has_marker(mm, b"code-block::", language_re)
+            or _has_marker(mm, b"code::", language_re)
+        ),
+    )
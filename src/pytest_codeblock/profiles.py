@@ -0,0 +1,162 @@
+"""
+Profile of the child pytest sessions running ``pytestrun`` code blocks.
+
+By default, a child session is set up as the session running the
+documentation is: the same ``addopts``, every installed plugin and the
+whole ``sys.path``. A lean profile drops what code blocks do not need,
+which makes each child start faster.
+"""
+import os
+import sys
+import sysconfig
+from collections.abc import Iterable
+from importlib.metadata import entry_points
+from typing import Any, Optional
+
+from .config import Config, get_config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "ChildProfile",
+    "child_pythonpath",
+)
+
+# Environment variables setting up coverage measurement in subprocesses
+COVERAGE_ENV_PREFIXES = ("COV_CORE_", "COVERAGE_PROCESS_")
+
+
+def child_pythonpath(paths: Optional[Iterable[str]] = None) -> str:
+    """
+    ``PYTHONPATH`` giving a child interpreter the import paths of this one
+    (`paths`, by default ``sys.path``), leaving out those of the standard
+    library and site packages, which it has anyway.
+    """
+    if paths is None:
+        paths = sys.path
+    install = sysconfig.get_paths()
+    stdlib = os.path.normcase(os.path.abspath(install["stdlib"]))
+    defaults = {
+        os.path.normcase(os.path.abspath(install[key]))
+        for key in ("purelib", "platlib", "platstdlib")
+    }
+    kept = []
+    for path in paths:
+        normalised = os.path.normcase(os.path.abspath(path or os.curdir))
+        if normalised in defaults or (
+            normalised == stdlib or normalised.startswith(stdlib + os.sep)
+        ):
+            continue
+        if path not in kept:
+            kept.append(path)
+    return os.pathsep.join(kept)
+
+
+def _plugin_module(name: str) -> str:
+    """Module of the pytest plugin registered as `name`, or `name`."""
+    for entry_point in entry_points(group="pytest11", name=name):
+        return entry_point.module
+    return name
+
+
+def _active_coverage() -> Optional[Any]:
+    """Coverage measurement running in this process, if any."""
+    try:
+        import coverage
+    except ImportError:
+        return None
+    return coverage.Coverage.current()
+
+
+class ChildProfile:
+    """
+    How child pytest sessions are started: with the extra `args`, with the
+    ``addopts`` of the session or not, with installed plugins loaded
+    (`autoload`) or else only the `plugins` listed, and measuring
+    `coverage` if the session does.
+    """
+
+    def __init__(
+        self,
+        args: tuple[str, ...] = (),
+        addopts: bool = True,
+        autoload: bool = True,
+        plugins: tuple[str, ...] = (),
+        coverage: bool = False,
+    ) -> None:
+        self.extra_args = args
+        self.addopts = addopts
+        self.autoload = autoload
+        self.plugins = plugins
+        self.coverage = coverage
+
+    @classmethod
+    def from_config(cls, config: Optional[Config] = None) -> "ChildProfile":
+        """Profile of the ``pytestrun_*`` settings of `config`."""
+        if config is None:
+            config = get_config()
+        return cls(
+            args=config.pytestrun_args,
+            addopts=config.pytestrun_addopts,
+            autoload=config.pytestrun_autoload,
+            plugins=config.pytestrun_plugins,
+            coverage=config.pytestrun_coverage,
+        )
+
+    def args(self, args: list[str]) -> list[str]:
+        """Command line `args` of a child session, with those of the profile."""
+        args = list(args)
+        if not self.addopts:
+            args += ["-o", "addopts="]
+        if not self.autoload:
+            for plugin in self.plugins:
+                args += ["-p", _plugin_module(plugin)]
+        # The extra arguments come last, to override those before them
+        return [*args, *self.extra_args]
+
+    @property
+    def lean(self) -> bool:
+        """Whether the profile drops the ``addopts`` or installed plugins."""
+        return not self.addopts or not self.autoload
+
+    def env(self) -> dict[str, str]:
+        """
+        Environment of a child session: that of this process, with the
+        whole ``sys.path`` in ``PYTHONPATH``. A lean profile also leaves the
+        standard library and site packages out of ``PYTHONPATH`` and, unless
+        it measures coverage, the variables setting up coverage.
+        """
+        env = os.environ.copy()
+        if not self.lean:
+            env["PYTHONPATH"] = os.pathsep.join(sys.path)
+            return env
+        env["PYTHONPATH"] = child_pythonpath()
+        if not self.addopts:
+            env.pop("PYTEST_ADDOPTS", None)
+        if not self.autoload:
+            env["PYTEST_DISABLE_PLUGIN_AUTOLOAD"] = "1"
+        if not self.coverage:
+            for name in list(env):
+                if name.startswith(COVERAGE_ENV_PREFIXES):
+                    del env[name]
+        return env
+
+    def command(self) -> list[str]:
+        """
+        Command running pytest in a child interpreter, under ``coverage
+        run`` if coverage is propagated and measured in this process.
+        """
+        cov = _active_coverage() if self.coverage else None
+        if cov is None:
+            return [sys.executable, "-m", "pytest"]
+        command = [sys.executable, "-m", "coverage", "run", "--parallel-mode"]
+        if cov.config.config_file:
+            command.append(f"--rcfile={cov.config.config_file}")
+        # Given to coverage by pytest-cov, not in the configuration file
+        if cov.config.source:
+            command.append(f"--source={','.join(cov.config.source)}")
+        if cov.config.branch:
+            command.append("--branch")
+        command.append(f"--data-file={os.path.abspath(cov.config.data_file)}")
+        return [*command, "-m", "pytest"]
@@ -3,26 +3,74 @@ Helper module for running pytest-style tests found inside executed code blocks.
 When a code block is marked with `pytestrun`, its code is written to a
 temporary file and executed by pytest as a subprocess, so that fixtures,
 markers, setup/teardown, and assertions all work correctly.
+
+With ``pytestrun_mode = "inprocess"``, the code block is instead executed as
+a module in the pytest process, and its tests are collected as items of the
+document.
 """
+import ast
+import hashlib
 import os
+import re
 import subprocess
 import sys
 import tempfile
+import types
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Optional
+
+import pytest
+
+try:
+    from _pytest.assertion.rewrite import rewrite_asserts
+except ImportError:
+    # Private to pytest; without it, assertions are left as they are
+    rewrite_asserts = None  # type: ignore[assignment]
+
+from .phases import PhaseTimer
+from .profiles import ChildProfile
+from .timeouts import time_limit
+from .workers import PytestrunPool
 
 __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
-__all__ = ("run_pytest_style_code",)
+__all__ = (
+    "PytestrunModule",
+    "run_pytest_style_code",
+)
+
+
+def _run_subprocess(
+    args: list[str],
+    cwd: str,
+    timeout: Optional[float],
+) -> tuple[int, str]:
+    """Run pytest with `args` in a new interpreter, as profiled."""
+    profile = ChildProfile.from_config()
+    result = subprocess.run(
+        [*profile.command(), *profile.args(args)],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=profile.env(),
+        timeout=timeout,
+    )
+    return result.returncode, result.stdout + result.stderr
 
 
 def run_pytest_style_code(
     code: str,
     snippet_name: str,
     path: str,
+    timeout: Optional[float] = None,
+    pool: Optional[PytestrunPool] = None,
 ) -> None:
     """
-    Write the code block to a temporary file and run it with pytest.
-    Raises AssertionError on any test failures.
+    Write the code block to a temporary file and run it with pytest, in a
+    worker of `pool` if given, or else in a new subprocess.
+    Raises AssertionError on any test failures, and TimeoutError if pytest
+    runs for more than `timeout` seconds (after killing it).
     """
     project_root = os.getcwd()
     # Place the temp directory alongside the source file so that pytest walks
@@ -36,21 +84,23 @@ def run_pytest_style_code(
     try:
         with open(tmpfile, "w") as f:
             f.write(code)
-        env = os.environ.copy()
-        env["PYTHONPATH"] = os.pathsep.join(sys.path)
-        result = subprocess.run(
-            [
-                sys.executable, "-m", "pytest", tmpfile,
-                f"--rootdir={project_root}",
-                "--no-header", "-q",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=project_root,
-            env=env,
-        )
-        if result.returncode != 0:
-            output = (result.stdout + result.stderr).strip()
+        args = [tmpfile, f"--rootdir={project_root}", "--no-header", "-q"]
+        try:
+            if pool is not None:
+                returncode, output = pool.run(
+                    args, tmpfile, project_root, timeout
+                )
+            else:
+                returncode, output = _run_subprocess(
+                    args, project_root, timeout
+                )
+        except subprocess.TimeoutExpired as err:
+            raise TimeoutError(
+                f"pytestrun block `{snippet_name}` in {path} timed out "
+                f"after {timeout:g} seconds"
+            ) from err
+        if returncode != 0:
+            output = output.strip()
             raise AssertionError(
                 f"pytestrun block `{snippet_name}` in {path} failed:\n\n"
                 f"{output}"
@@ -61,3 +111,81 @@ def run_pytest_style_code(
             os.rmdir(tmpdir)
         except OSError:
             pass
+
+
+class PytestrunModule(pytest.Module):
+    """
+    Collector of a ``pytestrun`` code block run in-process.
+
+    The code block is executed as a module, with its assertions rewritten
+    as in test modules, and its ``test_*`` functions and ``Test*`` classes
+    are collected as pytest collects those of a test module, with fixtures,
+    marks and a report of their own, e.g. ``doc.md::test_block::test_x``.
+    Tracebacks point to the lines of the document. Executing the code
+    block fails once it runs for more than `timeout` seconds, if given.
+    """
+
+    code: str
+    # Line of the document the code block starts on
+    line: int
+    timeout: Optional[float]
+
+    def __init__(
+        self,
+        *args: Any,
+        code: str = "",
+        line: int = 1,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.code = code
+        self.line = line
+        self.timeout = timeout
+
+    @property
+    def module_name(self) -> str:
+        """
+        Name of the module of the code block, a valid identifier unique to
+        its node ID (e.g. ``pytest_codeblock_test_block_1a2b3c4d``).
+        """
+        name = re.sub(r"\W", "_", self.name)
+        digest = hashlib.sha256(self.nodeid.encode()).hexdigest()[:8]
+        return f"pytest_codeblock_{name}_{digest}"
+
+    def setup(self) -> None:
+        super().setup()
+        self.addfinalizer(self._forget)
+
+    def _forget(self) -> None:
+        sys.modules.pop(self.module_name, None)
+
+    def _getobj(self) -> types.ModuleType:
+        module = types.ModuleType(self.module_name)
+        module.__file__ = str(self.path)
+        # Looked up by e.g. dataclasses, as for any module, until the tests
+        # of the code block are done (or the session, if none of them run)
+        sys.modules[module.__name__] = module
+        self.config.add_cleanup(self._forget)
+        with self._timed("compile"):
+            code_obj = self._compile()
+        with self._timed("exec"), time_limit(self.timeout, self.name):
+            exec(code_obj, module.__dict__)
+        return module
+
+    def _timed(self, phase: str) -> AbstractContextManager[None]:
+        timer = PhaseTimer.from_pytest_config(self.config)
+        return timer.measure(self.nodeid, phase) if timer else nullcontext()
+
+    def _compile(self) -> types.CodeType:
+        fpath = str(self.path)
+        # Padded to the lines of the document, for tracebacks, and for the
+        # rewriter to find the source of assertions by their line
+        source = "\n" * (self.line - 1) + self.code
+        tree = ast.parse(source, fpath)
+        if (
+            rewrite_asserts is not None
+            and self.config.getoption("assertmode") == "rewrite"
+        ):
+            rewrite_asserts(tree, source.encode(), fpath, self.config)
+        return compile(tree, fpath, "exec", dont_inherit=True)
@@ -1,32 +1,32 @@
-import asyncio
-import inspect
 import re
-import textwrap
-import traceback
-import types
-from collections.abc import Generator
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from itertools import accumulate
 from pathlib import Path
 from typing import Optional, Union
 
 import pytest
 
-from .collector import CodeSnippet, group_snippets
-from .config import get_config
-from .constants import (
-    CODEBLOCK_MARK,
-    DJANGO_DB_MARKS,
-    PYTESTRUN_MARK,
-    TEST_PREFIX,
-)
-from .helpers import contains_top_level_await, wrap_async_code
-from .pytestrun import run_pytest_style_code
+from .collector import CodeSnippet, intern_names
+from .config import Config, get_config
+from .constants import CODEBLOCK_MARK
+from .dialects import CodeblockFile, Dialect
+from .helpers import dedent_block, normalise_newlines
+from .incremental import reparse
+from .prescan import has_rst_codeblocks
+from .streaming import CHUNK_SIZE, NameFilter, Source, WindowScanner
 
 __author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
 __copyright__ = "2025-2026 Artur Barseghyan"
 __license__ = "MIT"
 __all__ = (
+    "RSTDialect",
     "RSTFile",
+    "iter_rst",
     "parse_rst",
+    "parse_rst_file",
+    "reparse_rst",
     "resolve_literalinclude_path",
     "get_literalinclude_content",
 )
@@ -60,6 +60,17 @@ def resolve_literalinclude_path(
     return None
 
 
+def _literalinclude_candidates(
+    base_dir: Union[str, Path],
+    include_path: str,
+) -> list[Path]:
+    """Paths `resolve_literalinclude_path` looks at, in order."""
+    _base_path = Path(base_dir)
+    if _base_path.is_file():
+        _base_path = _base_path.parent
+    return [Path(include_path), _base_path / include_path]
+
+
 def get_literalinclude_content(path):
     try:
         with open(path) as f:
@@ -70,115 +81,208 @@ def get_literalinclude_content(path):
         ) from e
 
 
-def parse_rst(text: str, base_dir: Path) -> list[CodeSnippet]:
+# Marker for blank lines in the indent table. Being the largest value, a
+# blank line never ends an indented block: ``indents[k] >= indent`` holds.
+_BLANK = 0xFFFF
+
+# Every directive the parser understands, in a single pattern
+_RST_DIRECTIVE_RE = re.compile(
+    r"^(?P<indent>\s*)\.\.(?:"
+    r"\s*(?P<collect>pytestmark|pytestfixture):"
+    r"\s*(?P<collect_value>\w+(?:\([^()]*\))?)\s*$"
+    r"|\s*(?P<ref>continue|codeblock-name):\s*(?P<ref_value>\S+)\s*$"
+    r"| (?:code-block|code)::\s*(?P<lang>\w+)"
+    r"| literalinclude::(?P<include>.*)"
+    r")"
+)
+# Start of a line beginning with ``..`` (searched for in "\n" + text)
+_RST_DIRECTIVE_LINE_RE = re.compile(r"\n[^\S\n]*\.\.")
+# End of a line introducing a literal block
+_RST_LITERAL_LINE_RE = re.compile(r"::[^\S\n]*$", re.MULTILINE)
+
+
+def _indent_table(lines: list[str]) -> Union[array, list[int]]:
     """
-    Parse an RST document into CodeSnippet objects, capturing:
-      - .. pytestmark: <mark>
-      - .. continue: <name>
-      - .. codeblock-name: <name>
-      - .. code-block:: python
+    Build the indentation table of `lines`.
+
+    Each entry is the number of leading whitespace characters of the line,
+    or ``_BLANK`` for whitespace-only lines.
     """
-    config = get_config()
-    snippets: list[CodeSnippet] = []
-    lines = text.splitlines()
-    n = len(lines)
-
-    pending_name: Optional[str] = None
-    pending_marks: list[str] = [CODEBLOCK_MARK]
-    pending_fixtures: list[str] = []
-    pending_continue: Optional[str] = None
-    i = 0
-
-    while i < n:
-        line = lines[i]
-
-        # --------------------------------------------------------------------
-        # Collect `.. pytestmark: xyz`
-        # --------------------------------------------------------------------
-        m = re.match(r"^\s*\.\.\s*pytestmark:\s*(\w+)\s*$", line)
-        if m:
-            pending_marks.append(m.group(1))
-            i += 1
-            continue
-
-        # --------------------------------------------------------------------
-        # Collect `.. pytestfixture: foo`
-        # --------------------------------------------------------------------
-        m = re.match(r"^\s*\.\.\s*pytestfixture:\s*(\w+)\s*$", line)
-        if m:
-            pending_fixtures.append(m.group(1))
-            i += 1
-            continue
-
-        # --------------------------------------------------------------------
-        # The `.. literalinclude` directive
-        # --------------------------------------------------------------------
-        if line.strip().startswith(".. literalinclude::"):
-            path = line.split(".. literalinclude::", 1)[1].strip()
-            name = None
-
-            # Look ahead for name
-            j = i + 1
-            while j < len(lines) and lines[j].strip():
-                if ":name:" in lines[j]:
-                    name = lines[j].split(":name:", 1)[1].strip()
-                    break
-                j += 1
+    indents = [
+        len(ln) - len(stripped) if (stripped := ln.lstrip()) else _BLANK
+        for ln in lines
+    ]
+    try:
+        return array("H", indents)
+    except OverflowError:
+        # Lines indented by more than 65535 characters; keep a plain list
+        return indents
 
-            if name and name.startswith("test_"):
-                full_path = resolve_literalinclude_path(base_dir, path)
-                if full_path:
-                    snippet = CodeSnippet(
-                        code=get_literalinclude_content(full_path),
-                        line=i + 1,
-                        name=name,
-                        marks=pending_marks.copy(),
-                        fixtures=pending_fixtures.copy(),
-                    )
-                    snippets.append(snippet)
-                    pending_marks = [CODEBLOCK_MARK]
-                    pending_fixtures.clear()
-
-            i = j + 1
-            continue
-
-        # --------------------------------------------------------------------
-        # Collect `.. continue: foo`
-        # --------------------------------------------------------------------
-        m = re.match(r"^\s*\.\.\s*continue:\s*(\S+)\s*$", line)
-        if m:
-            pending_continue = m.group(1)
-            i += 1
-            continue
-
-        # --------------------------------------------------------------------
-        # Collect `.. codeblock-name: foo`
-        # --------------------------------------------------------------------
-        m = re.match(r"^\s*\.\.\s*codeblock-name:\s*(\S+)\s*$", line)
-        if m:
-            pending_name = m.group(1)
-            i += 1
-            continue
-
-        # --------------------------------------------------------------------
-        # The `.. code-block` directive
-        # --------------------------------------------------------------------
-        m = re.match(r"^(\s*)\.\. (?:code-block|code)::\s*(\w+)", line)
-        if m:
-            base_indent = len(m.group(1))
-            lang = m.group(2).lower()
-            if lang in config.all_rst_codeblocks:
+
+def _block_code(lines: list[str], start: int, end: int, indent: int) -> str:
+    """Join `lines[start:end]`, stripping `indent` columns of indentation."""
+    return dedent_block("\n".join(lines[start:end]), indent)
+
+
+class _RSTScanner(WindowScanner):
+    """
+    Scanner for RST text.
+
+    The indentation of every line is computed once into a compact table,
+    which is then used to find block boundaries. Lines starting with ``..``
+    are located with a whole-text search and matched against a single
+    directive pattern; all other lines are only looked at when they end
+    a ``::`` literal-block introduction while a name is pending.
+    """
+
+    def __init__(
+        self,
+        base_dir: Union[str, Path],
+        languages: tuple[str, ...],
+        name_filter: Optional[NameFilter] = None,
+    ) -> None:
+        self.base_dir = base_dir
+        self.languages = languages
+        self.name_filter = name_filter
+        self.pending_name: Optional[str] = None
+        self.pending_marks: list[str] = [CODEBLOCK_MARK]
+        self.pending_fixtures: list[str] = []
+        self.pending_continue: Optional[str] = None
+        self.line_offset = 0  # Number of lines before the next window
+        # Paths of the `test_` literal includes seen so far, as written
+        self.includes: list[str] = []
+
+    def _stop(self, text: str, offsets: list[int], i: int) -> None:
+        """Leave the text from line `i` on for the next window."""
+        self.rest = offsets[i] if i < len(offsets) else len(text)
+        self.line_offset += i
+
+    def scan(self, text: str, final: bool) -> Iterator[CodeSnippet]:
+        lines = text.splitlines()
+        n = len(lines)
+        indents = _indent_table(lines)
+        # Offset of the start of every line in `text` (and one past the end)
+        offsets = list(
+            accumulate(map((1).__add__, map(len, lines)), initial=0)
+        )
+        directive_lines = [
+            bisect_left(offsets, m.start())
+            for m in _RST_DIRECTIVE_LINE_RE.finditer("\n" + text)
+        ]
+        n_directives = len(directive_lines)
+        d = 0
+        base = self.line_offset
+        i = 0
+
+        while True:
+            while d < n_directives and directive_lines[d] < i:
+                d += 1  # Inside a block that has already been collected
+            next_directive = directive_lines[d] if d < n_directives else n
+
+            # A pending name turns the next "::" line into a literal block
+            literal = (
+                _RST_LITERAL_LINE_RE.search(
+                    text, offsets[i], offsets[next_directive]
+                )
+                if self.pending_name and i < next_directive
+                else None
+            )
+            if literal is not None:
+                i = bisect_right(offsets, literal.start()) - 1
+                m = None
+            elif d < n_directives:
+                i = next_directive
+                d += 1
+                m = _RST_DIRECTIVE_RE.match(lines[i])
+            else:
+                break
+
+            if m is not None:
+                # ------------------------------------------------------------
+                # Collect `.. pytestmark: xyz` and `.. pytestfixture: foo`
+                # ------------------------------------------------------------
+                collect = m.group("collect")
+                if collect == "pytestmark":
+                    self.pending_marks.append(m.group("collect_value"))
+                    i += 1
+                    continue
+                if collect == "pytestfixture":
+                    self.pending_fixtures.append(m.group("collect_value"))
+                    i += 1
+                    continue
+
+                # ------------------------------------------------------------
+                # Collect `.. continue: foo` and `.. codeblock-name: foo`
+                # ------------------------------------------------------------
+                ref = m.group("ref")
+                if ref == "continue":
+                    self.pending_continue = m.group("ref_value")
+                    i += 1
+                    continue
+                if ref == "codeblock-name":
+                    self.pending_name = m.group("ref_value")
+                    i += 1
+                    continue
+
+                # ------------------------------------------------------------
+                # The `.. literalinclude` directive
+                # ------------------------------------------------------------
+                include = m.group("include")
+                if include is not None:
+                    path = include.strip()
+                    name = None
+
+                    # Look ahead for name
+                    j = i + 1
+                    while j < n and indents[j] != _BLANK:
+                        if ":name:" in lines[j]:
+                            name = lines[j].split(":name:", 1)[1].strip()
+                            break
+                        j += 1
+                    if j == n and not final:
+                        # The options may go on in the next window
+                        self._stop(text, offsets, i)
+                        return
+
+                    if name and name.startswith("test_") and (
+                        self.name_filter is None or self.name_filter(name)
+                    ):
+                        self.includes.append(path)
+                        full_path = resolve_literalinclude_path(
+                            self.base_dir, path
+                        )
+                        if full_path:
+                            snippet = CodeSnippet(
+                                code=get_literalinclude_content(full_path),
+                                line=base + i + 1,
+                                name=name,
+                                marks=intern_names(self.pending_marks),
+                                fixtures=intern_names(self.pending_fixtures),
+                            )
+                            self.pending_marks = [CODEBLOCK_MARK]
+                            self.pending_fixtures.clear()
+                            yield snippet
+
+                    i = j + 1
+                    continue
+
+                # ------------------------------------------------------------
+                # The `.. code-block` directive
+                # ------------------------------------------------------------
+                if m.group("lang").lower() not in self.languages:
+                    i += 1
+                    continue
+                base_indent = len(m.group("indent"))
                 # Parse :name: option
                 name_val: Optional[str] = None
                 j = i + 1
                 while j < n:
-                    ln = lines[j]
-                    if not ln.strip():
+                    indent = indents[j]
+                    if indent == _BLANK:
                         j += 1
                         continue
-                    indent = len(ln) - len(ln.lstrip())
-                    if ln.lstrip().startswith(":") and indent > base_indent:
-                        opt = ln.lstrip()
+                    if indent > base_indent and lines[j][indent] == ":":
+                        opt = lines[j][indent:]
                         if opt.lower().startswith(":name:"):
                             name_val = opt.split(":", 2)[2].strip().split()[0]
                         j += 1
@@ -186,235 +290,211 @@ def parse_rst(text: str, base_dir: Path) -> list[CodeSnippet]:
                     break
                 # The j is first code line
                 if j >= n:
+                    if not final:
+                        self._stop(text, offsets, i)
+                        return
                     i = j
                     continue
-                first = lines[j]
-                content_indent = len(first) - len(first.lstrip())
+                content_indent = indents[j]
                 if content_indent <= base_indent:
                     i = j
                     continue
                 # Collect code
-                buf: list[str] = []
                 k = j
-                while k < n:
-                    ln = lines[k]
-                    if not ln.strip():
-                        buf.append("")
-                        k += 1
-                        continue
-                    ind = len(ln) - len(ln.lstrip())
-                    if ind >= content_indent:
-                        buf.append(ln[content_indent:])
-                        k += 1
-                    else:
-                        break
+                while k < n and indents[k] >= content_indent:
+                    k += 1
+                if k == n and not final:
+                    # The block may go on in the next window
+                    self._stop(text, offsets, i)
+                    return
                 sn_group = None
                 # Decide snippet name: continue overrides name_val/pending_name
-                if pending_continue:
-                    sn_group = pending_continue
-                    pending_continue = None
-                sn_name = name_val or pending_name
-                sn_marks = pending_marks.copy()
-                sn_fixtures = pending_fixtures.copy()
-                pending_name = None
-                pending_marks = [CODEBLOCK_MARK]  # clear pending marks
-                pending_fixtures.clear()
-
-                snippets.append(CodeSnippet(
-                    name=sn_name,
-                    code="\n".join(buf),
-                    line=j + 1,
-                    marks=sn_marks,
-                    fixtures=sn_fixtures,
-                    group=sn_group,
-                ))
-
+                if self.pending_continue:
+                    sn_group = self.pending_continue
+                    self.pending_continue = None
+                sn_name = name_val or self.pending_name
+                sn_marks = intern_names(self.pending_marks)
+                sn_fixtures = intern_names(self.pending_fixtures)
+                self.pending_name = None
+                self.pending_marks = [CODEBLOCK_MARK]  # clear pending marks
+                self.pending_fixtures.clear()
+
+                if self.name_filter is None or self.name_filter(sn_name):
+                    yield CodeSnippet(
+                        name=sn_name,
+                        code=_block_code(lines, j, k, content_indent),
+                        line=base + j + 1,
+                        marks=sn_marks,
+                        fixtures=sn_fixtures,
+                        group=sn_group,
+                        end_line=base + k,
+                    )
                 i = k
                 continue
-            else:
+
+            # ----------------------------------------------------------------
+            # The literal-block via "::"
+            # ----------------------------------------------------------------
+            if not (self.pending_name and lines[i].rstrip().endswith("::")):
                 i += 1
                 continue
-
-        # --------------------------------------------------------------------
-        # The literal-block via "::"
-        # --------------------------------------------------------------------
-        if line.rstrip().endswith("::") and pending_name:
-            # Similar override logic
-            sn_group = None
-            if pending_continue:
-                sn_group = pending_continue
-                pending_continue = None
-            sn_name = pending_name
-            sn_marks = pending_marks.copy()
-            sn_fixtures = pending_fixtures.copy()
-            pending_name = None
-            pending_marks = [CODEBLOCK_MARK]  # clear pending marks
-            pending_fixtures.clear()
             j = i + 1
-            if j < n and not lines[j].strip():
+            if j < n and indents[j] == _BLANK:
                 j += 1
+            if j < n:
+                content_indent = indents[j]
+                if content_indent == _BLANK:
+                    # A second blank line: its whitespace sets the indentation
+                    content_indent = len(lines[j])
+                k = j
+                while k < n and indents[k] >= content_indent:
+                    k += 1
+            else:
+                k = n
+            if k == n and not final:
+                # The block may go on in the next window
+                self._stop(text, offsets, i)
+                return
+            # Similar override logic
+            sn_group = None
+            if self.pending_continue:
+                sn_group = self.pending_continue
+                self.pending_continue = None
+            sn_name = self.pending_name
+            sn_marks = intern_names(self.pending_marks)
+            sn_fixtures = intern_names(self.pending_fixtures)
+            self.pending_name = None
+            self.pending_marks = [CODEBLOCK_MARK]  # clear pending marks
+            self.pending_fixtures.clear()
             if j >= n:
                 i = j
                 continue
-            first = lines[j]
-            content_indent = len(first) - len(first.lstrip())
-            buf: list[str] = []
-            k = j
-            while k < n:
-                ln = lines[k]
-                if not ln.strip():
-                    buf.append("")
-                    k += 1
-                    continue
-                ind = len(ln) - len(ln.lstrip())
-                if ind >= content_indent:
-                    buf.append(ln[content_indent:])
-                    k += 1
-                else:
-                    break
-            snippets.append(CodeSnippet(
-                name=sn_name,
-                code="\n".join(buf),
-                line=j + 1,
-                marks=sn_marks,
-                fixtures=sn_fixtures,
-                group=sn_group,
-            ))
+            if self.name_filter is None or self.name_filter(sn_name):
+                yield CodeSnippet(
+                    name=sn_name,
+                    code=_block_code(lines, j, k, content_indent),
+                    line=base + j + 1,
+                    marks=sn_marks,
+                    fixtures=sn_fixtures,
+                    group=sn_group,
+                    end_line=base + k,
+                )
             i = k
-            continue
 
-        i += 1
+        self._stop(text, offsets, n)
 
-    return snippets
 
+def parse_rst(
+    text: str,
+    base_dir: Path,
+    name_filter: Optional[NameFilter] = None,
+) -> list[CodeSnippet]:
+    """
+    Parse an RST document into CodeSnippet objects, capturing:
+      - .. pytestmark: <mark>
+      - .. continue: <name>
+      - .. codeblock-name: <name>
+      - .. code-block:: python
 
-class RSTFile(pytest.Module):
-    """Collect RST code-block tests as real test functions."""
+    If `name_filter` is given, only blocks whose name it accepts are
+    returned; the code of the other blocks is never built.
+    """
+    scanner = _RSTScanner(
+        base_dir, get_config().all_rst_codeblocks, name_filter
+    )
+    return list(scanner.scan(normalise_newlines(text), final=True))
+
+
+def iter_rst(
+    source: Source,
+    base_dir: Path,
+    chunk_size: int = CHUNK_SIZE,
+    name_filter: Optional[NameFilter] = None,
+) -> Iterator[CodeSnippet]:
+    """
+    Streaming variant of :func:`parse_rst`.
 
-    def _getobj(self) -> types.ModuleType:
-        m = types.ModuleType(self.path.stem)
-        m.__file__ = str(self.path)
-        m.__test__ = False  # prevent PyCollector from auto-collecting
-        return m
-
-    def collect(self) -> Generator[pytest.Function, None, None]:
-        # Register this node with the fixture manager so that module-scoped
-        # fixtures (e.g. vcr_cassette_dir from pytest-recording/langchain-tests)
-        # can resolve their scope by walking up to a pytest.Module parent.
-        self.session._fixturemanager.parsefactories(self)
-        text = self.path.read_text(encoding="utf-8")
-        raw = parse_rst(text, self.path)
-        config = get_config()
-
-        # Include both named and nameless blocks, if config allows nameless
-        # blocks. Nameless blocks will be auto-named based on the module
-        # name and a counter, ensuring they get collected as tests.
-        if config.test_nameless_codeblocks:
-            tests = []
-            counter = 1
-            module_name = self.path.stem
-
-            for sn in raw:
-                if sn.name and sn.name.startswith(TEST_PREFIX):
-                    tests.append(sn)
-                elif not sn.name:
-                    auto_name = f"{TEST_PREFIX}{module_name}_{counter}"
-                    counter += 1
-                    sn.name = auto_name
-                    tests.append(sn)
-        # If config does not allow nameless blocks, only those with explicit
-        # names starting with TEST_PREFIX will be collected.
-        else:
-            # Only keep test_* snippets
-            tests = [
-                sn for sn in raw if sn.name and sn.name.startswith(TEST_PREFIX)
-            ]
-
-        combined = group_snippets(tests)
-
-        for sn in combined:
-            # Bind the values we need so we don't close over `sn` itself
-            _sn_name = sn.name
-            _fpath = str(self.path)
-            _is_pytestrun = PYTESTRUN_MARK in sn.marks
-
-            # Build list of fixture names requested by this snippet
-            _fixture_names: list[str] = list(sn.fixtures)
-
-            # If snippet is marked as needing DB, also request the `db`
-            # fixture, unless user already added it explicitly.
-            if (
-                DJANGO_DB_MARKS.intersection(sn.marks)
-                and "db" not in _fixture_names
-            ):
-                _fixture_names.append("db")
-
-            def make_func(
-                code,
-                sn_name=_sn_name,
-                fpath=_fpath,
-                fixture_names=_fixture_names,
-                is_pytestrun=_is_pytestrun,
-            ):
-                # This inner function *actually* has a **fixtures signature,
-                # but we override __signature__ so pytest passes the right
-                # fixtures and names.
-                def test_block(**fixtures):
-                    if is_pytestrun:
-                        run_pytest_style_code(
-                            code=code,
-                            snippet_name=sn_name,
-                            path=fpath,
-                        )
-                        return
+    Takes a binary file object or an iterable of lines and yields snippets
+    as the blocks close. The document is scanned in windows of about
+    `chunk_size` characters, so no more than a window (and the block being
+    read) is held in memory at a time.
+    """
+    scanner = _RSTScanner(
+        base_dir, get_config().all_rst_codeblocks, name_filter
+    )
+    yield from scanner.feed(source, chunk_size)
+
+
+def reparse_rst(
+    previous: list[CodeSnippet],
+    old_text: str,
+    new_text: str,
+    base_dir: Path,
+) -> list[CodeSnippet]:
+    """
+    Incremental variant of :func:`parse_rst` for edited documents.
 
-                    # Normal (non-pytestrun) execution path
-                    ex_code = code
-                    if contains_top_level_await(code):
-                        ex_code = wrap_async_code(code)
-
-                    try:
-                        compiled = compile(ex_code, fpath, "exec")
-                    except SyntaxError as err:
-                        raise SyntaxError(
-                            f"Syntax error in "
-                            f"codeblock `{sn_name}` in {fpath}:\n"
-                            f"\n{textwrap.indent(ex_code, prefix='    ')}\n\n"
-                            f"{traceback.format_exc()}"
-                        ) from err
-
-                    try:
-                        # Make fixtures available as top-level names
-                        # inside the executed snippet.
-                        exec(compiled, {"asyncio": asyncio, **dict(fixtures)})
-                    except Exception as err:
-                        raise Exception(
-                            f"Error in "
-                            f"codeblock `{sn_name}` in {fpath}:\n"
-                            f"\n{textwrap.indent(ex_code, prefix='    ')}\n\n"
-                            f"{traceback.format_exc()}"
-                        ) from err
-
-                # Tell pytest which fixture arguments this test has:
-                test_block.__signature__ = inspect.Signature(
-                    [
-                        inspect.Parameter(
-                            name,
-                            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                        )
-                        for name in fixture_names
-                    ]
-                )
-                return test_block
+    `previous` is the result of ``parse_rst(old_text, base_dir)``. Only the
+    edited lines (and the blocks around them) are scanned again; snippets
+    after them are reused with their line numbers shifted.
+    """
+    languages = get_config().all_rst_codeblocks
 
-            callobj = make_func(sn.code)
+    def make_scanner(first_line: int) -> _RSTScanner:
+        scanner = _RSTScanner(base_dir, languages)
+        scanner.line_offset = first_line
+        return scanner
 
-            fn = pytest.Function.from_parent(
-                parent=self,
-                name=sn.name,
-                callobj=callobj
-            )
-            # Re-apply any pytest.mark.<foo> markers
-            for m in sn.marks:
-                fn.add_marker(getattr(pytest.mark, m))
-            yield fn
+    return reparse(previous, old_text, new_text, make_scanner)
+
+
+def parse_rst_file(
+    path: Path,
+    config: Config,
+) -> tuple[list[CodeSnippet], list[Path]]:
+    """
+    Parse the RST file at `path`, keeping only the snippets to be tested.
+
+    Returns the snippets along with the files their literal includes
+    were (or could have been) resolved to.
+    """
+    return RSTDialect().parse_file(path, config)
+
+
+class RSTDialect(Dialect):
+    """``code-block`` directives, literal blocks and literal includes."""
+
+    name = "rst"
+
+    def extensions(self, config: Config) -> tuple[str, ...]:
+        return config.all_rst_extensions
+
+    def languages(self, config: Config) -> tuple[str, ...]:
+        return config.all_rst_codeblocks
+
+    def has_codeblocks(self, path: Union[str, Path], config: Config) -> bool:
+        return has_rst_codeblocks(path, self.languages(config))
+
+    def scanner(
+        self,
+        path: Path,
+        config: Config,
+        name_filter: Optional[NameFilter] = None,
+    ) -> _RSTScanner:
+        return _RSTScanner(path, self.languages(config), name_filter)
+
+    def dependencies(self, path: Path, scanner: _RSTScanner) -> list[Path]:
+        return [
+            candidate
+            for include in scanner.includes
+            for candidate in _literalinclude_candidates(path, include)
+        ]
+
+    def collect_file(self, parent: pytest.Collector, path: Path) -> "RSTFile":
+        return RSTFile.from_parent(parent=parent, path=path, dialect=self)
+
+
+class RSTFile(CodeblockFile):
+    """Collect RST code-block tests as real test functions."""
+
+    dialect = RSTDialect()
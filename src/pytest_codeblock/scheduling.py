@@ -0,0 +1,142 @@
+"""
+Scheduling of ``pytestrun`` code blocks ahead of their items.
+
+Running a ``pytestrun`` code block mostly means waiting for a child pytest
+session. Once collection is done, the code blocks selected in the session
+are started in the background, a bounded number at a time, and each item
+only waits for the result of its code block when it runs. Items still run
+and report in collection order.
+"""
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+import pytest
+
+from .batches import may_run
+from .config import get_config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "PytestrunScheduler",
+    "pytestrun_scheduler_key",
+)
+
+pytestrun_scheduler_key = pytest.StashKey["PytestrunScheduler"]()
+
+
+class PytestrunScheduler:
+    """
+    Runs the ``pytestrun`` code blocks of a session in up to `concurrency`
+    threads, each waiting for the child session of a code block.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        # Node ID -> function running the code block
+        self.runners: dict[str, Callable[[], None]] = {}
+        self.futures: dict[str, Future] = {}
+        # Node ID -> seconds the code block ran for, waiting aside
+        self.durations: dict[str, float] = {}
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Session of the items, once scheduled
+        self.session: Optional[pytest.Session] = None
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """
+        Set up the scheduler of `session`, if ``pytestrun_concurrency`` is
+        above 1.
+        """
+        concurrency = get_config().pytestrun_concurrency
+        if concurrency > 1:
+            session.config.stash[pytestrun_scheduler_key] = cls(concurrency)
+
+    @staticmethod
+    def schedule(session: pytest.Session) -> None:
+        """
+        Start the code blocks of the items selected in `session`, but for
+        those kept from running by their marks.
+        """
+        scheduler = PytestrunScheduler.from_pytest_config(session.config)
+        if scheduler is None or session.config.option.collectonly:
+            return
+        scheduler.session = session
+        for item in session.items:
+            if may_run(item):
+                scheduler.submit(item.nodeid)
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """
+        Cancel the code blocks of `session` not started yet, and wait for
+        the running ones.
+        """
+        scheduler = PytestrunScheduler.from_pytest_config(session.config)
+        if scheduler is not None:
+            del session.config.stash[pytestrun_scheduler_key]
+            scheduler.close()
+
+    @staticmethod
+    def from_pytest_config(
+        pytest_config: Any,
+    ) -> Optional["PytestrunScheduler"]:
+        """Scheduler of a session, or None if code blocks run in turn."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(pytestrun_scheduler_key, None)
+
+    def add(self, nodeid: str, runner: Callable[[], None]) -> None:
+        """Add the code block of item `nodeid`, run by calling `runner`."""
+        self.runners[nodeid] = runner
+
+    def submit(self, nodeid: str) -> None:
+        """Start the code block of `nodeid` in the background, if added."""
+        if nodeid not in self.runners or nodeid in self.futures:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                self.concurrency, thread_name_prefix="pytestrun"
+            )
+        self.futures[nodeid] = self.executor.submit(self._run_ahead, nodeid)
+
+    def _stopping(self) -> bool:
+        """Whether the session stops (e.g. with ``-x`` or ``--maxfail``)."""
+        session = self.session
+        return session is not None and bool(
+            session.shouldstop or session.shouldfail
+        )
+
+    def _run_ahead(self, nodeid: str) -> bool:
+        """Run the code block of `nodeid`, unless the session stops."""
+        if self._stopping():
+            return False
+        self._run(nodeid)
+        return True
+
+    def _run(self, nodeid: str) -> None:
+        start = time.perf_counter()
+        try:
+            self.runners[nodeid]()
+        finally:
+            self.durations[nodeid] = time.perf_counter() - start
+
+    def run(self, nodeid: str) -> None:
+        """
+        Wait for the code block of item `nodeid`, raising what running it
+        raised. A code block not started yet (e.g. if scheduling was
+        skipped) runs right away.
+        """
+        future = self.futures.get(nodeid)
+        if future is None or future.cancel() or not future.result():
+            self._run(nodeid)
+
+    def close(self) -> None:
+        """Cancel the code blocks not started yet, and wait for the rest."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
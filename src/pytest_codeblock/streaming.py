@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from typing import BinaryIO, Optional, Union
+
+from .collector import CodeSnippet
+from .helpers import LINE_BREAKS, normalise_newlines
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "CHUNK_SIZE",
+    "NameFilter",
+    "Source",
+    "WindowScanner",
+    "iter_text_chunks",
+)
+
+# Size of the windows (in characters) documents are scanned in
+CHUNK_SIZE = 1 << 20
+
+# A binary file object opened on the document, or an iterable of its lines
+Source = Union[BinaryIO, Iterable[str]]
+
+# Decides from its name (None if it has none) whether a block is collected
+NameFilter = Callable[[Optional[str]], bool]
+
+
+def iter_text_chunks(
+    source: Source,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Yield the text of `source` in pieces that end on line boundaries.
+
+    Binary file objects are read `chunk_size` bytes at a time and decoded
+    as UTF-8. Lines of an iterable that do not end with a line boundary
+    (as produced by ``str.splitlines()``) get a ``\\n`` appended.
+    """
+    if hasattr(source, "read"):
+        tail = b""
+        while True:
+            block = source.read(chunk_size)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            if cut:
+                yield block[:cut].decode("utf-8")
+            tail = block[cut:]
+        if tail:
+            yield tail.decode("utf-8")
+        return
+
+    for line in source:
+        if line.endswith("\n") or line.endswith(LINE_BREAKS):
+            yield line
+        else:
+            yield line + "\n"
+
+
+class WindowScanner(ABC):
+    """
+    Base class for scanners that parse a document window by window.
+
+    Subclasses keep the parser state (pending names, marks, fixtures) on
+    the instance and implement :meth:`scan`. Whatever a window leaves
+    unfinished (an open block, a lookahead running off its end) is carried
+    over into the next window, so memory use is bounded by the window size
+    plus the largest block rather than by the size of the document.
+    """
+
+    # Offset into the last scanned window where unprocessed text starts
+    rest: int = 0
+    # Blocks rejected by the filter are skipped without building their code
+    name_filter: Optional[NameFilter] = None
+
+    @abstractmethod
+    def scan(self, text: str, final: bool) -> Iterator[CodeSnippet]:
+        """
+        Yield the snippets found in `text` and set :attr:`rest`.
+
+        `text` consists of whole lines with ``\\n`` as the only line
+        boundary. Unless `final` is set, the scanner must not act on a
+        construct that may continue past the end of `text`; it stops at the
+        line that starts it instead and leaves it for the next window.
+        """
+
+    def feed(
+        self,
+        source: Source,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[CodeSnippet]:
+        """Yield snippets from `source` as each of them closes."""
+        carry = ""
+        pending: list[str] = []
+        pending_size = 0
+        for chunk in iter_text_chunks(source, chunk_size):
+            pending.append(chunk)
+            pending_size += len(chunk)
+            # Read at least as much as is carried over, so that scanning a
+            # large block again and again stays linear overall.
+            if pending_size < max(chunk_size, len(carry)):
+                continue
+            window = normalise_newlines(carry + "".join(pending))
+            pending.clear()
+            pending_size = 0
+            yield from self.scan(window, final=False)
+            carry = window[self.rest:]
+        window = normalise_newlines(carry + "".join(pending))
+        if window:
+            yield from self.scan(window, final=True)
@@ -0,0 +1,39 @@
+"""
+Helpers shared by the unit tests.
+"""
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+import pytest
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("FakeNode",)
+
+# The type checker takes FakeNode for the collector it stands in for
+if TYPE_CHECKING:
+    _Node = pytest.Collector
+else:
+    _Node = object
+
+
+class FakeNode(_Node):
+    """
+    Stand-in for a collector node in the setup chain (a document, or the
+    session if `session` is not given), with its stash and finalizers.
+    """
+
+    def __init__(self, session: Optional["FakeNode"] = None) -> None:
+        self.stash = pytest.Stash()
+        self.finalizers: list[Callable[[], Any]] = []
+        self.session = session or self  # type: ignore[assignment]
+
+    def addfinalizer(self, fin: Callable[[], Any]) -> None:
+        self.finalizers.append(fin)
+
+    def collect(self) -> list[Union[pytest.Item, pytest.Collector]]:
+        return []
+
+    def teardown(self) -> None:
+        while self.finalizers:
+            self.finalizers.pop()()
@@ -0,0 +1,275 @@
+"""
+Unit tests for running batches of pytestrun code blocks.
+
+Tests cover:
+- Mapping the test cases of the JUnit XML report to code blocks
+- Code blocks failing to import, failing on their own
+- Code blocks of a document run in one child session
+- Code blocks of all documents run in one child session
+- Selecting code blocks of a batch, leaving out skipped ones
+"""
+import os
+from typing import cast
+
+import pytest
+
+from ..batches import PytestrunBatch
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestBatchCollectors",
+    "TestReadReport",
+)
+
+PYPROJECT = """
+[tool.pytest.ini_options]
+addopts = "-p no:django -p no:cacheprovider"
+[tool.pytest-codeblock]
+pytestrun_batch = "{batch}"
+"""
+
+# Counts the sessions started in the project, this one included
+CONFTEST = """
+def pytest_sessionstart(session):
+    with open(session.config.rootpath / "sessions", "a") as f:
+        f.write("session\\n")
+"""
+
+
+# ============================================================================
+# Test reading the report
+# ============================================================================
+class TestReadReport:
+    """Test mapping test cases of the report to code blocks."""
+
+    REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+<testcase classname="pkg.test_a" name="test_one" file="pkg/test_a.py"/>
+<testcase classname="pkg.test_b" name="test_two" file="pkg/test_b.py">
+<failure message="assert 1 == 2">def test_two():
+&gt;   assert 1 == 2</failure>
+</testcase>
+</testsuite></testsuites>
+"""
+
+    @pytest.fixture
+    def batch(self):
+        batch = PytestrunBatch(session=cast(pytest.Session, None))
+        for name in ("test_a", "test_b", "test_c"):
+            batch.add(f"doc.md::{name}", name, "", "doc.md")
+        return batch
+
+    def modules(self, tmp_path):
+        return {
+            os.path.join(str(tmp_path), "pkg", f"{name}.py"): f"doc.md::{name}"
+            for name in ("test_a", "test_b", "test_c")
+        }
+
+    def test_results(self, batch, tmp_path):
+        report = tmp_path / "report.xml"
+        report.write_text(self.REPORT)
+        results = batch._read_report(
+            str(report), str(tmp_path), self.modules(tmp_path), "output"
+        )
+        assert results["doc.md::test_a"] is None
+        assert "test_two: def test_two():" in str(results["doc.md::test_b"])
+        assert "assert 1 == 2" in str(results["doc.md::test_b"])
+        assert "no tests ran" in str(results["doc.md::test_c"])
+        assert "output" in str(results["doc.md::test_c"])
+
+    def test_collection_error(self, batch, tmp_path):
+        """Collection errors without a file are mapped by module name."""
+        report = tmp_path / "report.xml"
+        report.write_text(
+            '<testsuites><testsuite name="pytest">'
+            '<testcase classname="" name="docs..pytest_cache.pkg.test_c">'
+            '<error message="collection failure">'
+            "ModuleNotFoundError: No module named 'missing'</error>"
+            "</testcase>"
+            '<testcase classname="pkg.test_a" name="test_one"/>'
+            "</testsuite></testsuites>"
+        )
+        results = batch._read_report(
+            str(report), str(tmp_path), self.modules(tmp_path), "output"
+        )
+        assert results["doc.md::test_a"] is None
+        assert "No module named 'missing'" in str(results["doc.md::test_c"])
+
+    def test_no_report(self, batch, tmp_path):
+        results = batch._read_report(
+            str(tmp_path / "report.xml"),
+            str(tmp_path),
+            self.modules(tmp_path),
+            "ERROR: usage",
+        )
+        for error in results.values():
+            assert isinstance(error, AssertionError)
+            assert "ERROR: usage" in str(error)
+
+
+# ============================================================================
+# Test collectors running batches of pytestrun code blocks
+# ============================================================================
+class TestBatchCollectors:
+    """Test pytestrun code blocks run in batches."""
+
+    DOC = """
+<!-- pytestmark: pytestrun -->
+```python name=test_pass
+import pytest
+
+
+@pytest.fixture
+def value():
+    return 1
+
+
+def test_value(value):
+    assert value == 1
+```
+
+<!-- pytestmark: pytestrun -->
+```python name=test_fail
+def test_fail():
+    assert 1 == 2
+```
+
+<!-- pytestmark: pytestrun -->
+```python name=test_empty
+VALUE = 1
+```
+
+```python name=test_plain
+assert True
+```
+"""
+
+    OTHER = """
+<!-- pytestmark: pytestrun -->
+```python name=test_pass
+def test_other():
+    assert True
+```
+"""
+
+    def setup(self, pytester, batch):
+        pytester.makepyprojecttoml(PYPROJECT.format(batch=batch))
+        pytester.makeconftest(CONFTEST)
+        pytester.makefile(".md", doc=self.DOC, other=self.OTHER)
+
+    def sessions(self, pytester):
+        """Number of child sessions started."""
+        path = pytester.path / "sessions"
+        return len(path.read_text().splitlines()) - 1
+
+    def test_file(self, pytester_subprocess):
+        self.setup(pytester_subprocess, "file")
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=3, failed=2)
+        result.stdout.fnmatch_lines(
+            [
+                "*pytestrun block `test_fail`*failed*",
+                "*assert 1 == 2*",
+                "*pytestrun block `test_empty`*failed*",
+                "*no tests ran*",
+            ],
+            consecutive=False,
+        )
+        # One child session per document
+        assert self.sessions(pytester_subprocess) == 2
+
+    def test_collection_error(self, pytester_subprocess):
+        """A code block failing to import does not fail the others."""
+        self.setup(pytester_subprocess, "file")
+        pytester_subprocess.makefile(
+            ".md",
+            broken=(
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_broken\n"
+                "import missing_module\n"
+                "```\n\n"
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_sibling\n"
+                "def test_ok():\n"
+                "    assert True\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-v")
+        result.assert_outcomes(passed=4, failed=3)
+        result.stdout.fnmatch_lines(
+            [
+                "broken.md::test_broken FAILED*",
+                "broken.md::test_sibling PASSED*",
+                "*No module named 'missing_module'*",
+            ],
+            consecutive=False,
+        )
+
+    def test_session(self, pytester_subprocess):
+        self.setup(pytester_subprocess, "session")
+        result = pytester_subprocess.runpytest("-v")
+        result.assert_outcomes(passed=3, failed=2)
+        result.stdout.fnmatch_lines(
+            [
+                "doc.md::test_pass PASSED*",
+                "doc.md::test_fail FAILED*",
+                "doc.md::test_empty FAILED*",
+                "other.md::test_pass PASSED*",
+            ],
+            consecutive=False,
+        )
+        assert self.sessions(pytester_subprocess) == 1
+
+    def test_selected(self, pytester_subprocess):
+        """Code blocks deselected in the session do not run."""
+        self.setup(pytester_subprocess, "session")
+        result = pytester_subprocess.runpytest("-k", "test_pass")
+        result.assert_outcomes(passed=2, deselected=3)
+        assert self.sessions(pytester_subprocess) == 1
+
+    def test_skipped(self, pytester_subprocess):
+        """Code blocks skipped in the session do not run with the batch."""
+        self.setup(pytester_subprocess, "file")
+        pytester_subprocess.makefile(
+            ".md",
+            skipped="".join(
+                "<!-- pytestmark: pytestrun -->\n"
+                f"<!-- pytestmark: {mark} -->\n"
+                f"```python name=test_{name}\n"
+                "import pathlib\n\n"
+                f'pathlib.Path("{name}.ran").touch()\n\n\n'
+                "def test_ok():\n"
+                "    pass\n"
+                "```\n\n"
+                for name, mark in (
+                    ("skip", "skip"),
+                    ("skipif", 'skipif("True")'),
+                    ("xfail", "codeblock"),
+                    ("run", "codeblock"),
+                    ("unless", 'skipif("sys.platform == \\"none\\"")'),
+                )
+            ),
+        )
+        # Keyword arguments of marks are not supported in documents
+        pytester_subprocess.makeconftest(
+            CONFTEST
+            + "\n\nimport pytest\n\n\n"
+            "def pytest_collection_modifyitems(items):\n"
+            "    for item in items:\n"
+            '        if item.name == "test_xfail":\n'
+            "            item.add_marker(pytest.mark.xfail(run=False))\n"
+        )
+        result = pytester_subprocess.runpytest("skipped.md")
+        result.assert_outcomes(passed=2, skipped=2, xfailed=1)
+        ran = sorted(p.name for p in pytester_subprocess.path.glob("*.ran"))
+        assert ran == ["run.ran", "unless.ran"]
+
+    def test_block(self, pytester_subprocess):
+        self.setup(pytester_subprocess, "block")
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=3, failed=2)
+        # One child session per pytestrun code block
+        assert self.sessions(pytester_subprocess) == 4
@@ -0,0 +1,176 @@
+"""
+Unit tests for the persistent bytecode cache.
+
+Tests cover:
+- Cache hits and misses on snippet changes
+- Collector integration
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ..cache import BYTECODE_DIR, BytecodeCache
+from ..config import Config
+from ..dialects import _make_test_function
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestBytecodeCache",
+    "TestBytecodeCacheCollectors",
+    "write_bytecode",
+)
+
+
+@pytest.fixture(autouse=True)
+def write_bytecode(monkeypatch):
+    """Write entries even if ``PYTHONDONTWRITEBYTECODE`` is set."""
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    monkeypatch.delenv("PYTHONDONTWRITEBYTECODE", raising=False)
+
+
+# ============================================================================
+# Test BytecodeCache
+# ============================================================================
+class TestBytecodeCache:
+    """Test cache hits and misses."""
+
+    def test_hit_after_set(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("x = 1", "doc.md", "exec")
+        assert cache.get("x = 1", "doc.md", "test_a") is None
+        cache.set("x = 1", "doc.md", "test_a", False, compiled)
+        cached = cache.get("x = 1", "doc.md", "test_a")
+        assert cached is not None
+        is_async, loaded = cached
+        assert is_async is False
+        assert loaded == compiled
+        assert loaded.co_filename == "doc.md"
+        # Nothing is left behind besides the entry
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_async_flag(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("pass", "doc.md", "exec")
+        cache.set("await f()", "doc.md", "test_a", True, compiled)
+        cached = cache.get("await f()", "doc.md", "test_a")
+        assert cached is not None
+        assert cached[0] is True
+
+    def test_miss_on_change(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("x = 1", "doc.md", "exec")
+        cache.set("x = 1", "doc.md", "test_a", False, compiled)
+        # Edited snippet, another snippet, another file
+        assert cache.get("x = 2", "doc.md", "test_a") is None
+        assert cache.get("x = 1", "doc.md", "test_b") is None
+        assert cache.get("x = 1", "other.md", "test_a") is None
+        # The entry of an edited snippet is replaced
+        cache.set("x = 2", "doc.md", "test_a", False, compiled)
+        assert cache.get("x = 1", "doc.md", "test_a") is None
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_miss_on_other_magic_number(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("x = 1", "doc.md", "exec")
+        cache.set("x = 1", "doc.md", "test_a", False, compiled)
+        with patch("pytest_codeblock.cache.MAGIC_NUMBER", b"\0\0\r\n"):
+            assert cache.get("x = 1", "doc.md", "test_a") is None
+
+    def test_miss_on_corrupt_entry(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("x = 1", "doc.md", "exec")
+        cache.set("x = 1", "doc.md", "test_a", False, compiled)
+        (entry,) = tmp_path.iterdir()
+        entry.write_bytes(entry.read_bytes()[:-4])
+        assert cache.get("x = 1", "doc.md", "test_a") is None
+
+    def test_dont_write_bytecode(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+        cache = BytecodeCache(tmp_path)
+        compiled = compile("x = 1", "doc.md", "exec")
+        cache.set("x = 1", "doc.md", "test_a", False, compiled)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_from_pytest_config(self, tmp_path):
+        pytest_config = MagicMock()
+        pytest_config.cache.mkdir.return_value = tmp_path
+        cache = BytecodeCache.from_pytest_config(pytest_config, Config())
+        assert cache is not None
+        assert cache.directory == tmp_path
+        pytest_config.cache.mkdir.assert_called_once_with(BYTECODE_DIR)
+        assert BytecodeCache.from_pytest_config(
+            pytest_config, Config(bytecode_cache=False)
+        ) is None
+
+    def test_test_function_skips_parsing(self, tmp_path):
+        cache = BytecodeCache(tmp_path)
+        code = "import asyncio\nawait asyncio.sleep(0)"
+        fpath = str(tmp_path / "doc.md")
+
+        def make_test_block():
+            return _make_test_function(
+                code,
+                sn_name="test_a",
+                fpath=fpath,
+                fixture_names=[],
+                is_pytestrun=False,
+                bytecode_cache=cache,
+            )
+
+        make_test_block()()
+        cached = cache.get(code, fpath, "test_a")
+        assert cached is not None
+        assert cached[0] is True
+        # Rerun (in a new session) loads the code object instead
+        with patch(
+            "pytest_codeblock.dialects.compile_snippet"
+        ) as mock_compile:
+            make_test_block()()
+        assert mock_compile.call_count == 0
+
+
+# ============================================================================
+# Test collectors with the bytecode cache
+# ============================================================================
+class TestBytecodeCacheCollectors:
+    """Test that reruns use the compiled snippets."""
+
+    def test_rerun(self, pytester_subprocess):
+        pytester_subprocess.makefile(".md", doc="""
+```python name=test_sync
+assert 1 + 1 == 2
+```
+
+```python name=test_async
+import asyncio
+await asyncio.sleep(0)
+```
+""")
+        pytester_subprocess.makefile(".rst", doc="""
+.. code-block:: python
+   :name: test_rst
+
+   assert True
+""")
+        args = ("-p", "no:django")
+        pytester_subprocess.runpytest(*args).assert_outcomes(passed=3)
+        entries = list(
+            (pytester_subprocess.path / ".pytest_cache" / "d" / BYTECODE_DIR)
+            .iterdir()
+        )
+        assert len(entries) == 3
+        pytester_subprocess.runpytest(*args).assert_outcomes(passed=3)
+
+        # Errors in cached snippets are still reported with their code
+        pytester_subprocess.makefile(".rst", doc="""
+.. code-block:: python
+   :name: test_rst
+
+   assert False, "edited"
+""")
+        result = pytester_subprocess.runpytest(*args)
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(["*codeblock `test_rst`*", "*edited*"])
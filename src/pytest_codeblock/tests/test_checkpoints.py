@@ -0,0 +1,223 @@
+"""
+Unit tests for running incremental steps on checkpoints.
+
+Tests cover:
+- Running every step once, in order, skipped or out of order
+- Errors of earlier steps
+- Work against running the cumulative code of every step
+- Collector integration
+"""
+import pytest
+
+from ..checkpoints import StepChain
+from ..collector import CodeSnippet, group_snippets
+from .helpers import FakeNode
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "Recorder",
+    "TestCheckpointCollectors",
+    "TestStepChain",
+)
+
+
+class Recorder:
+    """Executes steps, recording the names of those run."""
+
+    def __init__(self):
+        self.runs = []
+
+    def __call__(self, name, code, globals_):
+        self.runs.append(name)
+        exec(code, globals_)
+
+
+def make_chain(count):
+    chain = StepChain(FakeNode())
+    chain.add("test_step_0", "values = [0]")
+    for step in range(1, count):
+        chain.add(f"test_step_{step}", f"values.append({step})")
+    return chain
+
+
+# ============================================================================
+# Test StepChain
+# ============================================================================
+class TestStepChain:
+    """Test which steps run, and in which globals."""
+
+    def test_steps_run_once(self):
+        chain = make_chain(3)
+        execute = Recorder()
+        for index in range(3):
+            chain.run(index, {}, execute)
+        assert execute.runs == ["test_step_0", "test_step_1", "test_step_2"]
+        assert chain.namespace["values"] == [0, 1, 2]
+
+    def test_fixtures(self):
+        chain = StepChain(FakeNode())
+        chain.add("test_one", "total = value")
+        chain.add("test_two", "total += value")
+        chain.run(0, {"value": 1}, Recorder())
+        chain.run(1, {"value": 2}, Recorder())
+        assert chain.namespace is not None
+        assert chain.namespace["total"] == 3
+
+    def test_own_fixtures(self):
+        """Fixtures of an earlier step do not leak into later ones."""
+        chain = StepChain(FakeNode())
+        chain.add("test_one", "first = tmp")
+        chain.add("test_two", "assert 'tmp' not in globals()\nsecond = db")
+        chain.add("test_three", "assert 'db' not in globals()\nthird = tmp")
+        chain.run(0, {"tmp": "one"}, Recorder())
+        chain.run(1, {"db": "two"}, Recorder())
+        chain.run(2, {"tmp": "three"}, Recorder())
+        assert chain.namespace is not None
+        assert chain.namespace["first"] == "one"
+        assert chain.namespace["second"] == "two"
+        assert chain.namespace["third"] == "three"
+
+    def test_skipped_steps(self):
+        chain = make_chain(4)
+        execute = Recorder()
+        chain.run(2, {}, execute)
+        chain.run(3, {}, execute)
+        assert execute.runs == [
+            "test_step_0", "test_step_1", "test_step_2", "test_step_3"
+        ]
+
+    def test_out_of_order(self):
+        chain = make_chain(3)
+        execute = Recorder()
+        chain.run(2, {}, execute)
+        execute.runs.clear()
+        # Replayed from the start, leaving the checkpoint as it is
+        chain.run(1, {}, execute)
+        assert execute.runs == ["test_step_0", "test_step_1"]
+        assert chain.namespace["values"] == [0, 1, 2]
+
+    def test_error(self):
+        chain = make_chain(2)
+        chain.add("test_fail", "raise ValueError('boom')")
+        chain.add("test_after", "values.append(4)")
+        chain.run(0, {}, Recorder())
+        with pytest.raises(ValueError, match="boom"):
+            chain.run(2, {}, Recorder())
+        execute = Recorder()
+        with pytest.raises(ValueError, match="boom"):
+            chain.run(3, {}, execute)
+        assert execute.runs == []
+
+    def test_reset(self):
+        node = FakeNode()
+        chain = StepChain(node)
+        chain.add("test_fail", "raise ValueError('boom')")
+        with pytest.raises(ValueError):
+            chain.run(0, {}, Recorder())
+        assert len(node.finalizers) == 1
+        node.finalizers.pop()()
+        assert chain.namespace is None
+        assert chain.done == 0
+        assert chain.error is None
+
+    def test_linear_work(self):
+        """Every step runs once, instead of every step before it too."""
+        count = 60
+        steps = [
+            CodeSnippet(name=f"test_step_{step}", code="n += 1", line=step)
+            for step in range(count)
+        ]
+        steps[0] = CodeSnippet(name="test_step_0", code="n = 1", line=0)
+        steps[1:] = [
+            CodeSnippet(
+                name=sn.name, code=sn.code, line=sn.line, group="test_step_0"
+            )
+            for sn in steps[1:]
+        ]
+        grouped = group_snippets(steps)
+        assert {sn.group for sn in grouped} == {"test_step_0"}
+        cumulative = sum(sn.code.count("\n") + 1 for sn in grouped)
+
+        chain = StepChain(FakeNode())
+        previous = None
+        for sn in grouped:
+            own = sn.code if previous is None else sn.code[len(previous) + 1:]
+            previous = sn.code
+            assert sn.name is not None
+            chain.add(sn.name, own)
+        execute = Recorder()
+        for index in range(count):
+            chain.run(index, {}, execute)
+        assert len(execute.runs) == count
+        assert cumulative == count * (count + 1) // 2
+        assert chain.namespace is not None
+        assert chain.namespace["n"] == count
+
+
+# ============================================================================
+# Test collectors with checkpoints
+# ============================================================================
+class TestCheckpointCollectors:
+    """Test incremental steps collected with ``checkpoint_steps``."""
+
+    DOC = """
+```python name=test_setup
+import sys
+
+sys.codeblock_setups = getattr(sys, "codeblock_setups", 0) + 1
+items = ["setup"]
+```
+
+<!-- continue: test_setup -->
+<!-- pytestfixture: tmp_path -->
+```python name=test_append
+items.append("append")
+(tmp_path / "items.txt").write_text(",".join(items))
+```
+
+<!-- continue: test_setup -->
+```python name=test_async
+import asyncio
+
+await asyncio.sleep(0)
+assert items == ["setup", "append"]
+```
+
+<!-- continue: test_setup -->
+```python name=test_setups
+assert sys.codeblock_setups == {setups}
+```
+"""
+
+    def test_checkpoints(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\ncheckpoint_steps = true\n"
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(setups=1))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=4)
+
+    def test_without_checkpoints(self, pytester_subprocess):
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(setups=4))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=4)
+
+    def test_deselected_steps(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\ncheckpoint_steps = true\n"
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(setups=1))
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "-k", "test_setups"
+        )
+        result.assert_outcomes(passed=1, deselected=3)
+
+    def test_failing_step(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\ncheckpoint_steps = true\n"
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(setups=2))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=3, failed=1)
@@ -0,0 +1,176 @@
+"""
+Unit tests for documentation dialects.
+
+Tests cover:
+- Looking dialects up by name and by file
+- A custom dialect built on the Markdown one
+- Registering a dialect through an entry point
+"""
+from pathlib import Path
+
+import pytest
+
+from ..config import Config
+from ..dialects import Dialect, find_dialect, get_dialect, get_dialects
+from ..md import MarkdownDialect
+from ..rst import RSTDialect
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "QuartoDialect",
+    "TestCustomDialect",
+    "TestDialectEntryPoint",
+    "TestDialectRegistry",
+)
+
+
+class QuartoDialect(MarkdownDialect):
+    """Quarto documents: Markdown with ```{python} fences."""
+
+    name = "quarto"
+    default_extensions = (".qmd",)
+    default_languages = ("{python}",)
+
+    def extensions(self, config: Config) -> tuple[str, ...]:
+        return self.default_extensions
+
+    def languages(self, config: Config) -> tuple[str, ...]:
+        return self.default_languages
+
+
+# ============================================================================
+# Test get_dialects(), get_dialect() and find_dialect()
+# ============================================================================
+class TestDialectRegistry:
+    """Test looking dialects up."""
+
+    def test_built_in_dialects(self):
+        names = [dialect.name for dialect in get_dialects()]
+        assert names[-2:] == ["markdown", "rst"]
+        assert isinstance(get_dialect("markdown"), MarkdownDialect)
+        assert isinstance(get_dialect("rst"), RSTDialect)
+
+    def test_unknown_dialect(self):
+        with pytest.raises(LookupError):
+            get_dialect("asciidoc")
+
+    def test_find_dialect(self):
+        config = Config(md_user_extensions=(".mdx",))
+        for path, name in (
+            ("docs/README.MD", "markdown"),
+            ("docs/page.mdx", "markdown"),
+            (Path("docs/index.rst"), "rst"),
+        ):
+            dialect = find_dialect(path, config)
+            assert dialect is not None
+            assert dialect.name == name
+        assert find_dialect("docs/page.mdx", Config()) is None
+        assert find_dialect("example.py", config) is None
+
+    def test_base_dialect(self, tmp_path):
+        # Dialects provide a scanner
+        with pytest.raises(TypeError, match="abstract"):
+            Dialect()  # type: ignore[abstract]
+
+        class MinimalDialect(Dialect):
+            def scanner(self, path, config, name_filter=None):
+                return MarkdownDialect().scanner(path, config, name_filter)
+
+        dialect = MinimalDialect()
+        assert not dialect.matches(tmp_path / "doc.md", Config())
+        assert dialect.has_codeblocks(tmp_path / "doc.md", Config())
+        assert dialect.dependencies(tmp_path / "doc.md", None) == []
+
+
+# ============================================================================
+# Test a dialect derived from MarkdownDialect
+# ============================================================================
+class TestCustomDialect:
+    """Test a Quarto-like dialect."""
+
+    TEXT = """
+```{python}
+#| echo: false
+x = 1
+```
+
+<!-- pytestmark: slow -->
+```{python} name=test_quarto
+assert x == 1
+```
+
+```python name=test_plain_fence
+assert False
+```
+"""
+
+    def test_parse_file(self, tmp_path):
+        path = tmp_path / "report.qmd"
+        path.write_text(self.TEXT)
+        dialect = QuartoDialect()
+        assert dialect.matches(path, Config())
+        assert not MarkdownDialect().matches(path, Config())
+        assert dialect.has_codeblocks(path, Config())
+
+        tests, dependencies = dialect.parse_file(path, Config())
+        assert [(sn.name, sn.line) for sn in tests] == [("test_quarto", 9)]
+        assert "slow" in tests[0].marks
+        assert dependencies == []
+
+        tests, _ = dialect.parse_file(
+            path, Config(test_nameless_codeblocks=True)
+        )
+        assert [sn.name for sn in tests] == ["test_report_1", "test_quarto"]
+
+
+# ============================================================================
+# Test registering a dialect through an entry point
+# ============================================================================
+class TestDialectEntryPoint:
+    """Test that dialects of installed packages are collected."""
+
+    def test_entry_point(self, pytester_subprocess):
+        # A fake installed distribution, importable from the test directory
+        pytester_subprocess.makepyfile(quarto_dialect="""
+from pytest_codeblock.md import MarkdownDialect
+
+
+class QuartoDialect(MarkdownDialect):
+    name = "quarto"
+    default_extensions = (".qmd",)
+
+    def extensions(self, config):
+        return self.default_extensions
+
+    def languages(self, config):
+        return ("{python}",)
+""")
+        dist_info = pytester_subprocess.mkdir("quarto_dialect-0.1.dist-info")
+        (dist_info / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: quarto-dialect\nVersion: 0.1\n"
+        )
+        (dist_info / "entry_points.txt").write_text(
+            "[pytest_codeblock.dialects]\n"
+            "quarto = quarto_dialect:QuartoDialect\n"
+        )
+        pytester_subprocess.makefile(".qmd", report="""
+```{python} name=test_quarto
+assert 1 + 1 == 2
+```
+""")
+        pytester_subprocess.makefile(".md", readme="""
+```python name=test_markdown
+assert True
+```
+""")
+
+        result = pytester_subprocess.runpytest(
+            "-v", "-p", "no:django", "-p", "no:cacheprovider"
+        )
+        result.assert_outcomes(passed=2)
+        result.stdout.fnmatch_lines([
+            "*readme.md::test_markdown PASSED*",
+            "*report.qmd::test_quarto PASSED*",
+        ])
@@ -0,0 +1,373 @@
+"""
+Unit tests for the event loops async code blocks run on.
+
+Tests cover:
+- Block, file and session loop scopes
+- uvloop
+- Loops of pytest-asyncio and anyio
+- Timeouts of async code blocks on asyncio and other loops
+"""
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..config import Config
+from ..loops import (
+    Runner,
+    await_within,
+    new_runner,
+    run_coroutine,
+    runner_key,
+    runs_on_plugin_loop,
+)
+from .helpers import FakeNode
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestAsyncTestPlugins",
+    "TestAwaitWithin",
+    "TestEventLoopCollectors",
+    "TestNewRunner",
+    "TestRunCoroutine",
+)
+
+
+async def running_loop():
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop()
+
+
+# ============================================================================
+# Test run_coroutine()
+# ============================================================================
+class TestRunCoroutine:
+    """Test running coroutines on loops of each scope."""
+
+    def test_block_scope(self):
+        node = FakeNode()
+        config = Config()
+        loop = run_coroutine(running_loop(), node, config)
+        assert loop.is_closed()
+        assert run_coroutine(running_loop(), node, config) is not loop
+        assert node.finalizers == []
+
+    def test_file_scope(self):
+        session = FakeNode()
+        node = FakeNode(session)
+        config = Config(async_loop_scope="file")
+        loop = run_coroutine(running_loop(), node, config)
+        assert not loop.is_closed()
+        assert run_coroutine(running_loop(), node, config) is loop
+        # Another document gets a loop of its own
+        other = run_coroutine(running_loop(), FakeNode(session), config)
+        assert other is not loop
+        assert session.finalizers == []
+
+        node.teardown()
+        assert loop.is_closed()
+        assert runner_key not in node.stash
+        assert run_coroutine(running_loop(), node, config) is not loop
+        node.teardown()
+
+    def test_session_scope(self):
+        session = FakeNode()
+        config = Config(async_loop_scope="session")
+        loop = run_coroutine(running_loop(), FakeNode(session), config)
+        assert run_coroutine(running_loop(), FakeNode(session), config) is loop
+        session.teardown()
+        assert loop.is_closed()
+
+    def test_pending_tasks_survive_between_blocks(self):
+        node = FakeNode()
+        config = Config(async_loop_scope="file")
+        state = {}
+
+        async def start():
+            state["task"] = asyncio.ensure_future(asyncio.sleep(0, "done"))
+
+        async def finish():
+            return await state["task"]
+
+        run_coroutine(start(), node, config)
+        assert run_coroutine(finish(), node, config) == "done"
+        node.teardown()
+
+    def test_error_keeps_loop(self):
+        node = FakeNode()
+        config = Config(async_loop_scope="file")
+
+        async def fail():
+            raise ValueError("boom")
+
+        loop = run_coroutine(running_loop(), node, config)
+        with pytest.raises(ValueError):
+            run_coroutine(fail(), node, config)
+        assert run_coroutine(running_loop(), node, config) is loop
+        node.teardown()
+
+
+# ============================================================================
+# Test new_runner()
+# ============================================================================
+class TestNewRunner:
+    """Test the loops runners are created with."""
+
+    def test_runner(self):
+        with new_runner(Config()) as runner:
+            assert isinstance(runner, Runner)
+            loop = runner.run(running_loop())
+            assert isinstance(loop, asyncio.AbstractEventLoop)
+
+    def test_uvloop_not_installed(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        with new_runner(Config(uvloop=True)) as runner:
+            assert runner.run(running_loop()) is not None
+
+    def test_uvloop(self):
+        uvloop = pytest.importorskip("uvloop")
+        with new_runner(Config(uvloop=True)) as runner:
+            assert isinstance(runner.run(running_loop()), uvloop.Loop)
+
+
+# ============================================================================
+# Test await_within()
+# ============================================================================
+class TestAwaitWithin:
+    """Test timeouts of coroutines, on asyncio loops and others."""
+
+    async def value(self):
+        return 42
+
+    def test_no_timeout(self):
+        assert asyncio.run(await_within(self.value(), None)) == 42
+
+    def test_timeout(self):
+        assert asyncio.run(await_within(self.value(), 5)) == 42
+        with pytest.raises(TimeoutError):
+            asyncio.run(await_within(asyncio.sleep(5), 0.01))
+
+    def test_no_timeout_off_asyncio(self):
+        """Without a timeout, no asyncio loop is needed."""
+        coro = await_within(self.value(), None)
+        with pytest.raises(StopIteration) as info:
+            coro.send(None)
+        assert info.value.value == 42
+
+    def test_timeout_on_trio(self):
+        anyio = pytest.importorskip("anyio")
+        trio = pytest.importorskip("trio")
+
+        async def main():
+            with pytest.raises(TimeoutError):
+                await await_within(trio.sleep(5), 0.01)
+            return await await_within(self.value(), 5)
+
+        assert anyio.run(main, backend="trio") == 42
+
+
+# ============================================================================
+# Test collectors with each loop scope
+# ============================================================================
+class TestEventLoopCollectors:
+    """Test which code blocks share a loop."""
+
+    DOC = """
+```python name=test_first
+import asyncio
+import sys
+
+loop = asyncio.get_running_loop()
+sys.codeblock_loops = getattr(sys, "codeblock_loops", set()) | {{loop}}
+await asyncio.sleep(0)
+```
+
+```python name=test_second
+import asyncio
+import sys
+
+assert ({scope!r} == "block") != (
+    asyncio.get_running_loop() in sys.codeblock_loops
+)
+sys.codeblock_loops.add(asyncio.get_running_loop())
+await asyncio.sleep(0)
+```
+"""
+
+    @pytest.mark.parametrize(
+        "scope,loops", [("block", 4), ("file", 2), ("session", 1)]
+    )
+    def test_scope(self, pytester_subprocess, scope, loops):
+        pytester_subprocess.makepyprojecttoml(
+            f'[tool.pytest-codeblock]\nasync_loop_scope = "{scope}"\n'
+        )
+        pytester_subprocess.makefile(".md", one=self.DOC.format(scope=scope))
+        pytester_subprocess.makefile(".md", two=self.DOC.format(scope=scope))
+        pytester_subprocess.makeconftest(f"""
+import sys
+
+
+def pytest_sessionfinish(session):
+    assert len(sys.codeblock_loops) == {loops}
+    assert all(loop.is_closed() for loop in sys.codeblock_loops)
+""")
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=4)
+        assert result.ret == 0
+
+
+# ============================================================================
+# Test running async code blocks with pytest-asyncio and anyio
+# ============================================================================
+class TestAsyncTestPlugins:
+    """Test that async test plugins run async code blocks on their loop."""
+
+    DOC = """
+<!-- pytestmark: {mark} -->
+<!-- pytestfixture: fixture_loop -->
+```python name=test_plugin_loop
+import asyncio
+
+await asyncio.sleep(0)
+assert asyncio.get_running_loop() is fixture_loop
+```
+
+```python name=test_sync_block
+import asyncio
+
+async def main():
+    return 42
+
+assert asyncio.run(main()) == 42
+```
+
+```python name=test_own_loop
+import asyncio
+
+await asyncio.sleep(0)
+```
+"""
+
+    def _pytest_config(self, plugins, ini=None):
+        pytest_config = MagicMock()
+        has_plugin = pytest_config.pluginmanager.has_plugin
+        has_plugin.side_effect = plugins.__contains__
+        pytest_config.getoption.return_value = None
+        pytest_config.getini.side_effect = (ini or {}).get
+        return pytest_config
+
+    def test_runs_on_plugin_loop(self):
+        pytest_config = self._pytest_config({"asyncio"})
+        assert runs_on_plugin_loop(pytest_config, ("codeblock", "asyncio"))
+        assert not runs_on_plugin_loop(pytest_config, ("codeblock", "anyio"))
+        assert not runs_on_plugin_loop(pytest_config, ("codeblock",))
+
+        pytest_config = self._pytest_config(
+            {"anyio"}, {"anyio_mode": "auto"}
+        )
+        assert runs_on_plugin_loop(pytest_config, ("codeblock",))
+        assert not runs_on_plugin_loop(
+            self._pytest_config(set(), {"anyio_mode": "auto"}), ("anyio",)
+        )
+
+    def test_pytest_asyncio(self, pytester_subprocess):
+        pytest.importorskip("pytest_asyncio")
+        pytester_subprocess.makeconftest("""
+import asyncio
+
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def fixture_loop():
+    return asyncio.get_running_loop()
+""")
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(mark="asyncio"))
+        result = pytester_subprocess.runpytest(
+            "-v", "-p", "no:django", "-p", "no:anyio", "-W", "error"
+        )
+        result.assert_outcomes(passed=3)
+
+        # In auto mode, no mark is needed
+        pytester_subprocess.makefile(
+            ".md", doc=self.DOC.format(mark="codeblock")
+        )
+        result = pytester_subprocess.runpytest(
+            "-v", "-p", "no:django", "-p", "no:anyio",
+            "-o", "asyncio_mode=auto",
+        )
+        result.assert_outcomes(passed=3)
+
+    def test_anyio(self, pytester_subprocess):
+        pytest.importorskip("anyio")
+        pytester_subprocess.makeconftest("""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def fixture_loop():
+    return asyncio.get_running_loop()
+""")
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(mark="anyio"))
+        result = pytester_subprocess.runpytest(
+            "-v", "-p", "no:django", "-p", "no:asyncio"
+        )
+        result.assert_outcomes(passed=3)
+
+    def test_anyio_trio(self, pytester_subprocess):
+        pytest.importorskip("anyio")
+        pytest.importorskip("trio")
+        pytester_subprocess.makeconftest("""
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "trio"
+""")
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\n"
+            "timeout = 30\n"
+        )
+        pytester_subprocess.makefile(".md", doc="""
+<!-- pytestmark: anyio -->
+```python name=test_trio
+import trio
+
+await trio.sleep(0)
+```
+""")
+        result = pytester_subprocess.runpytest(
+            "-v", "-p", "no:django", "-p", "no:asyncio"
+        )
+        result.assert_outcomes(passed=1)
+
+    def test_timeout(self, pytester_subprocess):
+        """Code blocks timing out on the plugin loop raise TimeoutError."""
+        pytest.importorskip("pytest_asyncio")
+        pytester_subprocess.makefile(".md", doc="""
+<!-- pytestmark: asyncio -->
+<!-- pytestmark: timeout(0.1) -->
+```python name=test_sleep
+import asyncio
+
+await asyncio.sleep(5)
+```
+""")
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "-p", "no:anyio", "-p", "no:timeout"
+        )
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(
+            ["*TimeoutError: Code block `test_sleep` timed out after 0.1*"]
+        )
@@ -0,0 +1,150 @@
+"""
+Unit tests for running code blocks in forked children.
+
+Tests cover:
+- Outcomes sent back by the child
+- Isolation of the parent process
+- The ``forked`` mark and setting
+"""
+import os
+import signal
+import sys
+import threading
+
+import pytest
+
+from ..forked import can_fork, run_forked
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestForkedCollectors",
+    "TestRunForked",
+)
+
+pytestmark = pytest.mark.skipif(not can_fork(), reason="os.fork() required")
+
+
+# ============================================================================
+# Test run_forked()
+# ============================================================================
+class TestRunForked:
+    """Test running functions in forked children."""
+
+    def test_success(self):
+        run_forked(lambda: None)
+
+    def test_isolation(self, monkeypatch):
+        def leak():
+            sys.modules["codeblock_leak"] = sys
+            os.environ["CODEBLOCK_LEAK"] = "1"
+
+        monkeypatch.delenv("CODEBLOCK_LEAK", raising=False)
+        run_forked(leak)
+        assert "codeblock_leak" not in sys.modules
+        assert "CODEBLOCK_LEAK" not in os.environ
+
+    def test_error(self):
+        def fail():
+            raise ValueError("Error in codeblock `test_x`")
+
+        with pytest.raises(Exception, match="Error in codeblock `test_x`"):
+            run_forked(fail)
+
+    def test_base_exception(self):
+        with pytest.raises(Exception, match="SystemExit: 4"):
+            run_forked(lambda: sys.exit(4))
+
+    @pytest.mark.parametrize(
+        "outcome,exception",
+        [
+            (pytest.skip, pytest.skip.Exception),
+            (pytest.xfail, pytest.xfail.Exception),
+            (pytest.fail, pytest.fail.Exception),
+        ],
+    )
+    def test_outcomes(self, outcome, exception):
+        with pytest.raises(exception, match="in the child"):
+            run_forked(lambda: outcome("in the child"))
+
+    def test_exit_code(self):
+        with pytest.raises(Exception, match="exited with code 3"):
+            run_forked(lambda: os._exit(3))
+
+    def test_signal(self):
+        with pytest.raises(Exception, match="killed by signal"):
+            run_forked(lambda: os.kill(os.getpid(), signal.SIGKILL))
+
+    def test_other_threads(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            with pytest.warns(RuntimeWarning, match="other threads run"):
+                run_forked(lambda: None)
+        finally:
+            stop.set()
+            thread.join()
+
+
+# ============================================================================
+# Test collectors with forked code blocks
+# ============================================================================
+class TestForkedCollectors:
+    """Test which code blocks run in forked children."""
+
+    DOC = """
+<!-- pytestmark: {mark} -->
+<!-- pytestfixture: tmp_path -->
+```python name=test_leak
+import sys
+
+sys.codeblock_leak = True
+(tmp_path / "out.txt").write_text("written")
+```
+
+```python name=test_no_leak
+import sys
+
+assert not hasattr(sys, "codeblock_leak")
+```
+
+<!-- pytestmark: {mark} -->
+```python name=test_async
+import asyncio
+
+await asyncio.sleep(0)
+```
+
+<!-- pytestmark: {mark} -->
+```python name=test_skip
+import pytest
+
+pytest.skip("skipped in the child")
+```
+"""
+
+    def test_mark(self, pytester_subprocess):
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(mark="forked"))
+        result = pytester_subprocess.runpytest("-rs", "-p", "no:django")
+        result.assert_outcomes(passed=3, skipped=1)
+        result.stdout.fnmatch_lines(["*skipped in the child*"])
+
+    def test_without_mark(self, pytester_subprocess):
+        pytester_subprocess.makefile(
+            ".md", doc=self.DOC.format(mark="codeblock")
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=2, failed=1, skipped=1)
+        result.stdout.fnmatch_lines(["FAILED doc.md::test_no_leak*"])
+
+    def test_setting(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\nforked = true\n"
+        )
+        pytester_subprocess.makefile(
+            ".md", doc=self.DOC.format(mark="codeblock")
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=3, skipped=1)
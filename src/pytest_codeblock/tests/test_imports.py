@@ -0,0 +1,162 @@
+"""
+Unit tests for preloading modules and timing the imports of code blocks.
+
+Tests cover:
+- Timing outermost imports with a meta path finder
+- The slowest codeblock imports report
+- The ``preload_modules`` setting
+"""
+import sys
+
+import pytest
+
+from ..imports import ImportTimer
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestImportReport",
+    "TestImportTimer",
+    "timer",
+)
+
+
+@pytest.fixture
+def timer(tmp_path, monkeypatch):
+    """Import timer installed on ``sys.meta_path``, with modules to time."""
+    package = tmp_path / "slowpkg"
+    package.mkdir()
+    package.joinpath("__init__.py").write_text(
+        "import time\ntime.sleep(0.02)\nfrom . import sub\n"
+    )
+    package.joinpath("sub.py").write_text("import time\ntime.sleep(0.02)\n")
+    tmp_path.joinpath("fastmod.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("slowpkg", "slowpkg.sub", "fastmod"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    timer = ImportTimer()
+    sys.meta_path.insert(0, timer)
+    yield timer
+    sys.meta_path.remove(timer)
+
+
+# ============================================================================
+# Test ImportTimer
+# ============================================================================
+class TestImportTimer:
+    """Test which imports are timed."""
+
+    def test_outermost_imports(self, timer):
+        with timer.measure("doc.md::test_a"):
+            import fastmod
+            import slowpkg
+        assert set(timer.durations) == {"slowpkg", "fastmod"}
+        seconds, owner = timer.durations["slowpkg"]
+        # Includes the time of the submodule it imports
+        assert seconds >= 0.04
+        assert owner == "doc.md::test_a"
+        assert fastmod.VALUE == 1
+        assert "slowpkg.sub" in sys.modules
+        assert [name for name, _, _ in timer.slowest(1)] == ["slowpkg"]
+
+        # The wrapping loader is not left on the modules
+        assert type(slowpkg.__loader__).__name__ == "SourceFileLoader"
+        assert slowpkg.__spec__.loader is slowpkg.__loader__
+
+    def test_imports_outside_code_blocks(self, timer):
+        import fastmod  # noqa: F401
+
+        assert timer.durations == {}
+
+    def test_imported_modules(self, timer):
+        import fastmod  # noqa: F401
+
+        with timer.measure("doc.md::test_a"):
+            import fastmod  # noqa: F401, F811
+        assert timer.durations == {}
+
+    def test_plugin_imports(self, timer):
+        """Imports made by the plugin itself are not recorded."""
+        with timer.measure("doc.md::test_a"):
+            # As if imported by a module of the plugin
+            exec("import fastmod", {"__name__": "pytest_codeblock.profiles"})
+        assert "fastmod" in sys.modules
+        assert timer.durations == {}
+
+    def test_quick_imports(self, timer):
+        """Imports too quick to matter are not reported."""
+        with timer.measure("doc.md::test_a"):
+            import fastmod  # noqa: F401
+            import slowpkg  # noqa: F401
+        assert "fastmod" in timer.durations
+        assert [name for name, _, _ in timer.slowest(10)] == ["slowpkg"]
+
+    def test_failing_import(self, timer, tmp_path):
+        tmp_path.joinpath("broken.py").write_text("raise ValueError('x')\n")
+        with timer.measure("doc.md::test_a"), pytest.raises(ValueError):
+            import broken  # noqa: F401
+        assert "broken" in timer.durations
+        assert timer._depth == 0
+
+
+# ============================================================================
+# Test the report and preload_modules
+# ============================================================================
+class TestImportReport:
+    """Test the report of the slowest codeblock imports."""
+
+    DOC = """
+```python name=test_imports
+import slowmod
+import preloaded
+```
+"""
+
+    def _setup(self, pytester_subprocess, preload):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\n"
+            f"preload_modules = {preload!r}\n".replace("'", '"')
+        )
+        pytester_subprocess.makepyfile(
+            slowmod="import time\ntime.sleep(0.2)\n",
+            preloaded="import time\ntime.sleep(0.02)\n",
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+
+    def test_report(self, pytester_subprocess):
+        self._setup(pytester_subprocess, ["preloaded"])
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "--codeblock-import-report=10"
+        )
+        result.assert_outcomes(passed=1)
+        result.stdout.fnmatch_lines(
+            [
+                "*= slowest codeblock imports =*",
+                "*s slowmod    doc.md::test_imports",
+                "*s preloaded  preload_modules",
+            ]
+        )
+
+    def test_report_disabled(self, pytester_subprocess):
+        """The report is off by default."""
+        self._setup(pytester_subprocess, ["preloaded"])
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1)
+        result.stdout.no_fnmatch_line("*slowest codeblock imports*")
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "--codeblock-import-report=0"
+        )
+        result.assert_outcomes(passed=1)
+        result.stdout.no_fnmatch_line("*slowest codeblock imports*")
+
+    def test_preload_failure(self, pytester_subprocess):
+        self._setup(pytester_subprocess, ["missing_module", "preloaded"])
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "--codeblock-import-report=10"
+        )
+        result.assert_outcomes(passed=1, warnings=1)
+        result.stdout.fnmatch_lines(
+            ["*could not preload 'missing_module'*", "*s preloaded *"]
+        )
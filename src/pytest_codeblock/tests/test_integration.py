@@ -5,8 +5,11 @@ This module exists to ensure 100% coverage when running with pytest-cov,
 by explicitly importing all functions and classes at test time rather than
 relying on plugin auto-loading (which happens before coverage starts).
 """
-from dataclasses import fields
-from unittest.mock import MagicMock
+import asyncio
+import io
+from dataclasses import FrozenInstanceError, fields, replace
+from typing import Any, cast
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -16,6 +19,9 @@ from .. import (
 from ..collector import (
     CodeSnippet,
     group_snippets,
+    intern_names,
+    is_test_name,
+    is_test_name_or_nameless,
 )
 from ..constants import (
     CODEBLOCK_MARK,
@@ -23,19 +29,27 @@ from ..constants import (
     TEST_PREFIX,
 )
 from ..helpers import (
+    compile_snippet,
     contains_top_level_await,
+    dedent_block,
     wrap_async_code,
 )
 from ..md import (
     MarkdownFile,
+    iter_markdown,
     parse_markdown,
+    reparse_markdown,
 )
 from ..rst import (
     RSTFile,
+    _block_code,
     get_literalinclude_content,
+    iter_rst,
     parse_rst,
+    reparse_rst,
     resolve_literalinclude_path,
 )
+from ..streaming import iter_text_chunks
 
 
 # ============================================================================
@@ -69,8 +83,8 @@ class TestCodeSnippet:
         assert sn.code == "x = 1"
         assert sn.line == 10
         assert sn.name is None
-        assert sn.marks == []
-        assert sn.fixtures == []
+        assert sn.marks == ()
+        assert sn.fixtures == ()
 
     def test_code_snippet_with_all_fields(self):
         """Test CodeSnippet with all fields."""
@@ -78,8 +92,8 @@ class TestCodeSnippet:
             code="y = 2",
             line=20,
             name="test_example",
-            marks=["codeblock", "django_db"],
-            fixtures=["tmp_path", "capsys"],
+            marks=("codeblock", "django_db"),
+            fixtures=("tmp_path", "capsys"),
         )
         assert sn.name == "test_example"
         assert "codeblock" in sn.marks
@@ -94,6 +108,35 @@ class TestCodeSnippet:
         assert "marks" in field_names
         assert "fixtures" in field_names
 
+    def test_code_snippet_is_immutable(self):
+        """Snippets are frozen and carry no per-instance dict."""
+        sn = CodeSnippet(code="x = 1", line=1)
+        with pytest.raises(FrozenInstanceError):
+            cast(Any, sn).name = "test_renamed"
+        assert not hasattr(sn, "__dict__")
+        assert replace(sn, name="test_renamed").name == "test_renamed"
+
+    def test_marks_and_fixtures_are_interned(self):
+        """Equal marks and fixtures are shared between snippets."""
+        names = ["codeblock", "tmp_path"]
+        # Equal tuples, but distinct objects
+        sn1 = CodeSnippet(
+            code="a = 1",
+            line=1,
+            marks=tuple(names[:1]),
+            fixtures=tuple(names[1:]),
+        )
+        sn2 = CodeSnippet(
+            code="b = 2",
+            line=5,
+            marks=tuple(names[:1]),
+            fixtures=tuple(names[1:]),
+        )
+        assert sn1.marks == ("codeblock",)
+        assert sn1.marks is sn2.marks
+        assert sn1.fixtures is sn2.fixtures
+        assert intern_names(["codeblock"]) is sn1.marks
+
 
 # ============================================================================
 # Test collector.py - group_snippets function
@@ -110,8 +153,8 @@ class TestGroupSnippets:
 
     def test_group_snippets_merge_same_name(self):
         """Test merging snippets with same name."""
-        sn1 = CodeSnippet(name="test_foo", code="a=1", line=1, marks=["m1"])
-        sn2 = CodeSnippet(name="test_foo", code="b=2", line=5, marks=["m2"])
+        sn1 = CodeSnippet(name="test_foo", code="a=1", line=1, marks=("m1",))
+        sn2 = CodeSnippet(name="test_foo", code="b=2", line=5, marks=("m2",))
         result = group_snippets([sn1, sn2])
         assert len(result) == 1
         assert "a=1" in result[0].code
@@ -148,10 +191,10 @@ class TestGroupSnippets:
     def test_group_snippets_fixtures_merge(self):
         """Test fixtures are accumulated when merging."""
         sn1 = CodeSnippet(
-            name="test_f", code="x=1", line=1, fixtures=["tmp_path"]
+            name="test_f", code="x=1", line=1, fixtures=("tmp_path",)
         )
         sn2 = CodeSnippet(
-            name="test_f", code="y=2", line=5, fixtures=["capsys"]
+            name="test_f", code="y=2", line=5, fixtures=("capsys",)
         )
 
         combined = group_snippets([sn1, sn2])
@@ -168,6 +211,7 @@ class TestGroupSnippets:
 # ============================================================================
 # Test helpers.py - contains_top_level_await
 # ============================================================================
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 class TestContainsTopLevelAwait:
     """Test contains_top_level_await function."""
 
@@ -193,10 +237,17 @@ class TestContainsTopLevelAwait:
         """Test invalid syntax returns False (covers except SyntaxError)."""
         assert contains_top_level_await("def broken(:") is False
 
+    def test_deprecated(self):
+        with pytest.warns(DeprecationWarning, match="compile_snippet"):
+            contains_top_level_await("x = 1")
+        with pytest.warns(DeprecationWarning, match="compile_snippet"):
+            wrap_async_code("x = 1")
+
 
 # ============================================================================
 # Test helpers.py - wrap_async_code
 # ============================================================================
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 class TestWrapAsyncCode:
     """Test wrap_async_code function."""
 
@@ -222,6 +273,56 @@ class TestWrapAsyncCode:
         compile(wrapped, "<test>", "exec")
 
 
+# ============================================================================
+# Test helpers.py - compile_snippet
+# ============================================================================
+class TestCompileSnippet:
+    """Test compile_snippet function."""
+
+    def test_sync_code(self):
+        is_async, compiled = compile_snippet("import asyncio\nx = 1", "<t>")
+        assert is_async is False
+        namespace: dict[str, Any] = {}
+        exec(compiled, namespace)
+        assert namespace["x"] == 1
+
+    def test_top_level_await(self):
+        code = "x = await asyncio.sleep(0, result=42)"
+        is_async, compiled = compile_snippet(code, "<t>")
+        assert is_async is True
+        namespace = {"asyncio": asyncio}
+        asyncio.run(eval(compiled, namespace))
+        # Names are assigned at module level, as in sync code
+        assert namespace["x"] == 42
+
+    def test_top_level_async_for_and_with(self):
+        for code in (
+            "async for i in gen(): pass",
+            "async with lock: pass",
+        ):
+            assert compile_snippet(code, "<t>")[0] is True
+
+    def test_async_def_only(self):
+        """Defining a coroutine function does not make the code async."""
+        code = "async def main():\n    await asyncio.sleep(0)\n"
+        assert compile_snippet(code, "<t>")[0] is False
+
+    def test_keywords_in_strings(self):
+        is_async, _ = compile_snippet("print('await something')", "<t>")
+        assert is_async is False
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_no_parse_without_keywords(self):
+        with patch("ast.parse") as mock_parse:
+            assert compile_snippet("x = 1", "<t>")[0] is False
+            assert contains_top_level_await("import asyncio") is False
+        assert mock_parse.call_count == 0
+
+    def test_syntax_error(self):
+        with pytest.raises(SyntaxError):
+            compile_snippet("await def", "<t>")
+
+
 # ============================================================================
 # Test __init__.py - pytest_collect_file hook
 # ============================================================================
@@ -231,7 +332,7 @@ class TestPytestCollectFile:
     def test_collect_markdown_file(self, tmp_path):
         """Test .md file returns MarkdownFile."""
         md_file = tmp_path / "test.md"
-        md_file.write_text("# Test")
+        md_file.write_text("# Test\n\n```python\nx = 1\n```\n")
 
         parent = MagicMock()
         parent.path = tmp_path
@@ -245,7 +346,7 @@ class TestPytestCollectFile:
     def test_collect_markdown_extension(self, tmp_path):
         """Test .markdown extension."""
         md_file = tmp_path / "test.markdown"
-        md_file.write_text("# Test")
+        md_file.write_text("# Test\n\n```python\nx = 1\n```\n")
 
         parent = MagicMock()
         parent.path = tmp_path
@@ -258,7 +359,9 @@ class TestPytestCollectFile:
     def test_collect_rst_file(self, tmp_path):
         """Test .rst file returns RSTFile."""
         rst_file = tmp_path / "test.rst"
-        rst_file.write_text("Test\n====")
+        rst_file.write_text(
+            "Test\n====\n\n.. code-block:: python\n\n   x = 1\n"
+        )
 
         parent = MagicMock()
         parent.path = tmp_path
@@ -281,7 +384,7 @@ class TestPytestCollectFile:
     def test_collect_uppercase_extension(self, tmp_path):
         """Test case-insensitive extension matching."""
         md_file = tmp_path / "test.MD"
-        md_file.write_text("# Test")
+        md_file.write_text("# Test\n\n```python\nx = 1\n```\n")
 
         parent = MagicMock()
         parent.path = tmp_path
@@ -291,6 +394,30 @@ class TestPytestCollectFile:
         result = pytest_collect_file(parent, md_file)
         assert isinstance(result, MarkdownFile)
 
+    def test_collect_prose_only_markdown_returns_none(self, tmp_path):
+        """Test .md file without Python code blocks is skipped."""
+        md_file = tmp_path / "test.md"
+        md_file.write_text("# Test\n\n```sh\nls\n```\n")
+
+        parent = MagicMock()
+        assert pytest_collect_file(parent, md_file) is None
+
+    def test_collect_prose_only_rst_returns_none(self, tmp_path):
+        """Test .rst file without Python code blocks is skipped."""
+        rst_file = tmp_path / "test.rst"
+        rst_file.write_text("Test\n====\n\n.. code-block:: sh\n\n   ls\n")
+
+        parent = MagicMock()
+        assert pytest_collect_file(parent, rst_file) is None
+
+    def test_collect_empty_file_returns_none(self, tmp_path):
+        """Test empty documents are skipped."""
+        md_file = tmp_path / "test.md"
+        md_file.write_text("")
+
+        parent = MagicMock()
+        assert pytest_collect_file(parent, md_file) is None
+
 
 # ============================================================================
 # Test md.py - parse_markdown function
@@ -541,6 +668,118 @@ y
         # The short line 'y' should still be captured
         assert "y" in snippets[0].code or "x = 1" in snippets[0].code
 
+    # ------------------------------------------------------------------------
+
+    def test_parse_line_numbers(self):
+        """Test that each snippet reports the line of its first code line."""
+        text = (
+            "# Title\n"
+            "\n"
+            "```python name=test_first\n"
+            "a = 1\n"
+            "```\n"
+            "\n"
+            "<!-- pytestmark: slow -->\n"
+            "```python name=test_second\n"
+            "b = 2\n"
+            "```\n"
+        )
+        snippets = parse_markdown(text)
+        assert [sn.line for sn in snippets] == [4, 9]
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_markers_in_the_middle_of_a_line_ignored(self):
+        """Test that comment and fence markers only count at line start."""
+        text = """
+Use `<!-- pytestmark: skip -->` to skip a block, ```python opens one.
+
+```python name=test_mid_line
+x = 1
+```
+"""
+        snippets = parse_markdown(text)
+        assert len(snippets) == 1
+        assert snippets[0].marks == ("codeblock",)
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_unterminated_fence(self):
+        """Test that an unterminated block is not collected."""
+        text = """
+```python name=test_closed
+x = 1
+```
+
+```python name=test_unterminated
+y = 2
+"""
+        snippets = parse_markdown(text)
+        assert [sn.name for sn in snippets] == ["test_closed"]
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_longer_fence(self):
+        """Test that a block is only closed by a fence at least as long."""
+        text = (
+            "````python name=test_long_fence\n"
+            "x = '''\n"
+            "```\n"
+            "'''\n"
+            "````\n"
+        )
+        snippets = parse_markdown(text)
+        assert len(snippets) == 1
+        assert snippets[0].code == "x = '''\n```\n'''"
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_crlf_line_endings(self):
+        """Test that CRLF documents give the same result as LF ones."""
+        text = """
+<!-- pytestmark: django_db -->
+```python name=test_crlf
+x = 1
+
+y = 2
+```
+"""
+        assert parse_markdown(text.replace("\n", "\r\n")) == (
+            parse_markdown(text)
+        )
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_name_filter(self):
+        """Test that rejected blocks are skipped without building code."""
+        text = """
+<!-- pytestmark: django_db -->
+```python
+skipped = 1
+```
+
+<!-- continue: test_group -->
+```python name=example
+skipped = 2
+```
+
+```python name=test_kept
+kept = 1
+```
+"""
+        with patch(
+            "pytest_codeblock.md.dedent_block", wraps=dedent_block
+        ) as mock_dedent:
+            snippets = parse_markdown(text, is_test_name)
+        assert mock_dedent.call_count == 1
+        assert [(sn.name, sn.line) for sn in snippets] == [("test_kept", 13)]
+        # Marks and continuations were used up by the rejected blocks
+        assert snippets[0].marks == (CODEBLOCK_MARK,)
+        assert snippets[0].group is None
+        assert [sn.name for sn in parse_markdown(
+            text, is_test_name_or_nameless
+        )] == [None, "test_kept"]
+
 # ============================================================================
 # Test rst.py - resolve_literalinclude_path
 # ============================================================================
@@ -847,6 +1086,349 @@ Block::
         # Empty block at end
         assert len(snippets) == 0
 
+    # ------------------------------------------------------------------------
+
+    def test_parse_line_numbers(self, tmp_path):
+        """Test that each snippet reports the line of its first code line."""
+        rst = (
+            "Title\n"
+            "=====\n"
+            "\n"
+            ".. code-block:: python\n"
+            "   :name: test_first\n"
+            "\n"
+            "   a = 1\n"
+            "\n"
+            ".. codeblock-name: test_second\n"
+            "\n"
+            "Example::\n"
+            "\n"
+            "    b = 2\n"
+        )
+        snippets = parse_rst(rst, tmp_path)
+        assert [sn.line for sn in snippets] == [7, 13]
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_block_ends_at_dedent(self, tmp_path):
+        """Test that a block ends at the first less indented line."""
+        rst = """
+.. code-block:: python
+   :name: test_dedent
+
+   x = 1
+
+       y = 2
+
+Some text with a directive-like `.. code-block:: python` inside.
+
+   not code
+"""
+        snippets = parse_rst(rst, tmp_path)
+        assert len(snippets) == 1
+        assert snippets[0].code == "x = 1\n\n    y = 2\n"
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_literal_block_needs_pending_name(self, tmp_path):
+        """Test that "::" only starts a block after a codeblock-name."""
+        rst = """
+Not collected::
+
+    a = 1
+
+.. codeblock-name: test_named
+
+Some prose in between.
+
+Collected::
+
+    b = 2
+"""
+        snippets = parse_rst(rst, tmp_path)
+        assert len(snippets) == 1
+        assert snippets[0].name == "test_named"
+        assert snippets[0].code == "b = 2"
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_crlf_line_endings(self, tmp_path):
+        """Test that CRLF documents give the same result as LF ones."""
+        rst = """
+.. pytestmark: django_db
+.. code-block:: python
+   :name: test_crlf
+
+   x = 1
+
+   y = 2
+"""
+        assert parse_rst(rst.replace("\n", "\r\n"), tmp_path) == (
+            parse_rst(rst, tmp_path)
+        )
+
+    # ------------------------------------------------------------------------
+
+    def test_parse_name_filter(self, tmp_path):
+        """Test that rejected blocks are skipped without building code."""
+        rst = """
+.. pytestmark: django_db
+.. code-block:: python
+
+   skipped = 1
+
+.. codeblock-name: example
+
+Example::
+
+   skipped = 2
+
+.. code-block:: python
+   :name: test_kept
+
+   kept = 1
+"""
+        with patch(
+            "pytest_codeblock.rst._block_code", wraps=_block_code
+        ) as mock_block_code:
+            snippets = parse_rst(rst, tmp_path, is_test_name)
+        assert mock_block_code.call_count == 1
+        assert [(sn.name, sn.line) for sn in snippets] == [("test_kept", 16)]
+        assert snippets[0].marks == (CODEBLOCK_MARK,)
+        assert [sn.name for sn in parse_rst(
+            rst, tmp_path, is_test_name_or_nameless
+        )] == [None, "test_kept"]
+
+
+# ============================================================================
+# Test streaming.py, iter_markdown() and iter_rst()
+# ============================================================================
+
+MD_STREAM_DOC = """
+Intro.
+
+<!-- pytestmark: django_db -->
+```python name=test_stream_a
+x = 1
+
+y = 2
+```
+
+<!-- continue: test_stream_a -->
+```python
+z = 3
+```
+
+```python name=test_stream_b
+w = 4
+```
+"""
+
+RST_STREAM_DOC = """
+Intro.
+
+.. pytestmark: django_db
+.. code-block:: python
+   :name: test_stream_a
+
+   x = 1
+
+   y = 2
+
+.. continue: test_stream_a
+.. code-block:: python
+
+   z = 3
+
+.. codeblock-name: test_stream_b
+
+Example::
+
+   w = 4
+"""
+
+
+class TestIterTextChunks:
+    """Tests for iter_text_chunks() function."""
+
+    def test_binary_chunks_end_on_line_boundaries(self):
+        source = io.BytesIO(b"one\ntwo\nthree")
+        chunks = list(iter_text_chunks(source, chunk_size=5))
+        assert "".join(chunks) == "one\ntwo\nthree"
+        assert all(chunk.endswith("\n") for chunk in chunks[:-1])
+
+    def test_binary_multibyte_characters(self):
+        text = "\u00e9\u00e9\u00e9\n\u00e9\n"
+        source = io.BytesIO(text.encode("utf-8"))
+        assert "".join(iter_text_chunks(source, chunk_size=1)) == text
+
+    def test_lines_without_line_endings(self):
+        assert list(iter_text_chunks(["a", "b\n", "c\r\n"])) == [
+            "a\n", "b\n", "c\r\n",
+        ]
+
+
+class TestIterMarkdown:
+    """Tests for iter_markdown() function."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 16, 1 << 20])
+    def test_binary_file_matches_parse_markdown(self, chunk_size):
+        source = io.BytesIO(MD_STREAM_DOC.encode("utf-8"))
+        snippets = list(iter_markdown(source, chunk_size=chunk_size))
+        assert snippets == parse_markdown(MD_STREAM_DOC)
+        assert [sn.line for sn in snippets] == [6, 13, 17]
+
+    def test_lines_match_parse_markdown(self):
+        expected = parse_markdown(MD_STREAM_DOC)
+        lines = MD_STREAM_DOC.splitlines(keepends=True)
+        assert list(iter_markdown(lines)) == expected
+        assert list(iter_markdown(MD_STREAM_DOC.splitlines())) == expected
+
+    def test_yields_before_source_is_exhausted(self):
+        lines = iter(MD_STREAM_DOC.splitlines(keepends=True))
+        snippets = iter_markdown(lines, chunk_size=1)
+        assert next(snippets).name == "test_stream_a"
+        assert next(lines, None) is not None
+
+    def test_unterminated_fence(self):
+        text = "```python name=test_open\n" + "x = 1\n" * 5
+        source = io.BytesIO(text.encode("utf-8"))
+        assert list(iter_markdown(source, chunk_size=4)) == []
+
+
+class TestIterRst:
+    """Tests for iter_rst() function."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 16, 1 << 20])
+    def test_binary_file_matches_parse_rst(self, tmp_path, chunk_size):
+        source = io.BytesIO(RST_STREAM_DOC.encode("utf-8"))
+        snippets = list(iter_rst(source, tmp_path, chunk_size=chunk_size))
+        assert snippets == parse_rst(RST_STREAM_DOC, tmp_path)
+        assert [sn.line for sn in snippets] == [8, 15, 21]
+
+    def test_lines_match_parse_rst(self, tmp_path):
+        lines = RST_STREAM_DOC.splitlines(keepends=True)
+        assert list(iter_rst(lines, tmp_path)) == (
+            parse_rst(RST_STREAM_DOC, tmp_path)
+        )
+
+    def test_yields_before_source_is_exhausted(self, tmp_path):
+        lines = iter(RST_STREAM_DOC.splitlines(keepends=True))
+        snippets = iter_rst(lines, tmp_path, chunk_size=1)
+        assert next(snippets).name == "test_stream_a"
+        assert next(lines, None) is not None
+
+    def test_literalinclude_options_across_windows(self, tmp_path):
+        (tmp_path / "example.py").write_text("x = 1\n")
+        text = (
+            ".. literalinclude:: example.py\n"
+            "   :language: python\n"
+            "   :name: test_included\n"
+        )
+        source = io.BytesIO(text.encode("utf-8"))
+        snippets = list(iter_rst(source, tmp_path, chunk_size=1))
+        assert len(snippets) == 1
+        assert snippets[0].name == "test_included"
+        assert snippets[0].code == "x = 1\n"
+
+
+# ============================================================================
+# Test incremental.py, reparse_markdown() and reparse_rst()
+# ============================================================================
+
+def _located(snippets):
+    """Snippets along with their positions (which equality ignores)."""
+    return [(sn, sn.line, sn.end_line) for sn in snippets]
+
+
+class TestReparseMarkdown:
+    """Tests for reparse_markdown() function."""
+
+    @pytest.mark.parametrize("old, new", [
+        # Edit within a block
+        ("x = 1\n", "x = 100\n"),
+        # Lines added before later blocks
+        ("Intro.\n", "Intro.\n\nMore\nintro.\n"),
+        # Lines removed, taking a directive along
+        ("<!-- continue: test_stream_a -->\n", ""),
+        # A block opened before a closed one
+        ("Intro.\n", "```python\n"),
+        # Lines added at the end
+        ("w = 4\n```\n", "w = 4\n```\n\n```python\nv = 5\n```\n"),
+    ])
+    def test_matches_parse_markdown(self, old, new):
+        new_text = MD_STREAM_DOC.replace(old, new, 1)
+        snippets = reparse_markdown(
+            parse_markdown(MD_STREAM_DOC), MD_STREAM_DOC, new_text
+        )
+        assert _located(snippets) == _located(parse_markdown(new_text))
+
+    def test_reuses_snippets_after_the_change(self):
+        previous = parse_markdown(MD_STREAM_DOC)
+        new_text = MD_STREAM_DOC.replace("x = 1\n", "x = 100\n")
+        snippets = reparse_markdown(previous, MD_STREAM_DOC, new_text)
+        assert snippets[0].code == "x = 100\n\ny = 2"
+        assert snippets[1] is previous[1]
+        assert snippets[2] is previous[2]
+
+    def test_shifts_line_numbers(self):
+        previous = parse_markdown(MD_STREAM_DOC)
+        new_text = MD_STREAM_DOC.replace("Intro.\n", "Intro.\n\n\n")
+        snippets = reparse_markdown(previous, MD_STREAM_DOC, new_text)
+        assert [sn.code for sn in snippets] == [sn.code for sn in previous]
+        assert [sn.line for sn in snippets] == [8, 15, 19]
+        assert [sn.end_line for sn in snippets] == [11, 16, 20]
+
+    def test_unchanged(self):
+        previous = parse_markdown(MD_STREAM_DOC)
+        assert reparse_markdown(
+            previous, MD_STREAM_DOC, MD_STREAM_DOC.replace("\n", "\r\n")
+        ) == previous
+
+
+class TestReparseRst:
+    """Tests for reparse_rst() function."""
+
+    @pytest.mark.parametrize("old, new", [
+        ("   x = 1\n", "   x = 100\n"),
+        ("Intro.\n", "Intro.\n\nMore\nintro.\n"),
+        (".. continue: test_stream_a\n", ""),
+        # Dedenting a line ends the block there
+        ("   y = 2\n", "y = 2\n"),
+        # Lines added to the block running up to the end
+        ("   w = 4\n", "   w = 4\n   v = 5\n"),
+    ])
+    def test_matches_parse_rst(self, tmp_path, old, new):
+        new_text = RST_STREAM_DOC.replace(old, new, 1)
+        snippets = reparse_rst(
+            parse_rst(RST_STREAM_DOC, tmp_path),
+            RST_STREAM_DOC,
+            new_text,
+            tmp_path,
+        )
+        assert _located(snippets) == _located(parse_rst(new_text, tmp_path))
+
+    def test_reuses_snippets_after_the_change(self, tmp_path):
+        previous = parse_rst(RST_STREAM_DOC, tmp_path)
+        new_text = RST_STREAM_DOC.replace("Intro.\n", "Intro.\n\n")
+        snippets = reparse_rst(previous, RST_STREAM_DOC, new_text, tmp_path)
+        assert [sn.name for sn in snippets] == [sn.name for sn in previous]
+        assert [sn.line for sn in snippets] == [9, 16, 22]
+
+    def test_literalinclude(self, tmp_path):
+        (tmp_path / "example.py").write_text("x = 1\n")
+        text = (
+            ".. literalinclude:: example.py\n"
+            "   :name: test_included\n"
+            "\n" + RST_STREAM_DOC
+        )
+        new_text = text.replace("   z = 3\n", "   z = 30\n")
+        snippets = reparse_rst(
+            parse_rst(text, tmp_path), text, new_text, tmp_path
+        )
+        assert _located(snippets) == _located(parse_rst(new_text, tmp_path))
+        assert snippets[0].code == "x = 1\n"
+
 
 # ============================================================================
 # Integration tests using pytester - exercises collectors and hook
@@ -895,7 +1477,7 @@ assert tmp_path.exists()
     # ------------------------------------------------------------------------
 
     def test_collect_async_code(self, pytester_subprocess):
-        """Test that async code is automatically wrapped."""
+        """Test that async code is automatically run in an event loop."""
         pytester_subprocess.makefile(
             ".md",
             test_async="""
@@ -903,10 +1485,19 @@ assert tmp_path.exists()
 import asyncio
 await asyncio.sleep(0)
 ```
+
+```python name=test_async_loop
+import asyncio
+
+async def main():
+    return await asyncio.sleep(0, result=42)
+
+assert asyncio.run(main()) == 42
+```
 """,
         )
         result = pytester_subprocess.runpytest("-v", "-p", "no:django")
-        result.assert_outcomes(passed=1)
+        result.assert_outcomes(passed=2)
 
     # ------------------------------------------------------------------------
 
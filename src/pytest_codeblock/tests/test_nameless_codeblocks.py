@@ -9,6 +9,7 @@ Tests cover:
 - Integration scenarios
 - Edge cases
 """
+from dataclasses import replace
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -65,7 +66,7 @@ class TestConfigLoading:
 
     def test_config_from_dict_missing_key(self):
         """Test loading from dict without the key uses default."""
-        raw = {}
+        raw: dict[str, bool] = {}
         config = Config(
             test_nameless_codeblocks=raw.get("test_nameless_codeblocks", False)
         )
@@ -197,8 +198,7 @@ y = 2
                     elif not sn.name:
                         auto_name = f"test_{module_name}_{counter}"
                         counter += 1
-                        sn.name = auto_name
-                        tests.append(sn)
+                        tests.append(replace(sn, name=auto_name))
             else:
                 tests = [
                     sn for sn in raw if sn.name and sn.name.startswith("test_")
@@ -242,8 +242,7 @@ z = 3
                 elif not sn.name:
                     auto_name = f"test_{module_name}_{counter}"
                     counter += 1
-                    sn.name = auto_name
-                    tests.append(sn)
+                    tests.append(replace(sn, name=auto_name))
 
             # Should have all three blocks
             assert len(tests) == 3
@@ -272,9 +271,9 @@ assert original_code == "unchanged"
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert tests[0].name == "test_myfile_1"
@@ -303,9 +302,9 @@ user = User.objects.first()
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert "django_db" in tests[0].marks
@@ -354,9 +353,9 @@ d.mkdir()
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert "tmp_path" in tests[0].fixtures
@@ -451,8 +450,7 @@ class TestRSTNameless:
                     elif not sn.name:
                         auto_name = f"test_{module_name}_{counter}"
                         counter += 1
-                        sn.name = auto_name
-                        tests.append(sn)
+                        tests.append(replace(sn, name=auto_name))
             else:
                 tests = [
                     sn for sn in raw if sn.name and sn.name.startswith("test_")
@@ -498,8 +496,7 @@ class TestRSTNameless:
                 elif not sn.name:
                     auto_name = f"test_{module_name}_{counter}"
                     counter += 1
-                    sn.name = auto_name
-                    tests.append(sn)
+                    tests.append(replace(sn, name=auto_name))
 
             # Should have all three blocks
             assert len(tests) == 3
@@ -530,9 +527,9 @@ class TestRSTNameless:
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert tests[0].name == "test_myfile_1"
@@ -564,9 +561,9 @@ class TestRSTNameless:
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert "django_db" in tests[0].marks
@@ -620,9 +617,9 @@ class TestRSTNameless:
             module_name = path.stem
             for sn in raw:
                 if not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             assert len(tests) == 1
             assert "tmp_path" in tests[0].fixtures
@@ -993,9 +990,9 @@ f = 6
                 if sn.name and sn.name.startswith("test_"):
                     tests.append(sn)
                 elif not sn.name:
-                    sn.name = f"test_{module_name}_{counter}"
+                    auto_name = f"test_{module_name}_{counter}"
+                    tests.append(replace(sn, name=auto_name))
                     counter += 1
-                    tests.append(sn)
 
             # Should have 6 tests total
             assert len(tests) == 6
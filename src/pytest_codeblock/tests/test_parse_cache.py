@@ -0,0 +1,241 @@
+"""
+Unit tests for the persistent parse cache.
+
+Tests cover:
+- Cache hits and misses on document changes
+- Configuration and dependency tracking
+- Collector integration
+"""
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..cache import CACHE_KEY_PREFIX, ParseCache
+from ..collector import CodeSnippet
+from ..config import Config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestParseCache",
+    "TestParseCacheCollectors",
+)
+
+
+class DictCache:
+    """In-memory stand-in for ``pytest.Cache``."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+SNIPPETS = [
+    CodeSnippet(
+        code="x = 1",
+        line=3,
+        name="test_cached",
+        marks=("codeblock", "django_db"),
+        fixtures=("tmp_path",),
+        group="test_group",
+    ),
+]
+
+
+def _age(path, seconds=10):
+    """Move the mtime of `path` into the past, out of the racy window."""
+    st = os.stat(path)
+    os.utime(
+        path,
+        ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000),
+    )
+
+
+# ============================================================================
+# Test ParseCache
+# ============================================================================
+class TestParseCache:
+    """Test cache hits and misses."""
+
+    @pytest.fixture
+    def doc(self, tmp_path):
+        path = tmp_path / "doc.md"
+        path.write_text("```python name=test_cached\nx = 1\n```\n")
+        _age(path)
+        return path
+
+    def test_miss_on_empty_cache(self, doc):
+        assert ParseCache(DictCache(), Config()).get(doc) is None
+
+    def test_hit_after_set(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        assert cache.get(doc) == SNIPPETS
+        [key] = cache.cache.data
+        assert key.startswith(f"{CACHE_KEY_PREFIX}/")
+
+    def test_miss_after_edit(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        doc.write_text("```python name=test_changed\nx = 1\n```\n")
+        assert cache.get(doc) is None
+
+    def test_same_size_edit_is_detected(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        doc.write_text(doc.read_text().replace("x = 1", "x = 2"))
+        assert cache.get(doc) is None
+
+    def test_racy_edit_is_detected(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        st = os.stat(doc)
+        doc.write_text(doc.read_text().replace("x = 1", "x = 2"))
+        # Same size and mtime: only the content hash can tell, and it is
+        # checked because the file was modified just before it was cached.
+        os.utime(doc, ns=(st.st_atime_ns, st.st_mtime_ns))
+        entry = next(iter(cache.cache.data.values()))
+        entry["cached_ns"] = st.st_mtime_ns
+        assert cache.get(doc) is None
+
+    def test_hit_after_touch(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        _age(doc, seconds=20)
+        assert cache.get(doc) == SNIPPETS
+
+    def test_miss_on_other_config(self, doc):
+        backend = DictCache()
+        ParseCache(backend, Config()).set(doc, SNIPPETS)
+        other = ParseCache(backend, Config(test_nameless_codeblocks=True))
+        assert other.get(doc) is None
+        assert ParseCache(backend, Config()).get(doc) == SNIPPETS
+        other = ParseCache(backend, Config(md_user_codeblocks=("py3",)))
+        assert other.get(doc) is None
+
+    def test_hit_on_other_run_settings(self, doc):
+        """Settings of how code blocks run do not invalidate the cache."""
+        backend = DictCache()
+        ParseCache(backend, Config()).set(doc, SNIPPETS)
+        other = ParseCache(backend, Config(timeout=5.0, forked=True))
+        assert other.get(doc) == SNIPPETS
+
+    def test_miss_on_changed_dependency(self, doc, tmp_path):
+        include = tmp_path / "example.py"
+        include.write_text("x = 1\n")
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS, [include])
+        assert cache.get(doc) == SNIPPETS
+        include.write_text("x = 22\n")
+        assert cache.get(doc) is None
+
+    def test_miss_on_appearing_dependency(self, doc, tmp_path):
+        include = tmp_path / "missing.py"
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS, [include])
+        assert cache.get(doc) == SNIPPETS
+        include.write_text("x = 1\n")
+        assert cache.get(doc) is None
+
+    def test_miss_on_corrupt_entry(self, doc):
+        cache = ParseCache(DictCache(), Config())
+        cache.set(doc, SNIPPETS)
+        entry = next(iter(cache.cache.data.values()))
+        del entry["snippets"]
+        assert cache.get(doc) is None
+
+    def test_from_pytest_config(self):
+        pytest_config = MagicMock()
+        assert isinstance(
+            ParseCache.from_pytest_config(pytest_config, Config()),
+            ParseCache,
+        )
+        assert ParseCache.from_pytest_config(
+            pytest_config, Config(parse_cache=False)
+        ) is None
+        del pytest_config.cache
+        assert ParseCache.from_pytest_config(pytest_config, Config()) is None
+
+
+# ============================================================================
+# Test collector integration
+# ============================================================================
+class TestParseCacheCollectors:
+    """Test that collectors store and reuse parsed snippets."""
+
+    def _cache_entries(self, pytester):
+        root = pytester.path / ".pytest_cache" / "v" / CACHE_KEY_PREFIX
+        return sorted(root.iterdir()) if root.exists() else []
+
+    def test_markdown_reuses_cache(self, pytester_subprocess):
+        doc = pytester_subprocess.makefile(
+            ".md",
+            readme="""
+```python name=test_md_cached
+assert True
+```
+""",
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1)
+        [entry_path] = self._cache_entries(pytester_subprocess)
+
+        # Tamper with the cached code to tell a hit from a re-parse
+        entry = json.loads(entry_path.read_text())
+        entry["snippets"][0]["code"] = "assert False"
+        entry_path.write_text(json.dumps(entry))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(failed=1)
+
+        doc.write_text(
+            "```python name=test_md_edited\nassert True\n```\n"
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django", "-v")
+        result.assert_outcomes(passed=1)
+        assert "test_md_edited" in result.stdout.str()
+
+    def test_rst_literalinclude_dependency(self, pytester_subprocess):
+        pytester_subprocess.makefile(
+            ".rst",
+            readme="""
+.. literalinclude:: example.py
+   :name: test_rst_included
+""",
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        # The include does not exist yet
+        assert result.ret == 5
+        pytester_subprocess.path.joinpath("example.py").write_text(
+            "assert True\n"
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django", "-v")
+        result.assert_outcomes(passed=1)
+        assert "test_rst_included" in result.stdout.str()
+
+    def test_parse_cache_disabled(self, pytester_subprocess):
+        pytester_subprocess.makefile(
+            ".toml",
+            pyproject="""
+[tool.pytest-codeblock]
+parse_cache = false
+""",
+        )
+        pytester_subprocess.makefile(
+            ".md",
+            readme="""
+```python name=test_md_uncached
+assert True
+```
+""",
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1)
+        assert self._cache_entries(pytester_subprocess) == []
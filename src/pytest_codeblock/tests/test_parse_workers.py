@@ -0,0 +1,189 @@
+"""
+Unit tests for parsing documentation files in worker processes.
+
+Tests cover:
+- Picking up parse results
+- Finding the documentation files the session collects
+- Looking up each file in the parse cache once
+- Collection order and node IDs
+"""
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..collector import CodeSnippet
+from ..config import Config
+from ..parallel import ParsePool, _discover, _parse_file
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestDiscover",
+    "TestParsePool",
+    "TestParseWorkersCollection",
+)
+
+
+# ============================================================================
+# Test ParsePool
+# ============================================================================
+class TestParsePool:
+    """Test picking up parse results."""
+
+    def _pool(self, futures):
+        pool = ParsePool.__new__(ParsePool)
+        pool.futures = futures
+        pool.cached = {}
+        return pool
+
+    def test_take_result(self, tmp_path):
+        future: Future = Future()
+        future.set_result(([], []))
+        pool = self._pool({tmp_path / "doc.md": future})
+        assert pool.take(tmp_path / "sub" / ".." / "doc.md") == ([], [])
+        # Results are handed out once
+        assert pool.take(tmp_path / "doc.md") is None
+
+    def test_take_failed_result(self, tmp_path):
+        future: Future = Future()
+        future.set_exception(RuntimeError("boom"))
+        pool = self._pool({tmp_path / "doc.rst": future})
+        assert pool.take(tmp_path / "doc.rst") is None
+
+    def test_take_cached(self, tmp_path):
+        snippets = [CodeSnippet(code="x = 1", line=1, name="test_a")]
+        parse_cache = MagicMock()
+        parse_cache.get.return_value = None
+        pool = self._pool({tmp_path / "parsed.md": Future()})
+        pool.cached[tmp_path / "cached.md"] = snippets
+        # Found in the cache when the pool started
+        assert pool.take_cached(tmp_path / "cached.md", parse_cache) is snippets
+        # Missed when the pool started, and parsed
+        assert pool.take_cached(tmp_path / "parsed.md", parse_cache) is None
+        parse_cache.get.assert_not_called()
+        # Not found by the pool
+        assert pool.take_cached(tmp_path / "cached.md", parse_cache) is None
+        parse_cache.get.assert_called_once_with(tmp_path / "cached.md")
+        assert pool.take_cached(tmp_path / "other.md", None) is None
+
+    def test_not_enabled(self):
+        assert ParsePool.from_pytest_config(MagicMock()) is None
+
+    def test_parse_file(self, tmp_path):
+        md = tmp_path / "doc.md"
+        md.write_text("```python name=test_a\nx = 1\n```\n")
+        tests, dependencies = _parse_file("markdown", str(md), Config())
+        assert [sn.name for sn in tests] == ["test_a"]
+        assert dependencies == []
+
+        rst = tmp_path / "doc.rst"
+        rst.write_text(".. literalinclude:: example.py\n   :name: test_b\n")
+        tests, dependencies = _parse_file("rst", str(rst), Config())
+        assert tests == []
+        assert tmp_path / "example.py" in dependencies
+
+        prose = tmp_path / "prose.rst"
+        prose.write_text("Nothing to see here.\n")
+        assert _parse_file("rst", str(prose), Config()) == ([], [])
+
+
+# ============================================================================
+# Test _discover()
+# ============================================================================
+class TestDiscover:
+    """Test which documentation files are parsed ahead of collection."""
+
+    def test_ignored(self, pytester):
+        for name in ("doc", "skipped/doc", "globbed/doc", "conf/doc"):
+            pytester.makefile(".md", **{name: "Prose.\n"})
+        pytester.makefile(".txt", notes="Prose.\n")
+        pytester.makeconftest('collect_ignore = ["conf"]\n')
+        pytest_config = pytester.parseconfigure(
+            pytester.path,
+            "-p", "no:django",
+            "--ignore=skipped",
+            "--ignore-glob=glob*",
+        )
+        session = pytest.Session.from_config(pytest_config)
+        found = list(_discover(session, Config()))
+        assert found == [pytester.path / "doc.md"]
+
+
+# ============================================================================
+# Test collection with --codeblock-parse-workers
+# ============================================================================
+class TestParseWorkersCollection:
+    """Test that parallel parsing does not change what is collected."""
+
+    def test_same_node_ids(self, pytester_subprocess):
+        for n in range(6):
+            pytester_subprocess.makefile(
+                ".md",
+                **{f"docs/md/doc_{n}": f"""
+```python name=test_md_{n}
+assert {n} == {n}
+```
+"""},
+            )
+            pytester_subprocess.makefile(
+                ".rst",
+                **{f"docs/rst/doc_{n}": f"""
+.. code-block:: python
+   :name: test_rst_{n}
+
+   assert {n} == {n}
+"""},
+            )
+        pytester_subprocess.makefile(".md", **{"docs/prose": "Prose.\n"})
+
+        args = (
+            "--collect-only", "-q", "-p", "no:django", "-p", "no:cacheprovider"
+        )
+        serial = pytester_subprocess.runpytest(*args)
+        parallel = pytester_subprocess.runpytest(
+            *args, "--codeblock-parse-workers=3"
+        )
+        node_ids = [
+            line for line in serial.stdout.lines if "::" in line
+        ]
+        assert len(node_ids) == 12
+        assert node_ids == [
+            line for line in parallel.stdout.lines if "::" in line
+        ]
+
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "--codeblock-parse-workers=2"
+        )
+        result.assert_outcomes(passed=12)
+
+    def test_cache_looked_up_once(self, pytester_subprocess):
+        """Files are looked up in the parse cache once per session."""
+        pytester_subprocess.makeconftest("""
+from pytest_codeblock.cache import ParseCache
+
+get = ParseCache.get
+
+
+def logged_get(self, path):
+    with open("lookups", "a") as f:
+        f.write(f"{path}\\n")
+    return get(self, path)
+
+
+ParseCache.get = logged_get
+""")
+        for n in range(3):
+            pytester_subprocess.makefile(
+                ".md",
+                **{f"doc_{n}": f"```python name=test_{n}\nassert True\n```\n"},
+            )
+        lookups = pytester_subprocess.path / "lookups"
+        for _ in range(2):
+            result = pytester_subprocess.runpytest(
+                "-p", "no:django", "--codeblock-parse-workers=2"
+            )
+            result.assert_outcomes(passed=3)
+            assert len(lookups.read_text().splitlines()) == 3
+            lookups.unlink()
@@ -0,0 +1,234 @@
+"""
+Unit tests for timing the phases of code blocks.
+
+Tests cover:
+- Recording, sorting and writing out phases
+- Phases measured by the test functions of code blocks
+- The ``--codeblock-durations`` report and JSON output
+"""
+import json
+import time
+from contextlib import contextmanager, suppress
+from unittest.mock import MagicMock
+
+import pytest
+
+from .. import pytest_runtest_makereport
+from ..dialects import _make_test_function
+from ..phases import PHASES, PhaseTimer, phase_timer_key
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestPhaseCollectors",
+    "TestPhaseTimer",
+    "TestTimedFunctions",
+)
+
+
+# ============================================================================
+# Test PhaseTimer
+# ============================================================================
+class TestPhaseTimer:
+    """Test recording phases."""
+
+    def test_add(self):
+        timer = PhaseTimer()
+        timer.add("doc.md::test_x", "exec", 0.5)
+        timer.add("doc.md::test_x", "exec", 0.25)
+        timer.add("doc.md::test_x", "compile", 0.1)
+        assert timer.phases == {
+            "doc.md::test_x": {"exec": 0.75, "compile": 0.1}
+        }
+
+    def test_measure(self):
+        timer = PhaseTimer()
+        with timer.measure("doc.md::test_x", "exec"):
+            time.sleep(0.05)
+        assert timer.phases["doc.md::test_x"]["exec"] >= 0.05
+
+    def test_slowest(self):
+        timer = PhaseTimer()
+        timer.add("doc.md::test_fast", "exec", 0.1)
+        timer.add("doc.md::test_slow", "setup", 0.2)
+        timer.add("doc.md::test_slow", "exec", 0.3)
+        slowest = timer.slowest(1)
+        assert [(nodeid, total) for nodeid, total, _ in slowest] == [
+            ("doc.md::test_slow", 0.5)
+        ]
+
+    def test_write_json(self, tmp_path):
+        timer = PhaseTimer()
+        timer.add("doc.md::test_x", "pytestrun", 1.5)
+        path = tmp_path / "out" / "durations.json"
+        timer.write_json(path)
+        data = json.loads(path.read_text())
+        assert data["phases"] == list(PHASES)
+        assert data["codeblocks"] == [
+            {
+                "nodeid": "doc.md::test_x",
+                "total": 1.5,
+                "phases": {
+                    phase: 1.5 if phase == "pytestrun" else 0.0
+                    for phase in PHASES
+                },
+            }
+        ]
+
+
+# ============================================================================
+# Test phases measured by test functions
+# ============================================================================
+class TestTimedFunctions:
+    """Test the phases timed by the test functions of snippets."""
+
+    @staticmethod
+    def make_timed(phases):
+        @contextmanager
+        def timed(phase):
+            phases.append(phase)
+            yield
+
+        return timed
+
+    def test_exec(self, tmp_path):
+        phases: list[str] = []
+        function = _make_test_function(
+            "x = 1",
+            sn_name="test_x",
+            fpath=str(tmp_path / "doc.md"),
+            fixture_names=[],
+            is_pytestrun=False,
+            timed=self.make_timed(phases),
+        )
+        function()
+        assert phases == ["compile", "exec"]
+
+    def test_pytestrun(self, tmp_path):
+        phases: list[str] = []
+        function = _make_test_function(
+            "def test_x():\n    pass\n",
+            sn_name="test_x",
+            fpath=str(tmp_path / "doc.md"),
+            fixture_names=[],
+            is_pytestrun=True,
+            timed=self.make_timed(phases),
+        )
+        function()
+        assert phases == ["pytestrun"]
+
+
+# ============================================================================
+# Test the report
+# ============================================================================
+class TestPhaseCollectors:
+    """Test the phases reported for collected code blocks."""
+
+    DOC = """
+```python name=test_sleep
+import time
+
+time.sleep(0.2)
+```
+
+<!-- pytestfixture: slow_fixture -->
+```python name=test_fixture
+assert slow_fixture
+```
+
+```python name=test_async
+import asyncio
+
+await asyncio.sleep(0)
+```
+"""
+
+    # Time is simulated: the clock ticks a millisecond per reading and
+    # sleeping moves it on, so that the phases do not depend on the machine
+    CONFTEST = """
+import time
+
+import pytest
+
+now = 0.0
+
+
+def perf_counter():
+    global now
+    now += 0.001
+    return now
+
+
+def sleep(seconds):
+    global now
+    now += seconds
+
+
+time.perf_counter = perf_counter
+time.sleep = sleep
+
+
+@pytest.fixture
+def slow_fixture():
+    time.sleep(0.1)
+    return True
+"""
+
+    def test_report(self, pytester_subprocess):
+        pytester_subprocess.makeconftest(self.CONFTEST)
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django",
+            "--codeblock-durations=2",
+            "--codeblock-durations-json=reports/durations.json",
+        )
+        result.assert_outcomes(passed=3)
+        result.stdout.fnmatch_lines(
+            [
+                "*slowest codeblock durations*",
+                "*total*parse*async*compile*setup*exec*pytestrun*codeblock",
+                "*s  doc.md::test_sleep",
+                "*s  doc.md::test_fixture",
+            ]
+        )
+        assert "doc.md::test_async" not in result.stdout.str()
+
+        path = pytester_subprocess.path / "reports" / "durations.json"
+        data = json.loads(path.read_text())
+        codeblocks = {
+            entry["nodeid"]: entry["phases"] for entry in data["codeblocks"]
+        }
+        assert set(codeblocks) == {
+            "doc.md::test_sleep",
+            "doc.md::test_fixture",
+            "doc.md::test_async",
+        }
+        # The simulated sleep, plus the ticks of the clock
+        assert 0.2 < codeblocks["doc.md::test_sleep"]["exec"] < 0.3
+        for phases in codeblocks.values():
+            assert phases["parse"] > 0
+            assert phases["compile"] > 0
+            assert "setup" in phases
+
+    def test_setup_from_report(self):
+        """The setup phase is the duration of the setup report."""
+        timer = PhaseTimer()
+        item = MagicMock()
+        item.config.stash = pytest.Stash()
+        item.config.stash[phase_timer_key] = timer
+        report = MagicMock(
+            when="setup", nodeid="doc.md::test_x", duration=0.25
+        )
+        hook = pytest_runtest_makereport(item, None)
+        next(hook)
+        with suppress(StopIteration):
+            hook.send(MagicMock(get_result=lambda: report))
+        assert timer.phases == {"doc.md::test_x": {"setup": 0.25}}
+
+    def test_disabled(self, pytester_subprocess):
+        pytester_subprocess.makeconftest(self.CONFTEST)
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=3)
+        assert "slowest codeblock durations" not in result.stdout.str()
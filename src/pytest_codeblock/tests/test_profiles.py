@@ -0,0 +1,201 @@
+"""
+Unit tests for the profile of child pytest sessions.
+
+Tests cover:
+- Command line arguments, environment and command of a profile
+- ``PYTHONPATH`` of child interpreters
+- Child sessions of pytestrun code blocks started with a lean profile
+"""
+import os
+import sys
+import sysconfig
+from types import SimpleNamespace
+
+from .. import profiles
+from ..config import Config
+from ..profiles import ChildProfile, child_pythonpath
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestChildProfile",
+    "TestChildPythonpath",
+    "TestProfileCollectors",
+)
+
+
+# ============================================================================
+# Test ChildProfile
+# ============================================================================
+class TestChildProfile:
+    """Test how child sessions are started."""
+
+    def test_default(self, monkeypatch):
+        monkeypatch.setenv("PYTEST_ADDOPTS", "-x")
+        profile = ChildProfile()
+        assert profile.args(["test_x.py", "-q"]) == ["test_x.py", "-q"]
+        env = profile.env()
+        assert env["PYTEST_ADDOPTS"] == "-x"
+        assert "PYTEST_DISABLE_PLUGIN_AUTOLOAD" not in env
+        assert env["PYTHONPATH"] == os.pathsep.join(sys.path)
+        assert profile.command() == [sys.executable, "-m", "pytest"]
+
+    def test_lean(self, monkeypatch):
+        monkeypatch.setenv("PYTEST_ADDOPTS", "-x")
+        profile = ChildProfile(
+            args=("-p", "no:cacheprovider"),
+            addopts=False,
+            autoload=False,
+            plugins=("asyncio", "my_plugin"),
+        )
+        assert profile.args(["test_x.py"]) == [
+            "test_x.py",
+            "-o",
+            "addopts=",
+            "-p",
+            "pytest_asyncio.plugin",
+            "-p",
+            "my_plugin",
+            "-p",
+            "no:cacheprovider",
+        ]
+        env = profile.env()
+        assert "PYTEST_ADDOPTS" not in env
+        assert env["PYTEST_DISABLE_PLUGIN_AUTOLOAD"] == "1"
+        assert env["PYTHONPATH"] == child_pythonpath()
+
+    def test_plugins_autoloaded(self):
+        """Listed plugins are loaded anyway with autoload on."""
+        profile = ChildProfile(plugins=("asyncio",))
+        assert profile.args(["test_x.py"]) == ["test_x.py"]
+
+    def test_coverage_env(self, monkeypatch):
+        monkeypatch.setenv("COV_CORE_SOURCE", "pkg")
+        monkeypatch.setenv("COVERAGE_PROCESS_START", ".coveragerc")
+        # The default profile passes the environment through
+        env = ChildProfile().env()
+        assert env["COV_CORE_SOURCE"] == "pkg"
+        assert env["COVERAGE_PROCESS_START"] == ".coveragerc"
+        env = ChildProfile(autoload=False).env()
+        assert "COV_CORE_SOURCE" not in env
+        assert "COVERAGE_PROCESS_START" not in env
+        env = ChildProfile(autoload=False, coverage=True).env()
+        assert env["COV_CORE_SOURCE"] == "pkg"
+        assert env["COVERAGE_PROCESS_START"] == ".coveragerc"
+
+    def test_coverage_command(self, monkeypatch, tmp_path):
+        cov = SimpleNamespace(
+            config=SimpleNamespace(
+                config_file="pyproject.toml",
+                source=["pkg", "other"],
+                branch=True,
+                data_file=str(tmp_path / ".coverage"),
+            )
+        )
+        monkeypatch.setattr(profiles, "_active_coverage", lambda: cov)
+        assert ChildProfile(coverage=True).command() == [
+            sys.executable,
+            "-m",
+            "coverage",
+            "run",
+            "--parallel-mode",
+            "--rcfile=pyproject.toml",
+            "--source=pkg,other",
+            "--branch",
+            f"--data-file={tmp_path / '.coverage'}",
+            "-m",
+            "pytest",
+        ]
+        # Not measured unless opted in
+        assert ChildProfile().command() == [sys.executable, "-m", "pytest"]
+
+    def test_coverage_not_measured(self, monkeypatch):
+        monkeypatch.setattr(profiles, "_active_coverage", lambda: None)
+        command = ChildProfile(coverage=True).command()
+        assert command == [sys.executable, "-m", "pytest"]
+
+    def test_from_config(self):
+        profile = ChildProfile.from_config(
+            Config(
+                pytestrun_args=("-x",),
+                pytestrun_addopts=False,
+                pytestrun_autoload=False,
+                pytestrun_plugins=("django",),
+                pytestrun_coverage=True,
+            )
+        )
+        assert profile.extra_args == ("-x",)
+        assert not profile.addopts
+        assert not profile.autoload
+        assert profile.plugins == ("django",)
+        assert profile.coverage
+
+
+# ============================================================================
+# Test child_pythonpath
+# ============================================================================
+class TestChildPythonpath:
+    """Test the import paths given to child interpreters."""
+
+    def test_pythonpath(self, tmp_path):
+        paths = sysconfig.get_paths()
+        pythonpath = child_pythonpath(
+            [
+                str(tmp_path / "src"),
+                paths["stdlib"],
+                os.path.join(paths["stdlib"], "lib-dynload"),
+                paths["purelib"],
+                str(tmp_path / "src"),
+                str(tmp_path),
+            ]
+        )
+        assert pythonpath.split(os.pathsep) == [
+            str(tmp_path / "src"),
+            str(tmp_path),
+        ]
+
+
+# ============================================================================
+# Test collectors running pytestrun code blocks with a profile
+# ============================================================================
+class TestProfileCollectors:
+    """Test the child sessions of pytestrun code blocks."""
+
+    DOC = """
+<!-- pytestmark: pytestrun -->
+```python name=test_profile
+def test_profile(pytestconfig):
+    plugins = pytestconfig.pluginmanager
+    assert not pytestconfig.getini("addopts")
+    assert pytestconfig.getini("xfail_strict") is True
+    assert not plugins.has_plugin("anyio")
+    assert plugins.has_plugin("pytest_asyncio.plugin")
+```
+"""
+
+    def test_lean(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            'addopts = "-p no:django -p no:cacheprovider"\n'
+            "[tool.pytest-codeblock]\n"
+            "pytestrun_addopts = false\n"
+            "pytestrun_autoload = false\n"
+            'pytestrun_plugins = ["asyncio"]\n'
+            'pytestrun_args = ["-p", "no:cacheprovider", "-o", '
+            '"xfail_strict=true"]\n'
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=1)
+
+    def test_default(self, pytester_subprocess):
+        """Child sessions are set up as the session by default."""
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            'addopts = "-p no:django -p no:cacheprovider"\n'
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["*assert not *addopts*"])
@@ -1,6 +1,14 @@
+import pytest
+
 from ..collector import CodeSnippet, group_snippets
-from ..helpers import contains_top_level_await, wrap_async_code
+from ..helpers import (
+    contains_top_level_await,
+    dedent_block,
+    normalise_newlines,
+    wrap_async_code,
+)
 from ..md import parse_markdown
+from ..prescan import has_markdown_codeblocks, has_rst_codeblocks
 from ..rst import (
     get_literalinclude_content,
     parse_rst,
@@ -23,8 +31,8 @@ __all__ = (
 
 def test_group_snippets_merges_named():
     # Two snippets with the same name should be combined
-    sn1 = CodeSnippet(name="foo", code="a=1", line=1, marks=["codeblock"])
-    sn2 = CodeSnippet(name="foo", code="b=2", line=2, marks=["codeblock", "m"])
+    sn1 = CodeSnippet(name="foo", code="a=1", line=1, marks=("codeblock",))
+    sn2 = CodeSnippet(name="foo", code="b=2", line=2, marks=("codeblock", "m"))
     combined = group_snippets([sn1, sn2])
     assert len(combined) == 1
     cs = combined[0]
@@ -57,8 +65,7 @@ def test_group_snippets_different_names():
     sn2 = CodeSnippet(name="bar", code="y=2", line=2)
     combined = group_snippets([sn1, sn2])
     assert len(combined) == 2
-    assert combined[0].name.startswith("foo")
-    assert combined[1].name.startswith("bar")
+    assert [sn.name for sn in combined] == ["foo", "bar"]
 
 
 def test_parse_markdown_simple():
@@ -137,6 +144,7 @@ def test_parse_rst_literalinclude(tmp_path):
     assert "z=3" in sn.code
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_contains_top_level_await_positive():
     """Verify detection of various async constructs."""
     # Direct await
@@ -149,6 +157,7 @@ def test_contains_top_level_await_positive():
     assert contains_top_level_await("async for i in range(1): pass") is True
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_contains_top_level_await_negative():
     """Verify that sync code or strings containing keywords are ignored."""
     # Standard sync code
@@ -159,11 +168,13 @@ def test_contains_top_level_await_negative():
     assert contains_top_level_await("# await inside comment") is False
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_contains_top_level_await_invalid_syntax():
     """Verify that invalid syntax returns False rather than crashing."""
     assert contains_top_level_await("def main(:") is False
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_wrap_async_code_structure():
     """Verify the transformation logic and indentation."""
     code = "await asyncio.sleep(1)\nreturn 42"
@@ -178,6 +189,7 @@ def test_wrap_async_code_structure():
     assert "    return 42" in wrapped
 
 
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
 def test_wrap_async_code_execution_integrity():
     """
     Verify that the wrapped code is still valid Python and can be compiled.
@@ -187,3 +199,72 @@ def test_wrap_async_code_execution_integrity():
     wrapped = wrap_async_code(code)
     # If compile fails, the test fails
     assert compile(wrapped, "<string>", "exec")
+
+
+def test_normalise_newlines_matches_splitlines():
+    """Verify that normalised text has the same lines as the original."""
+    for text in (
+        "a\r\nb\r\n",
+        "a\rb\r\r",
+        "a\x0cb\u2028c",
+        "a\n\n",
+        "",
+    ):
+        normalised = normalise_newlines(text)
+        assert "\r" not in normalised
+        assert normalised.splitlines() == text.splitlines()
+    # Plain text is returned unchanged
+    text = "a\nb\n"
+    assert normalise_newlines(text) is text
+
+
+def test_dedent_block():
+    """Verify dedenting of blank, short and long lines."""
+    assert dedent_block("    a\n      b\n   \n  c\nd", 4) == (
+        "a\n  b\n\nc\nd"
+    )
+    assert dedent_block("a\n  \nb", 0) == "a\n\nb"
+
+
+def test_has_markdown_codeblocks(tmp_path):
+    """Verify the byte-level pre-scan of Markdown documents."""
+    languages = ("py", "python", "python3")
+    path = tmp_path / "doc.md"
+    for text, expected in (
+        ("", False),
+        ("# Title\n\nProse only.\n", False),
+        ("```sh\nls\n```\n", False),
+        ("Python in prose.\n```\npython\n```\n", False),
+        ("```python name=test_a\nx = 1\n```\n", True),
+        ("  ````PY\nx = 1\n````\n", True),
+        ("\ufeff```Python3\r\nx = 1\r\n```\r\n", True),
+    ):
+        path.write_text(text, encoding="utf-8")
+        assert has_markdown_codeblocks(path, languages) is expected, text
+
+
+def test_has_rst_codeblocks(tmp_path):
+    """Verify the byte-level pre-scan of reStructuredText documents."""
+    languages = ("py", "python", "python3")
+    path = tmp_path / "doc.rst"
+    for text, expected in (
+        ("", False),
+        ("Title\n=====\n\nProse only::\n\n   x = 1\n", False),
+        (".. code-block:: sh\n\n   ls\n", False),
+        (".. code-block:: python\n\n   x = 1\n", True),
+        (".. code:: PY\n\n   x = 1\n", True),
+        (".. literalinclude:: example.py\n   :name: test_a\n", True),
+        (".. codeblock-name: test_a\n\nExample::\n\n   x = 1\n", True),
+    ):
+        path.write_text(text, encoding="utf-8")
+        assert has_rst_codeblocks(path, languages) is expected, text
+
+
+def test_prescan_non_ascii_languages(tmp_path):
+    """Verify that the pre-scan accepts everything for non-ASCII tags."""
+    path = tmp_path / "doc.md"
+    path.write_text("Prose only.\n", encoding="utf-8")
+    assert has_markdown_codeblocks(path, ("pyth\u00f6n",)) is True
+    # The Kelvin sign lower-cases to "k"
+    path.write_text("```\u212aotlin\n```\n", encoding="utf-8")
+    assert has_markdown_codeblocks(path, ("kotlin",)) is True
@@ -0,0 +1,233 @@
+"""
+Unit tests for collecting ``pytestrun`` code blocks in-process.
+
+Tests cover:
+- Items of the tests found in code blocks, with fixtures and marks
+- Tracebacks pointing to the lines of the document
+- Assertions rewritten with the source of the code block
+- Timeouts of executing code blocks
+- Errors raised running the code block
+- Modules of code blocks registered only while their tests run
+- reStructuredText documents
+"""
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = ("TestInProcessCollectors",)
+
+PYPROJECT = '[tool.pytest-codeblock]\npytestrun_mode = "inprocess"\n'
+
+
+# ============================================================================
+# Test collectors of in-process pytestrun code blocks
+# ============================================================================
+class TestInProcessCollectors:
+    """Test the items collected from in-process pytestrun code blocks."""
+
+    DOC = """
+<!-- pytestmark: pytestrun -->
+<!-- pytestmark: {mark} -->
+```python name=test_block
+from dataclasses import dataclass
+
+import pytest
+
+
+@dataclass
+class Point:
+    x: int
+
+
+@pytest.fixture
+def point():
+    return Point(2)
+
+
+def test_point(point, tmp_path):
+    assert point.x == 2
+
+
+@pytest.mark.parametrize("n", [1, 2])
+def test_param(n):
+    assert n > 0
+
+
+class TestGroup:
+    def setup_method(self):
+        self.value = 3
+
+    def test_value(self):
+        assert self.value == 3
+
+
+def helper():
+    pass
+```
+
+```python name=test_plain
+assert True
+```
+"""
+
+    def test_items(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".md", doc=self.DOC.format(mark="codeblock")
+        )
+        result = pytester_subprocess.runpytest("-v", "-p", "no:django")
+        result.assert_outcomes(passed=5)
+        result.stdout.fnmatch_lines(
+            [
+                "doc.md::test_block::test_point PASSED*",
+                "doc.md::test_block::test_param[[]1[]] PASSED*",
+                "doc.md::test_block::test_param[[]2[]] PASSED*",
+                "doc.md::test_block::TestGroup::test_value PASSED*",
+                "doc.md::test_plain PASSED*",
+            ]
+        )
+
+    def test_marks(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(".md", doc=self.DOC.format(mark="skip"))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1, skipped=4)
+
+        result = pytester_subprocess.runpytest(
+            "-p", "no:django", "-m", "pytestrun"
+        )
+        result.assert_outcomes(skipped=4, deselected=1)
+
+    def test_traceback(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".md",
+            doc=(
+                "# Title\n"
+                "\n"
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_block\n"
+                "def test_fail():\n"
+                "    value = 3\n"
+                "    assert value == 4\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(
+            [
+                ">       assert value == 4",
+                "E       assert 3 == 4",
+                "doc.md:7: AssertionError",
+            ]
+        )
+
+    def test_assertion_pass_hook(self, pytester_subprocess):
+        """Passing assertions are reported with their own source."""
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            "enable_assertion_pass_hook = true\n" + PYPROJECT
+        )
+        pytester_subprocess.makeconftest(
+            "def pytest_assertion_pass(item, lineno, orig, expl):\n"
+            '    print(f"PASSED ASSERTION {lineno}: {orig}")\n'
+        )
+        pytester_subprocess.makefile(
+            ".md",
+            doc=(
+                "# Title\n"
+                "\n"
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_block\n"
+                "def test_pass():\n"
+                "    value = 3\n"
+                "    assert value == 3\n"
+                "    assert value > 2\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-s", "-p", "no:django")
+        result.assert_outcomes(passed=1)
+        result.stdout.fnmatch_lines(
+            [
+                "*PASSED ASSERTION 7: value == 3*",
+                "*PASSED ASSERTION 8: value > 2*",
+            ]
+        )
+
+    def test_timeout(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".md",
+            doc=(
+                "<!-- pytestmark: pytestrun -->\n"
+                "<!-- pytestmark: timeout(0.5) -->\n"
+                "```python name=test_block\n"
+                "import time\n\n"
+                "time.sleep(30)\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(errors=1)
+        result.stdout.fnmatch_lines(["*TimeoutError*test_block*timed out*"])
+
+    def test_error(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".md",
+            doc=(
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_block\n"
+                "raise ValueError('broken module')\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(errors=1)
+        result.stdout.fnmatch_lines(["*ValueError: broken module*"])
+
+    def test_module(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".md",
+            doc=(
+                "<!-- pytestmark: pytestrun -->\n"
+                "```python name=test_block\n"
+                "import sys\n\n\n"
+                "def test_module():\n"
+                "    assert __name__.isidentifier()\n"
+                "    assert sys.modules[__name__].test_module is test_module\n"
+                "```\n\n"
+                "```python name=test_after\n"
+                "import sys\n\n"
+                "assert not [\n"
+                "    name for name in sys.modules\n"
+                '    if name.startswith("pytest_codeblock_test_block")\n'
+                "]\n"
+                "```\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=2)
+
+    def test_rst(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(PYPROJECT)
+        pytester_subprocess.makefile(
+            ".rst",
+            doc=(
+                ".. pytestmark: pytestrun\n"
+                ".. code-block:: python\n"
+                "   :name: test_block\n"
+                "\n"
+                "   def test_one():\n"
+                "       assert True\n"
+                "\n"
+                "   def test_two():\n"
+                "       assert True\n"
+            ),
+        )
+        result = pytester_subprocess.runpytest("-v", "-p", "no:django")
+        result.assert_outcomes(passed=2)
+        result.stdout.fnmatch_lines(["doc.rst::test_block::test_two PASSED*"])
@@ -0,0 +1,287 @@
+"""
+Unit tests for scheduling pytestrun code blocks ahead of their items.
+
+Tests cover:
+- Running code blocks concurrently, up to a limit
+- Waiting for results, and code blocks not started yet
+- Code blocks run concurrently by the collectors, reported in order
+- Skipped code blocks, and sessions stopping early
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ..scheduling import PytestrunScheduler
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestPytestrunScheduler",
+    "TestSchedulingCollectors",
+)
+
+
+# ============================================================================
+# Test PytestrunScheduler
+# ============================================================================
+class TestPytestrunScheduler:
+    """Test running code blocks in the background."""
+
+    def test_concurrent(self, closing):
+        scheduler = closing(PytestrunScheduler(2))
+        # Passes only if both code blocks run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        for nodeid in ("doc.md::test_a", "doc.md::test_b"):
+            scheduler.add(nodeid, barrier.wait)
+            scheduler.submit(nodeid)
+        scheduler.run("doc.md::test_a")
+        scheduler.run("doc.md::test_b")
+        assert set(scheduler.durations) == {"doc.md::test_a", "doc.md::test_b"}
+
+    def test_limit(self, closing):
+        scheduler = closing(PytestrunScheduler(2))
+        running = []
+        most = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def runner():
+            with lock:
+                running.append(1)
+                most.append(len(running))
+            release.wait(5)
+            with lock:
+                running.pop()
+
+        for index in range(4):
+            scheduler.add(f"doc.md::test_{index}", runner)
+            scheduler.submit(f"doc.md::test_{index}")
+        release.set()
+        for index in range(4):
+            scheduler.run(f"doc.md::test_{index}")
+        assert max(most) == 2
+
+    def test_error(self, closing):
+        scheduler = closing(PytestrunScheduler(2))
+
+        def runner():
+            raise AssertionError("pytestrun block `test_a` failed")
+
+        scheduler.add("doc.md::test_a", runner)
+        scheduler.submit("doc.md::test_a")
+        with pytest.raises(AssertionError, match="test_a` failed"):
+            scheduler.run("doc.md::test_a")
+
+    def test_not_submitted(self, closing):
+        """Code blocks not started yet run in the calling thread."""
+        scheduler = closing(PytestrunScheduler(2))
+        threads = []
+        scheduler.add(
+            "doc.md::test_a",
+            lambda: threads.append(threading.current_thread()),
+        )
+        scheduler.run("doc.md::test_a")
+        assert threads == [threading.current_thread()]
+        assert scheduler.executor is None
+
+    def test_stopping(self, closing):
+        """Code blocks do not start once the session stops."""
+        scheduler = closing(PytestrunScheduler(2))
+        scheduler.session = SimpleNamespace(shouldstop=True, shouldfail=False)
+        threads = []
+        scheduler.add(
+            "doc.md::test_a",
+            lambda: threads.append(threading.current_thread()),
+        )
+        scheduler.submit("doc.md::test_a")
+        scheduler.futures["doc.md::test_a"].result()
+        assert threads == []
+        # Its item runs it, if it runs after all
+        scheduler.run("doc.md::test_a")
+        assert threads == [threading.current_thread()]
+
+    def test_close(self, closing):
+        """Code blocks not started yet are cancelled."""
+        scheduler = closing(PytestrunScheduler(2))
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        calls = []
+
+        def runner():
+            calls.append(1)
+            started.release()
+            release.wait(5)
+
+        for index in range(4):
+            scheduler.add(f"doc.md::test_{index}", runner)
+            scheduler.submit(f"doc.md::test_{index}")
+        assert started.acquire(timeout=5) and started.acquire(timeout=5)
+        pending = [
+            scheduler.futures[f"doc.md::test_{index}"] for index in (2, 3)
+        ]
+
+        # Let the running ones finish only once the others are cancelled
+        def done(future):
+            if all(future.done() for future in pending):
+                release.set()
+
+        for future in pending:
+            future.add_done_callback(done)
+        scheduler.close()
+        assert len(calls) == 2
+        assert all(future.cancelled() for future in pending)
+
+
+# ============================================================================
+# Test collectors starting pytestrun code blocks ahead
+# ============================================================================
+class TestSchedulingCollectors:
+    """Test pytestrun code blocks started ahead of their items."""
+
+    # Each code block logs its start and end, giving the other one a chance
+    # to start in between
+    BLOCK = """
+<!-- pytestmark: pytestrun -->
+```python name=test_{name}
+import pathlib
+import time
+
+
+def test_together():
+    log = pathlib.Path("blocks.log")
+    with log.open("a") as f:
+        f.write("{name} started\\n")
+    for _ in range(600):
+        if "{other} started" in log.read_text():
+            break
+        time.sleep(0.05)
+    with log.open("a") as f:
+        f.write("{name} finished\\n")
+```
+"""
+
+    DOC = (
+        BLOCK.format(name="first", other="second")
+        + BLOCK.format(name="second", other="first")
+        + """
+<!-- pytestmark: pytestrun -->
+```python name=test_fail
+def test_fail():
+    assert 1 == 2
+```
+
+```python name=test_plain
+assert True
+```
+"""
+    )
+
+    def assert_together(self, pytester, first, second):
+        """Assert that code blocks `first` and `second` ran at once."""
+        log = (pytester.path / "blocks.log").read_text().splitlines()
+        assert log.index(f"{first} started") < log.index(f"{second} finished")
+        assert log.index(f"{second} started") < log.index(f"{first} finished")
+
+    def setup(self, pytester, batch="block", **docs):
+        pytester.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            'addopts = "-p no:django -p no:cacheprovider"\n'
+            "[tool.pytest-codeblock]\n"
+            "pytestrun_concurrency = 4\n"
+            f'pytestrun_batch = "{batch}"\n'
+        )
+        pytester.makefile(".md", **(docs or {"doc": self.DOC}))
+
+    def test_concurrent(self, pytester_subprocess):
+        self.setup(pytester_subprocess)
+        result = pytester_subprocess.runpytest("-v")
+        result.assert_outcomes(passed=3, failed=1)
+        result.stdout.fnmatch_lines(
+            [
+                "doc.md::test_first PASSED*",
+                "doc.md::test_second PASSED*",
+                "doc.md::test_fail FAILED*",
+                "doc.md::test_plain PASSED*",
+                "*pytestrun block `test_fail`*failed*",
+            ]
+        )
+        self.assert_together(pytester_subprocess, "first", "second")
+
+    def test_batches(self, pytester_subprocess):
+        """Batches of documents run concurrently, each of them once."""
+        self.setup(
+            pytester_subprocess,
+            batch="file",
+            doc=self.BLOCK.format(name="first", other="second")
+            + self.BLOCK.format(name="third", other="second"),
+            other=self.BLOCK.format(name="second", other="first"),
+        )
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=3)
+        self.assert_together(pytester_subprocess, "first", "second")
+
+    @staticmethod
+    def touching(name, mark="codeblock"):
+        """A pytestrun code block creating the file ``<name>.ran``."""
+        return (
+            "<!-- pytestmark: pytestrun -->\n"
+            f"<!-- pytestmark: {mark} -->\n"
+            f"```python name=test_{name}\n"
+            "import pathlib\n\n"
+            f'pathlib.Path("{name}.ran").touch()\n\n\n'
+            "def test_ok():\n"
+            "    pass\n"
+            "```\n\n"
+        )
+
+    def ran(self, pytester):
+        return sorted(path.stem for path in pytester.path.glob("*.ran"))
+
+    def test_skipped(self, pytester_subprocess):
+        """Code blocks skipped by their marks do not run ahead."""
+        self.setup(
+            pytester_subprocess,
+            doc=self.touching("skip", "skip")
+            + self.touching("skipif", 'skipif("True")')
+            + self.touching("run"),
+        )
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=1, skipped=2)
+        assert self.ran(pytester_subprocess) == ["run"]
+
+    def test_stop(self, pytester_subprocess):
+        """No code blocks start once the session stops on a failure."""
+        self.setup(
+            pytester_subprocess,
+            doc="```python name=test_fail\nassert False\n```\n\n"
+            + self.touching("ahead_1")
+            + self.touching("ahead_2")
+            + "".join(self.touching(f"later_{index}") for index in range(3)),
+        )
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            'addopts = "-p no:django -p no:cacheprovider"\n'
+            "[tool.pytest-codeblock]\n"
+            "pytestrun_concurrency = 2\n"
+        )
+        # Slots free up before the code blocks not started are cancelled
+        # (in this session, not in those of the code blocks)
+        pytester_subprocess.makeconftest(
+            "import time\n\nimport pytest\n\n\n"
+            "@pytest.hookimpl(tryfirst=True)\n"
+            "def pytest_sessionfinish(session):\n"
+            '    if "-x" in session.config.invocation_params.args:\n'
+            "        time.sleep(5)\n"
+        )
+        result = pytester_subprocess.runpytest("-x")
+        result.assert_outcomes(failed=1)
+        # Only those started before the failure ran
+        assert self.ran(pytester_subprocess) == ["ahead_1", "ahead_2"]
+
+    def test_collect_only(self, pytester_subprocess):
+        self.setup(pytester_subprocess)
+        result = pytester_subprocess.runpytest("--collect-only")
+        result.stdout.fnmatch_lines(["*4 tests collected*"])
+        assert not list(pytester_subprocess.path.glob("*.started"))
@@ -0,0 +1,170 @@
+"""
+Unit tests for code blocks sharing the namespace of their document.
+
+Tests cover:
+- The ``shared_namespace`` setting
+- Test functions running in a shared namespace
+- Collector integration
+"""
+import asyncio
+from typing import Any
+
+import pytest
+
+from ..config import _to_patterns
+from ..dialects import _make_test_function
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestSharedNamespace",
+    "TestSharedNamespaceCollectors",
+    "TestSharedNamespaceSetting",
+)
+
+
+# ============================================================================
+# Test the shared_namespace setting
+# ============================================================================
+class TestSharedNamespaceSetting:
+    """Test the patterns of documents sharing a namespace."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            (True, ("*",)),
+            (False, ()),
+            (["docs/*.md"], ("docs/*.md",)),
+            (None, ()),
+            ("docs/*.md", ()),
+        ],
+    )
+    def test_to_patterns(self, value, expected):
+        assert _to_patterns(value, ()) == expected
+
+
+# ============================================================================
+# Test _make_test_function() with a shared namespace
+# ============================================================================
+class TestSharedNamespace:
+    """Test that test functions run in the namespace given to them."""
+
+    def _function(self, code, name, namespace, **kwargs):
+        return _make_test_function(
+            code,
+            sn_name=name,
+            fpath="doc.md",
+            fixture_names=[],
+            is_pytestrun=False,
+            namespace=lambda: namespace,
+            **kwargs,
+        )
+
+    def test_blocks_share_names(self):
+        namespace = {"asyncio": asyncio}
+        self._function("import math\nx = 2", "test_one", namespace)()
+        self._function("y = math.sqrt(x * 8)", "test_two", namespace)()
+        assert namespace["y"] == 4
+
+    def test_fixtures_are_added(self):
+        namespace: dict[str, Any] = {}
+        function = _make_test_function(
+            "result = value * 2",
+            sn_name="test_fixture",
+            fpath="doc.md",
+            fixture_names=["value"],
+            is_pytestrun=False,
+            namespace=lambda: namespace,
+        )
+        function(value=21)
+        assert namespace["result"] == 42
+
+    def test_async_block(self):
+        namespace = {"asyncio": asyncio}
+        self._function("x = 1", "test_sync", namespace)()
+        self._function(
+            "x = await asyncio.sleep(0, x + 1)", "test_async", namespace
+        )()
+        assert namespace["x"] == 2
+
+    def test_fresh_namespace_by_default(self):
+        _make_test_function("x = 1", "test_one", "doc.md", [], False)()
+        with pytest.raises(Exception, match="test_two"):
+            _make_test_function(
+                "assert x == 1", "test_two", "doc.md", [], False
+            )()
+
+
+# ============================================================================
+# Test collectors with a shared namespace
+# ============================================================================
+class TestSharedNamespaceCollectors:
+    """Test which code blocks share a namespace."""
+
+    MD = """
+<!-- pytestfixture: tmp_path -->
+```python name=test_setup
+import json
+
+data = {"steps": 1}
+path = tmp_path / "data.json"
+```
+
+```python name=test_step
+data["steps"] += 1
+path.write_text(json.dumps(data))
+```
+
+```python name=test_async_step
+import asyncio
+
+await asyncio.sleep(0)
+assert json.loads(path.read_text()) == {"steps": 2}
+```
+"""
+
+    RST = """
+.. code-block:: python
+   :name: test_setup
+
+   total = 40
+
+.. code-block:: python
+   :name: test_total
+
+   total += 2
+   assert total == 42
+"""
+
+    def test_all_documents(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\nshared_namespace = true\n"
+        )
+        pytester_subprocess.makefile(".md", doc=self.MD)
+        pytester_subprocess.makefile(".rst", doc=self.RST)
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=5)
+
+    def test_matching_documents(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            '[tool.pytest-codeblock]\nshared_namespace = ["tutorial/*"]\n'
+        )
+        pytester_subprocess.mkdir("tutorial")
+        pytester_subprocess.path.joinpath("tutorial", "doc.md").write_text(
+            self.MD
+        )
+        pytester_subprocess.makefile(".md", doc=self.MD)
+        result = pytester_subprocess.runpytest("-v", "-p", "no:django")
+        result.assert_outcomes(passed=4, failed=2)
+        result.stdout.fnmatch_lines(["tutorial/doc.md::test_step PASSED*"])
+        result.stdout.fnmatch_lines(["doc.md::test_step FAILED*"])
+
+    def test_documents_do_not_share(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\nshared_namespace = true\n"
+        )
+        pytester_subprocess.makefile(".rst", one=self.RST)
+        pytester_subprocess.makefile(".rst", two=self.RST)
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=4)
@@ -0,0 +1,233 @@
+"""
+Unit tests for code block timeouts.
+
+Tests cover:
+- The ``timeout(seconds)`` mark
+- Timeouts of the configuration, marks and earlier durations
+- Interrupting code blocks in-process, forked, async and in pytestrun
+- Adaptive timeouts
+"""
+import json
+import signal
+import time
+
+import pytest
+
+from ..config import Config
+from ..dialects import _make_mark, _mark_timeout
+from ..md import parse_markdown
+from ..pytestrun import run_pytest_style_code
+from ..rst import parse_rst
+from ..timeouts import (
+    DURATIONS_KEY,
+    MIN_ADAPTIVE_TIMEOUT,
+    Durations,
+    can_alarm,
+    snippet_timeout,
+    time_limit,
+)
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestTimeLimit",
+    "TestTimeoutCollectors",
+    "TestTimeoutMark",
+    "TestSnippetTimeout",
+)
+
+
+# ============================================================================
+# Test the timeout mark
+# ============================================================================
+class TestTimeoutMark:
+    """Test marks with arguments."""
+
+    def test_parse_markdown(self):
+        snippets = parse_markdown(
+            "<!-- pytestmark: timeout(2.5) -->\n"
+            "```python name=test_x\npass\n```\n"
+        )
+        assert "timeout(2.5)" in snippets[0].marks
+
+    def test_parse_rst(self, tmp_path):
+        snippets = parse_rst(
+            ".. pytestmark: timeout(2)\n"
+            ".. code-block:: python\n"
+            "   :name: test_x\n\n"
+            "   pass\n",
+            tmp_path,
+        )
+        assert "timeout(2)" in snippets[0].marks
+
+    def test_make_mark(self):
+        assert _make_mark("skip").name == "skip"
+        mark = _make_mark("timeout(5)")
+        assert (mark.name, mark.args) == ("timeout", (5,))
+        assert _make_mark("skip()").args == ()
+        with pytest.raises(ValueError, match="Invalid arguments"):
+            _make_mark("timeout(five)")
+
+    def test_mark_timeout(self):
+        assert _mark_timeout(("codeblock", "timeout(1.5)")) == 1.5
+        assert _mark_timeout(("codeblock", "timeout")) is None
+        assert _mark_timeout(("codeblock",)) is None
+
+
+# ============================================================================
+# Test snippet_timeout()
+# ============================================================================
+class TestSnippetTimeout:
+    """Test which timeout a code block gets."""
+
+    def test_mark_first(self):
+        config = Config(timeout=10)
+        assert snippet_timeout(2, "doc.md::test_x", config, None) == 2
+        assert snippet_timeout(0, "doc.md::test_x", config, None) is None
+
+    def test_setting(self):
+        assert snippet_timeout(None, "x", Config(timeout=10), None) == 10
+        assert snippet_timeout(None, "x", Config(), None) is None
+
+    def test_adaptive(self):
+        durations = Durations({"test_slow": 4.0, "test_x": 0})
+        config = Config(adaptive_timeout=3)
+        assert snippet_timeout(None, "test_slow", config, durations) == 12
+        assert snippet_timeout(
+            None, "test_x", config, durations
+        ) == MIN_ADAPTIVE_TIMEOUT
+        assert snippet_timeout(None, "test_new", config, durations) is None
+        # Within the timeout setting
+        config = Config(timeout=5, adaptive_timeout=3)
+        assert snippet_timeout(None, "test_slow", config, durations) == 5
+
+
+# ============================================================================
+# Test time_limit()
+# ============================================================================
+@pytest.mark.skipif(not can_alarm(), reason="SIGALRM required")
+class TestTimeLimit:
+    """Test interrupting code blocks."""
+
+    def test_timeout(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        with (
+            pytest.raises(TimeoutError, match="`test_x` timed out after"),
+            time_limit(0.1, "test_x"),
+        ):
+            time.sleep(5)
+        assert signal.getsignal(signal.SIGALRM) is previous
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    def test_within_limit(self):
+        with time_limit(5, "test_x"):
+            pass
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    def test_no_limit(self):
+        with time_limit(None, "test_x"):
+            assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+# ============================================================================
+# Test collectors with timeouts
+# ============================================================================
+@pytest.mark.skipif(not can_alarm(), reason="SIGALRM required")
+class TestTimeoutCollectors:
+    """Test timeouts of collected code blocks."""
+
+    DOC = """
+<!-- pytestmark: timeout(0.3) -->
+```python name=test_sleep
+import time
+
+time.sleep(5)
+```
+
+<!-- pytestmark: timeout(0.3) -->
+<!-- pytestmark: forked -->
+```python name=test_forked
+import time
+
+time.sleep(5)
+```
+
+<!-- pytestmark: timeout(0.3) -->
+```python name=test_async
+import asyncio
+
+await asyncio.sleep(5)
+```
+
+```python name=test_fast
+pass
+```
+"""
+
+    def test_marks(self, pytester_subprocess):
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1, failed=3)
+        result.stdout.fnmatch_lines(
+            [
+                "*TimeoutError: Code block `test_sleep` timed out*",
+                "*TimeoutError: Code block `test_forked` timed out*",
+                "*TimeoutError: Code block `test_async` timed out*",
+            ],
+            consecutive=False,
+        )
+
+    def test_pytestrun(self, tmp_path):
+        code = "import time\n\n\ndef test_sleep():\n    time.sleep(10)\n"
+        with pytest.raises(TimeoutError, match="`test_sleep` in .* timed out"):
+            run_pytest_style_code(
+                code=code,
+                snippet_name="test_sleep",
+                path=str(tmp_path / "doc.md"),
+                timeout=1,
+            )
+
+    def test_setting(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\ntimeout = 0.3\n"
+        )
+        pytester_subprocess.makefile(
+            ".md",
+            doc="```python name=test_sleep\nimport time\ntime.sleep(5)\n```\n",
+        )
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["*timed out after 0.3 seconds*"])
+
+    def test_adaptive(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\nadaptive_timeout = 2\n"
+        )
+        doc = "```python name=test_sleep\nimport time\ntime.sleep({})\n```\n"
+        pytester_subprocess.makefile(".md", doc=doc.format(0.01))
+        # Without an earlier duration, there is no limit
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(passed=1)
+
+        # The code block now gets MIN_ADAPTIVE_TIMEOUT
+        pytester_subprocess.makefile(".md", doc=doc.format(5))
+        result = pytester_subprocess.runpytest("-p", "no:django")
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(["*timed out after 1 seconds*"])
+
+    def test_adaptive_pruned(self, pytester_subprocess):
+        """Durations of code blocks no longer collected are dropped."""
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest-codeblock]\nadaptive_timeout = 2\n"
+        )
+        for name in ("old", "new"):
+            pytester_subprocess.makefile(
+                ".md", **{name: "```python name=test_x\npass\n```\n"}
+            )
+            result = pytester_subprocess.runpytest("-p", "no:django")
+            result.assert_outcomes(passed=1)
+            (pytester_subprocess.path / f"{name}.md").unlink()
+        cache = pytester_subprocess.path / ".pytest_cache"
+        durations = cache.joinpath("v", *DURATIONS_KEY.split("/"))
+        assert list(json.loads(durations.read_text())) == ["new.md::test_x"]
@@ -0,0 +1,193 @@
+"""
+Unit tests for the pool of pytestrun workers.
+
+Tests cover:
+- Running test files in warm workers
+- Recycling workers after a number of code blocks or above a memory limit
+- Timeouts and workers exiting
+- The ``pool`` pytestrun mode
+"""
+import subprocess
+import time
+
+import pytest
+
+from ..workers import PytestrunPool
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "TestPytestrunPool",
+    "TestPoolCollectors",
+)
+
+
+def run(pool, directory, code, name="test_block", timeout=None, args=()):
+    """
+    Run `code` as a test file in `directory` in a worker of `pool`, with
+    the extra command line `args`.
+    """
+    directory.mkdir(exist_ok=True)
+    path = directory / f"{name}.py"
+    path.write_text(code)
+    args = [
+        str(path), "-q", "-p", "no:django", "-p", "no:cacheprovider", *args
+    ]
+    return pool.run(args, str(path), str(directory), timeout)
+
+
+def worker_pids(pool):
+    return [worker.process.pid for worker in pool.idle]
+
+
+# ============================================================================
+# Test PytestrunPool
+# ============================================================================
+class TestPytestrunPool:
+    """Test running test files in workers."""
+
+    def test_run(self, closing, tmp_path):
+        pool = closing(PytestrunPool(1, 100, 0))
+        returncode, output = run(
+            pool, tmp_path, "def test_ok():\n    assert True\n"
+        )
+        assert returncode == 0
+        assert "1 passed" in output
+
+        returncode, output = run(
+            pool, tmp_path, "def test_fail():\n    assert 1 == 2\n"
+        )
+        assert returncode == 1
+        assert "assert 1 == 2" in output
+        assert len(pool.idle) == 1
+
+    def test_warm(self, closing, tmp_path):
+        """Modules imported by earlier code blocks stay imported."""
+        pool = closing(PytestrunPool(1, 100, 0))
+        code = (
+            "import sys\n\n\n"
+            "def test_import():\n"
+            "    assert ('colorsys' in sys.modules) == {imported}\n"
+            "    import colorsys\n"
+        )
+        assert run(pool, tmp_path / "a", code.format(imported=False))[0] == 0
+        assert run(pool, tmp_path / "b", code.format(imported=True))[0] == 0
+
+    def test_same_name(self, closing, tmp_path):
+        """Test modules of the same name do not get mixed up."""
+        pool = closing(PytestrunPool(1, 100, 0))
+        for value in (1, 2):
+            returncode, output = run(
+                pool,
+                tmp_path / f"block_{value}",
+                f"VALUE = {value}\n\n\n"
+                f"def test_value():\n    assert VALUE == {value}\n",
+            )
+            assert returncode == 0, output
+
+    def test_stdin(self, closing, tmp_path):
+        """Code blocks reading stdin do not read the requests."""
+        pool = closing(PytestrunPool(1, 100, 0))
+        code = (
+            "import sys\n\n\n"
+            "def test_read():\n"
+            "    assert not sys.stdin.read()\n"
+        )
+        for directory in ("a", "b"):
+            returncode, output = run(
+                pool, tmp_path / directory, code, timeout=30, args=["-s"]
+            )
+            assert returncode == 0, output
+
+    def test_max_blocks(self, closing, tmp_path):
+        pool = closing(PytestrunPool(1, 2, 0))
+        code = "def test_ok():\n    pass\n"
+        run(pool, tmp_path, code)
+        first = worker_pids(pool)
+        run(pool, tmp_path, code)
+        assert pool.idle == []
+        run(pool, tmp_path, code)
+        assert worker_pids(pool) != first
+        assert pool.started == 1
+
+    def test_max_rss(self, closing, tmp_path):
+        pool = closing(PytestrunPool(1, 100, 1))
+        run(pool, tmp_path, "def test_ok():\n    pass\n")
+        assert pool.idle == []
+        assert pool.started == 0
+
+    def test_timeout(self, closing, tmp_path):
+        pool = closing(PytestrunPool(1, 100, 0))
+        start = time.perf_counter()
+        with pytest.raises(subprocess.TimeoutExpired):
+            run(
+                pool,
+                tmp_path,
+                "import time\n\n\ndef test_sleep():\n    time.sleep(10)\n",
+                timeout=1,
+            )
+        assert time.perf_counter() - start < 5
+        assert pool.started == 0
+        # A new worker takes over
+        assert run(pool, tmp_path, "def test_ok():\n    pass\n")[0] == 0
+
+    def test_worker_exit(self, closing, tmp_path):
+        pool = closing(PytestrunPool(1, 100, 0))
+        returncode, output = run(
+            pool,
+            tmp_path,
+            "import os\n\n\ndef test_exit():\n    os._exit(3)\n",
+        )
+        assert returncode == 1
+        assert output == "pytestrun worker exited with code 3"
+        assert pool.started == 0
+
+
+# ============================================================================
+# Test collectors running pytestrun code blocks in the pool
+# ============================================================================
+class TestPoolCollectors:
+    """Test pytestrun code blocks run in the pool."""
+
+    DOC = """
+<!-- pytestmark: pytestrun -->
+```python name=test_pass
+import colorsys
+
+
+class TestPass:
+    def test_import(self):
+        assert colorsys
+```
+
+<!-- pytestmark: pytestrun -->
+```python name=test_warm
+import sys
+
+
+def test_warm():
+    assert "colorsys" in sys.modules
+```
+
+<!-- pytestmark: pytestrun -->
+```python name=test_fail
+def test_fail():
+    assert 1 == 2
+```
+"""
+
+    def test_pool(self, pytester_subprocess):
+        pytester_subprocess.makepyprojecttoml(
+            "[tool.pytest.ini_options]\n"
+            'addopts = "-p no:django -p no:cacheprovider"\n'
+            "[tool.pytest-codeblock]\n"
+            'pytestrun_mode = "pool"\n'
+        )
+        pytester_subprocess.makefile(".md", doc=self.DOC)
+        result = pytester_subprocess.runpytest()
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(
+            ["*pytestrun block `test_fail`*failed*", "*assert 1 == 2*"],
+            consecutive=False,
+        )
@@ -0,0 +1,161 @@
+import signal
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import pytest
+
+from .config import Config, get_config
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "DURATIONS_KEY",
+    "Durations",
+    "MIN_ADAPTIVE_TIMEOUT",
+    "can_alarm",
+    "durations_key",
+    "snippet_timeout",
+    "time_limit",
+    "timeout_error",
+)
+
+# Key of the durations of code blocks in the pytest cache
+DURATIONS_KEY = "pytest-codeblock/durations"
+
+# Adaptive timeouts are never shorter, so that quick code blocks do not time
+# out on a busy machine
+MIN_ADAPTIVE_TIMEOUT = 1.0
+
+durations_key = pytest.StashKey["Durations"]()
+
+
+class Durations:
+    """
+    Durations of passing code blocks, by node ID, kept in the pytest cache
+    for the ``adaptive_timeout`` setting.
+    """
+
+    def __init__(self, previous: dict[str, float]) -> None:
+        # Recorded in earlier runs
+        self.previous = previous
+        # Recorded in this run
+        self.current: dict[str, float] = {}
+        # Node IDs of the code blocks collected in this run
+        self.collected: set[str] = set()
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """Load the durations of earlier runs, if adaptive timeouts are on."""
+        pytest_config = session.config
+        cache = getattr(pytest_config, "cache", None)
+        if not get_config().adaptive_timeout or cache is None:
+            return
+        previous = cache.get(DURATIONS_KEY, {})
+        if not isinstance(previous, dict):
+            previous = {}
+        pytest_config.stash[durations_key] = cls(previous)
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """
+        Store the durations recorded in this run, along with those of
+        earlier runs of code blocks still collected, so that the entry
+        does not keep code blocks that are gone.
+        """
+        durations = Durations.from_pytest_config(session.config)
+        if durations is not None and durations.current:
+            previous = {
+                nodeid: seconds
+                for nodeid, seconds in durations.previous.items()
+                if nodeid in durations.collected
+            }
+            session.config.cache.set(
+                DURATIONS_KEY, {**previous, **durations.current}
+            )
+
+    @staticmethod
+    def from_pytest_config(pytest_config: Any) -> Optional["Durations"]:
+        """Durations of a session, or None if adaptive timeouts are off."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(durations_key, None)
+
+    def collect(self, nodeid: str) -> None:
+        """Note that the code block `nodeid` was collected in this run."""
+        self.collected.add(nodeid)
+
+    def record(self, nodeid: str, seconds: float) -> None:
+        """Record that the code block `nodeid` passed in `seconds`."""
+        self.current[nodeid] = seconds
+
+    def get(self, nodeid: str) -> Optional[float]:
+        """Duration of the code block `nodeid` in an earlier run."""
+        seconds = self.previous.get(nodeid)
+        return float(seconds) if isinstance(seconds, (int, float)) else None
+
+
+def snippet_timeout(
+    mark_timeout: Optional[float],
+    nodeid: str,
+    config: Config,
+    durations: Optional[Durations],
+) -> Optional[float]:
+    """
+    Seconds the code block `nodeid` may run for, or None for no limit.
+
+    A ``timeout(seconds)`` mark takes precedence. Otherwise, with adaptive
+    timeouts on, code blocks that passed in an earlier run get the
+    ``adaptive_timeout`` factor of their duration then, within the
+    ``timeout`` setting. Other code blocks get the ``timeout`` setting.
+    """
+    if mark_timeout is not None:
+        return mark_timeout or None
+    timeout = config.timeout or None
+    recorded = durations.get(nodeid) if durations is not None else None
+    if recorded is not None:
+        adaptive = max(recorded * config.adaptive_timeout, MIN_ADAPTIVE_TIMEOUT)
+        timeout = adaptive if timeout is None else min(timeout, adaptive)
+    return timeout
+
+
+def timeout_error(name: str, seconds: float) -> TimeoutError:
+    """Error of the code block `name` running for more than `seconds`."""
+    return TimeoutError(
+        f"Code block `{name}` timed out after {seconds:g} seconds"
+    )
+
+
+def can_alarm() -> bool:
+    """Whether code blocks running in this thread can be interrupted."""
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def time_limit(seconds: Optional[float], name: str) -> Iterator[None]:
+    """
+    Raise ``TimeoutError`` in the block if it runs for more than `seconds`,
+    using ``SIGALRM``. Blocking calls such as ``input()`` or socket reads
+    are interrupted as well. Where ``SIGALRM`` is not available (Windows,
+    threads other than the main one), the block runs without a limit.
+    """
+    if not seconds or not can_alarm():
+        yield
+        return
+
+    def alarm(signum: int, frame: Any) -> None:
+        raise timeout_error(name, seconds)
+
+    previous = signal.signal(signal.SIGALRM, alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,325 @@
+"""
+Long-lived worker processes running ``pytestrun`` code blocks.
+
+A worker imports pytest, its plugins, ``conftest.py`` files (and sets up
+Django, with pytest-django) once, then runs ``pytest.main`` on every code
+block it receives, instead of a new interpreter being started for each of
+them. Workers are recycled after a number of code blocks, or once their
+memory grows above a limit, so that leaks stay contained.
+"""
+import gc
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import IO, Any, Optional
+
+import pytest
+
+from .config import get_config
+from .profiles import ChildProfile
+
+__author__ = "Artur Barseghyan <artur.barseghyan@gmail.com>"
+__copyright__ = "2025-2026 Artur Barseghyan"
+__license__ = "MIT"
+__all__ = (
+    "PytestrunPool",
+    "PytestrunWorker",
+    "pytestrun_pool_key",
+    "serve",
+)
+
+# Command starting a worker
+WORKER_COMMAND = "from pytest_codeblock.workers import serve; serve()"
+
+pytestrun_pool_key = pytest.StashKey["PytestrunPool"]()
+
+
+def _rss() -> int:
+    """Resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Peak size where the current one is not available, in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run(request: dict[str, Any]) -> tuple[int, str]:
+    """Run pytest for `request`, returning its exit code and output."""
+    path = request["path"]
+    tmpdir = os.path.dirname(path)
+    sys_path = sys.path[:]
+    with tempfile.TemporaryFile("w+") as out:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        try:
+            os.chdir(request["cwd"])
+            returncode = int(pytest.main(request["args"]))
+        except BaseException as err:
+            print(f"{type(err).__name__}: {err}", file=sys.stderr)
+            returncode = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+            # Forget the test module, which the next block may reuse the
+            # name of, keeping everything else imported
+            sys.path[:] = sys_path
+            for name, module in list(sys.modules.items()):
+                if (getattr(module, "__file__", None) or "").startswith(
+                    tmpdir
+                ):
+                    del sys.modules[name]
+        out.seek(0)
+        return returncode, out.read()
+
+
+def serve() -> None:
+    """
+    Run pytest for each request read from stdin (in a worker process),
+    replying on stdout. Requests and replies are JSON, one per line.
+
+    Code blocks get ``os.devnull`` as stdin, so that reading it (with
+    ``-s``) does not eat the requests.
+    """
+    requests = os.fdopen(os.dup(sys.stdin.fileno()), "r")
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.close(devnull)
+    frozen = False
+    for line in requests:
+        returncode, output = _run(json.loads(line))
+        replies.write(
+            json.dumps(
+                {"returncode": returncode, "output": output, "rss": _rss()}
+            )
+            + "\n"
+        )
+        replies.flush()
+        if not frozen:
+            # What the first code block imported (pytest, plugins,
+            # conftest.py files) is kept out of the garbage collections
+            # pytest runs on exit, which would otherwise walk the whole
+            # warm heap on every code block
+            gc.collect()
+            gc.freeze()
+            frozen = True
+
+
+class PytestrunWorker:
+    """
+    A worker process, as seen from the pytest process, running pytest as
+    set up by `profile` (except for coverage, which workers do not
+    measure).
+    """
+
+    def __init__(self, profile: Optional[ChildProfile] = None) -> None:
+        self.profile = profile or ChildProfile()
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", WORKER_COMMAND],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=self.profile.env(),
+        )
+        assert self.process.stdin is not None
+        assert self.process.stdout is not None
+        # Pipes of the requests to the worker and of its replies
+        self.stdin: IO[str] = self.process.stdin
+        self.stdout: IO[str] = self.process.stdout
+        # Code blocks run so far
+        self.blocks = 0
+        # Resident set size after the last code block, in bytes
+        self.rss = 0
+        # Replies, read in a thread so that waiting for them can time out
+        self.replies: queue.Queue[Optional[str]] = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.stdout:
+            self.replies.put(line)
+        self.replies.put(None)
+
+    def run(
+        self,
+        args: list[str],
+        path: str,
+        cwd: str,
+        timeout: Optional[float] = None,
+    ) -> tuple[int, str]:
+        """
+        Run pytest with `args` for the test file at `path`, returning its
+        exit code and output. Raises ``subprocess.TimeoutExpired`` if it
+        runs for more than `timeout` seconds.
+        """
+        request = {
+            "args": self.profile.args(args),
+            "path": path,
+            "cwd": cwd,
+        }
+        try:
+            self.stdin.write(json.dumps(request) + "\n")
+            self.stdin.flush()
+            line = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            # Only raised with a timeout
+            raise subprocess.TimeoutExpired(args, timeout or 0) from None
+        except OSError:
+            line = None
+        if line is None:
+            returncode = self.process.wait()
+            return 1, f"pytestrun worker exited with code {returncode}"
+        reply = json.loads(line)
+        self.blocks += 1
+        self.rss = reply["rss"]
+        return reply["returncode"], reply["output"]
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is still running."""
+        return self.process.poll() is None
+
+    def stop(self) -> None:
+        """Let the worker exit, killing it if it does not."""
+        try:
+            self.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self) -> None:
+        """Kill the worker."""
+        self.process.kill()
+        self.process.wait()
+
+
+class PytestrunPool:
+    """
+    Pool of workers running ``pytestrun`` code blocks, started as code
+    blocks need them, up to `size` at a time. A worker is replaced after
+    `max_blocks` code blocks, or once its resident set size is above
+    `max_rss` bytes (0 for no limit). Workers run pytest as set up by
+    `profile`.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_blocks: int,
+        max_rss: int,
+        profile: Optional[ChildProfile] = None,
+    ) -> None:
+        self.size = size
+        self.max_blocks = max_blocks
+        self.max_rss = max_rss
+        self.profile = profile
+        self.idle: list[PytestrunWorker] = []
+        # Workers started, idle or not
+        self.started = 0
+        self.condition = threading.Condition()
+
+    @classmethod
+    def start(cls, session: pytest.Session) -> None:
+        """Set up the pool of `session`, if ``pytestrun_mode`` is ``pool``."""
+        config = get_config()
+        if config.pytestrun_mode != "pool":
+            return
+        session.config.stash[pytestrun_pool_key] = cls(
+            max(config.pytestrun_workers, 1),
+            config.pytestrun_worker_max_blocks,
+            config.pytestrun_worker_max_rss * 1024 * 1024,
+            ChildProfile.from_config(config),
+        )
+
+    @staticmethod
+    def stop(session: pytest.Session) -> None:
+        """Stop the workers of `session`."""
+        pool = PytestrunPool.from_pytest_config(session.config)
+        if pool is not None:
+            del session.config.stash[pytestrun_pool_key]
+            pool.close()
+
+    @staticmethod
+    def from_pytest_config(pytest_config: Any) -> Optional["PytestrunPool"]:
+        """Pool of a session, or None if ``pytestrun`` blocks do not use it."""
+        stash = getattr(pytest_config, "stash", None)
+        if not isinstance(stash, pytest.Stash):
+            return None
+        return stash.get(pytestrun_pool_key, None)
+
+    def _acquire(self) -> PytestrunWorker:
+        with self.condition:
+            while not self.idle and self.started >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.started += 1
+        try:
+            return PytestrunWorker(self.profile)
+        except BaseException:
+            self._retire()
+            raise
+
+    def _release(self, worker: PytestrunWorker) -> None:
+        with self.condition:
+            self.idle.append(worker)
+            self.condition.notify()
+
+    def _retire(self) -> None:
+        with self.condition:
+            self.started -= 1
+            self.condition.notify()
+
+    def run(
+        self,
+        args: list[str],
+        path: str,
+        cwd: str,
+        timeout: Optional[float] = None,
+    ) -> tuple[int, str]:
+        """
+        Run pytest with `args` for the test file at `path` in a worker, as
+        :meth:`PytestrunWorker.run` does.
+        """
+        worker = self._acquire()
+        try:
+            result = worker.run(args, path, cwd, timeout)
+        except BaseException:
+            worker.kill()
+            self._retire()
+            raise
+        if (
+            not worker.alive
+            or worker.blocks >= self.max_blocks
+            or (self.max_rss and worker.rss > self.max_rss)
+        ):
+            worker.stop()
+            self._retire()
+        else:
+            self._release(worker)
+        return result
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.started -= len(idle)
+        for worker in idle:
+            worker.stop()